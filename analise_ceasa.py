@@ -1,15 +1,31 @@
 # analise_ceasa.py
 import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from services.anomalias import HistoricoPrecos, corrigir_coluna
+from services.arquivo_boletins import ARQUIVO_DIR, listar_arquivados, ler_boletim
+from services.cache_derivados import CacheDerivados, cache_padrao, hash_frame, versao_regras
+from services.canonico import chaves_para_comparar, normalizar_nome
+from services.categorias import carregar_regras, categorizar, subcategorizar
+from services.comparacao import calcular_variacao
+from services.exportar import criar_writer, escrever_aba
+from services.precos import parse_preco_br
+
 DOWNLOAD_DIR = "downloads"
 
 
 # -------------------------------------------------
 # utilidades de arquivo
 # -------------------------------------------------
-def listar_boletins(pasta=DOWNLOAD_DIR):
+def listar_boletins(pasta=DOWNLOAD_DIR, n=None, arquivo=ARQUIVO_DIR):
+    # boletins arquivados (onde o scraper grava): o manifesto já vem ordenado, sem varrer a pasta
+    arquivados = listar_arquivados(n, arquivo)
+    if arquivados:
+        return [b["caminho"] for b in arquivados]
+
+    # legado: xlsx soltos em downloads/
     pasta_abs = os.path.abspath(pasta)
     arquivos = [
         os.path.join(pasta_abs, f)
@@ -18,7 +34,7 @@ def listar_boletins(pasta=DOWNLOAD_DIR):
     ]
     # mais recente primeiro
     arquivos.sort(key=os.path.getmtime, reverse=True)
-    return arquivos
+    return arquivos[:n]
 
 
 # -------------------------------------------------
@@ -33,65 +49,12 @@ def detectar_coluna_produto(df: pd.DataFrame) -> str:
 
 
 def categorizar_produto(nome: str) -> str:
-    if not isinstance(nome, str):
-        return "Outros"
-    n = nome.lower()
-
-    frutas_kw = [
-        "banana", "mamão", "mamao", "maçã", "maca", "laranja", "tangerina",
-        "uva", "melancia", "melão", "melao", "abacaxi", "pera", "goiaba",
-        "limão", "limao", "maracujá", "maracuja", "acerola", "kiwi", "pitaya",
-        "abacate", "caju"
-    ]
-    if any(k in n for k in frutas_kw):
-        return "Frutas"
-
-    peixes_kw = [
-        "peixe", "pescada", "tilápia", "tilapia", "corvina", "cação", "cacao",
-        "sardinha", "atum", "bacalhau", "merluza", "bagre", "camarão", "camarao"
-    ]
-    if any(k in n for k in peixes_kw):
-        return "Peixes"
-
-    cereais_kw = [
-        "arroz", "feijão", "feijao", "milho", "soja", "trigo", "aveia", "fubá", "fuba"
-    ]
-    if any(k in n for k in cereais_kw):
-        return "Cereais"
-
-    return "Hortifruti"
+    # regras em services/regras_categorias.json
+    return carregar_regras()["categorias"].classificar(nome)
 
 
 def subcategorizar_hortifruti(nome: str) -> str:
-    if not isinstance(nome, str):
-        return "Outros"
-    n = nome.lower()
-
-    # folhas
-    verdura_kw = [
-        "alface", "rúcula", "rucula", "couve", "repolho", "agrião", "agriao",
-        "espinafre", "almeirão", "almeirao", "acelga", "cebolinha", "coentro", "salsa"
-    ]
-    if any(k in n for k in verdura_kw):
-        return "Verdura/Folha"
-
-    # raízes
-    raiz_kw = [
-        "batata", "cenoura", "beterraba", "mandioca", "aipim", "inhame",
-        "batata-doce", "batata doce", "cará", "cara"
-    ]
-    if any(k in n for k in raiz_kw):
-        return "Raiz/Tubérculo"
-
-    # frutos
-    fruto_kw = [
-        "tomate", "pimentão", "pimentao", "abobrinha", "abóbora", "abobora",
-        "pepino", "chuchu", "berinjela", "vagem", "quiabo", "maxixe"
-    ]
-    if any(k in n for k in fruto_kw):
-        return "Hortaliça de Fruto"
-
-    return "Outros Hortifruti"
+    return carregar_regras()["subcategorias_hortifruti"].classificar(nome)
 
 
 # -------------------------------------------------
@@ -105,17 +68,19 @@ def escolher_coluna_preco(df: pd.DataFrame) -> str | None:
     return None
 
 
-def corrigir_casas_decimais(serie: pd.Series) -> pd.Series:
+def corrigir_casas_decimais(serie: pd.Series, nomes: pd.Series | None = None,
+                            historico: HistoricoPrecos | None = None) -> pd.Series:
     """
-    Corrige só os valores que vieram 100x menores (0.0455 -> 4.55).
+    Corrige só os valores que vieram 100x fora da escala (0.0455 -> 4.55).
     Regras:
-      - converte pra número
-      - se 0 < valor < 1 → multiplica por 100
+      - converte pra número (aceita "4,55" / "1.234,50")
+      - com histórico do produto: o valor que só volta à faixa dele com
+        x100 ou /100 é corrigido
+      - sem histórico: se 0 < valor < 1 → multiplica por 100
     """
-    serie = pd.to_numeric(serie, errors="coerce")
-    mask = (serie > 0) & (serie < 1)
-    serie.loc[mask] = serie.loc[mask] * 100
-    return serie
+    if nomes is None:
+        historico = None
+    return corrigir_coluna(historico, nomes, serie, str(serie.name), minimo=1)
 
 
 # -------------------------------------------------
@@ -123,35 +88,21 @@ def corrigir_casas_decimais(serie: pd.Series) -> pd.Series:
 # -------------------------------------------------
 def montar_abas_basicas(writer, df: pd.DataFrame, col_prod: str):
     workbook = writer.book
-    header_fmt = workbook.add_format({"bold": True, "bg_color": "#D9D9D9"})
-    num_fmt = workbook.add_format({"num_format": "#,##0.00"})
 
     # ITENS
     cols_itens = [c for c in [
         col_prod, "Categoria", "Subcategoria", "MIN", "M.C.", "MAX", "Data"
     ] if c in df.columns]
-    df[cols_itens].to_excel(writer, sheet_name="Itens", index=False)
-    ws_itens = writer.sheets["Itens"]
-    for i, col in enumerate(cols_itens):
-        ws_itens.write(0, i, col, header_fmt)
-        ws_itens.set_column(i, i, 20)
-    for col in ["MIN", "M.C.", "MAX"]:
-        if col in cols_itens:
-            idx = cols_itens.index(col)
-            ws_itens.set_column(idx, idx, 12, num_fmt)
+    larguras = {c: 12 if c in ("MIN", "M.C.", "MAX") else 20 for c in cols_itens}
+    escrever_aba(writer, df[cols_itens], "Itens", larguras=larguras)
 
     # RESUMO
-    resumo_df = pd.DataFrame()
-    resumo_df.loc["Total de itens", "Valor"] = len(df)
+    resumo = {"Total de itens": len(df)}
     for col in ["MIN", "M.C.", "MAX"]:
         if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
-            resumo_df.loc[f"Média {col}", "Valor"] = df[col].mean()
-    resumo_df.to_excel(writer, sheet_name="Resumo")
-    ws_resumo = writer.sheets["Resumo"]
-    ws_resumo.write(0, 0, "Métrica", header_fmt)
-    ws_resumo.write(0, 1, "Valor", header_fmt)
-    ws_resumo.set_column(0, 0, 30)
-    ws_resumo.set_column(1, 1, 20, num_fmt)
+            resumo[f"Média {col}"] = df[col].mean()
+    resumo_df = pd.DataFrame({"Métrica": list(resumo), "Valor": pd.Series(list(resumo.values()), dtype="float64")})
+    escrever_aba(writer, resumo_df, "Resumo", larguras={"Métrica": 30, "Valor": 20})
 
     # TOP 10
     col_preco = escolher_coluna_preco(df)
@@ -162,12 +113,9 @@ def montar_abas_basicas(writer, df: pd.DataFrame, col_prod: str):
             .sort_values(col_preco, ascending=False)
             .head(10)
         )
-        top10.to_excel(writer, sheet_name="Top10", index=False)
-        ws_top = writer.sheets["Top10"]
-        for i, col in enumerate(top10.columns):
-            ws_top.write(0, i, col, header_fmt)
-            ws_top.set_column(i, i, 25)
-        ws_top.set_column(1, 1, 14, num_fmt)
+        larguras = {c: 25 for c in top10.columns}
+        larguras[col_preco] = 14
+        ws_top = escrever_aba(writer, top10, "Top10", larguras=larguras)
 
         chart = workbook.add_chart({"type": "column"})
         chart.add_series({
@@ -184,7 +132,7 @@ def montar_abas_basicas(writer, df: pd.DataFrame, col_prod: str):
 # -------------------------------------------------
 # comparação com o boletim anterior
 # -------------------------------------------------
-def comparar_com_anterior(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame):
+def comparar_com_anterior(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame, historico: HistoricoPrecos | None = None):
     col_prod_hoje = detectar_coluna_produto(df_hoje)
     col_prod_ant = detectar_coluna_produto(df_antigo)
 
@@ -194,12 +142,15 @@ def comparar_com_anterior(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame):
         return None, None
 
     # corrige casas decimais de cada série separadamente
-    df_hoje[col_preco_hoje] = corrigir_casas_decimais(df_hoje[col_preco_hoje])
-    df_antigo[col_preco_ant] = corrigir_casas_decimais(df_antigo[col_preco_ant])
+    df_hoje[col_preco_hoje] = corrigir_casas_decimais(df_hoje[col_preco_hoje], df_hoje[col_prod_hoje], historico)
+    df_antigo[col_preco_ant] = corrigir_casas_decimais(df_antigo[col_preco_ant], df_antigo[col_prod_ant], historico)
 
-    # chave de junção
-    df_hoje["_key_prod"] = df_hoje[col_prod_hoje].astype(str).str.strip().str.lower()
-    df_antigo["_key_prod"] = df_antigo[col_prod_ant].astype(str).str.strip().str.lower()
+    # chave de junção pelo nome canônico (sem acento/unidade, palavras em
+    # ordem); nomes do anterior são casados por similaridade com os de hoje
+    df_hoje["_key_prod"], df_antigo["_key_prod"] = chaves_para_comparar(
+        df_hoje[col_prod_hoje], df_antigo[col_prod_ant]
+    )
+    df_antigo = df_antigo.drop_duplicates("_key_prod", keep="last")
 
     df_join = pd.merge(
         df_hoje,
@@ -211,21 +162,7 @@ def comparar_com_anterior(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame):
     )
 
     df_join = df_join.rename(columns={col_preco_hoje: "preco_hoje"})
-    df_join["dif_abs"] = df_join["preco_hoje"] - df_join["preco_anterior"]
-    df_join["dif_pct"] = (df_join["dif_abs"] / df_join["preco_anterior"]) * 100
-
-    def status(row):
-        old = row["preco_anterior"]
-        new = row["preco_hoje"]
-        if pd.isna(old):
-            return "NOVO"
-        if new > old:
-            return "SUBIU"
-        if new < old:
-            return "CAIU"
-        return "IGUAL"
-
-    df_join["status"] = df_join.apply(status, axis=1)
+    df_join = calcular_variacao(df_join)
     df_join["Produto"] = df_join[col_prod_hoje]
 
     return df_join, col_prod_hoje
@@ -234,132 +171,161 @@ def comparar_com_anterior(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame):
 # -------------------------------------------------
 # plano de venda / markup
 # -------------------------------------------------
-def classificar_classe(categoria: str, subcategoria: str, preco_max: float) -> str:
-    # VERDE: durável ou barato
-    if categoria == "Cereais":
-        return "Verde"
-    if subcategoria == "Raiz/Tubérculo":
-        return "Verde"
-    if preco_max is not None and preco_max <= 6:
-        return "Verde"
-
-    # VERMELHA: sensível/caro
-    if categoria == "Peixes":
-        return "Vermelha"
-    if preco_max is not None and preco_max > 10:
-        return "Vermelha"
-
-    # resto
-    return "Amarela"
-
-
-def adicionar_aba_plano_venda(writer, df_base: pd.DataFrame, df_comp: pd.DataFrame | None, col_prod: str):
-    wb = writer.book
-    ws = wb.add_worksheet("Plano_Venda")
-    header = wb.add_format({"bold": True, "bg_color": "#D9D9D9"})
-    money = wb.add_format({"num_format": "#,##0.00"})
-    pct = wb.add_format({"num_format": "0.00%"})
-
-    markup_por_classe = {
-        "Verde": 0.30,
-        "Amarela": 0.35,
-        "Vermelha": 0.50,
-    }
+MARKUP_POR_CLASSE = {
+    "Verde": 0.30,
+    "Amarela": 0.35,
+    "Vermelha": 0.50,
+}
+ALERTA_POR_STATUS = {
+    "SUBIU": "Atenção",
+    "CAIU": "Promo",
+}
+QTD_SUGERIDA = 20
+
+
+def classificar_classes(categoria: pd.Series, subcategoria: pd.Series, preco_max: pd.Series) -> pd.Series:
+    """
+    Classe de cada produto, por coluna. As regras valem nesta ordem:
+      Verde     durável ou barato: Cereais, Raiz/Tubérculo ou preço <= 6
+      Vermelha  sensível ou caro: Peixes ou preço > 10
+      Amarela   o resto (inclusive sem preço)
+    """
+    verde = (categoria == "Cereais") | (subcategoria == "Raiz/Tubérculo") | (preco_max <= 6)
+    vermelha = (categoria == "Peixes") | (preco_max > 10)
+    return pd.Series(
+        np.select([verde, vermelha], ["Verde", "Vermelha"], default="Amarela"),
+        index=categoria.index,
+    )
 
+
+def montar_plano_venda(df_base: pd.DataFrame, df_comp: pd.DataFrame | None, col_prod: str) -> pd.DataFrame:
+    """
+    Plano de venda (classe, markup, preço de venda e alerta) calculado por
+    coluna. Devolve um DataFrame pronto para a planilha ou para JSON
+    (to_dict(orient="records")).
+    """
     col_preco = escolher_coluna_preco(df_base)
     if col_preco is None:
         col_preco = "MAX"
 
-    # montar dicionário de alertas a partir do comparativo
-    alerta_por_prod = {}
+    vazio = pd.Series("", index=df_base.index)
+    categoria = df_base["Categoria"] if "Categoria" in df_base.columns else vazio
+    subcategoria = df_base["Subcategoria"] if "Subcategoria" in df_base.columns else vazio
+    if col_preco in df_base.columns:
+        preco_base = pd.to_numeric(df_base[col_preco], errors="coerce").astype("float64")
+    else:
+        preco_base = pd.Series(0.0, index=df_base.index)
+
+    classe = classificar_classes(categoria, subcategoria, preco_base)
+    markup = classe.map(MARKUP_POR_CLASSE).astype("float64")
+
+    plano = pd.DataFrame({
+        "Produto": df_base[col_prod],
+        "Categoria": categoria,
+        "Subcategoria": subcategoria,
+        "Classe": classe,
+        "Quantidade_sugerida": QTD_SUGERIDA,
+        "Custo_base": preco_base,
+        "Markup_%": markup,
+        "Valor_venda": preco_base * (1 + markup),
+    })
+
+    # alerta a partir do comparativo (se o produto repetir, vale o último)
+    chave = normalizar_nome(df_base[col_prod])
+    plano["Alerta"] = "Venda normal"
     if df_comp is not None:
-        for _, r in df_comp.iterrows():
-            key = str(r["Produto"]).strip().lower()
-            st = r["status"]
-            if st == "SUBIU":
-                alerta_por_prod[key] = "Atenção"
-            elif st == "CAIU":
-                alerta_por_prod[key] = "Promo"
-            else:
-                alerta_por_prod[key] = "Venda normal"
-
-    colunas = [
-        "Produto", "Categoria", "Subcategoria", "Classe",
-        "Quantidade_sugerida", "Custo_base", "Markup_%", "Valor_venda", "Alerta"
-    ]
-    for i, c in enumerate(colunas):
-        ws.write(0, i, c, header)
-
-    row = 1
-    for _, r in df_base.iterrows():
-        produto = r[col_prod]
-        cat = r.get("Categoria", "")
-        subcat = r.get("Subcategoria", "")
-        preco_base = r.get(col_preco, 0)
-        try:
-            preco_base = float(preco_base)
-        except Exception:
-            preco_base = 0.0
-
-        classe = classificar_classe(cat, subcat, preco_base)
-        markup = markup_por_classe.get(classe, 0.30)
-        valor_venda = preco_base * (1 + markup)
-        qtd = 20
-
-        alerta = "Venda normal"
-        key = str(produto).strip().lower()
-        if key in alerta_por_prod:
-            alerta = alerta_por_prod[key]
-
-        ws.write(row, 0, produto)
-        ws.write(row, 1, cat)
-        ws.write(row, 2, subcat)
-        ws.write(row, 3, classe)
-        ws.write_number(row, 4, qtd)
-        ws.write_number(row, 5, preco_base, money)
-        ws.write_number(row, 6, markup, pct)
-        ws.write_number(row, 7, valor_venda, money)
-        ws.write(row, 8, alerta)
-
-        row += 1
-
-    ws.set_column(0, 0, 30)
-    ws.set_column(1, 3, 18)
-    ws.set_column(4, 4, 10)
-    ws.set_column(5, 7, 14)
-    ws.set_column(8, 8, 15)
+        alertas = pd.DataFrame({
+            "_key_prod": normalizar_nome(df_comp["Produto"]),
+            "Alerta": df_comp["status"].astype(str).map(ALERTA_POR_STATUS).fillna("Venda normal"),
+        }).drop_duplicates("_key_prod", keep="last")
+        plano["Alerta"] = (
+            chave.to_frame("_key_prod")
+            .merge(alertas, on="_key_prod", how="left")["Alerta"]
+            .fillna("Venda normal")
+            .to_numpy()
+        )
+
+    return plano.reset_index(drop=True)
+
+
+def adicionar_aba_plano_venda(writer, df_base: pd.DataFrame, df_comp: pd.DataFrame | None, col_prod: str,
+                              plano: pd.DataFrame | None = None):
+    if plano is None:
+        plano = montar_plano_venda(df_base, df_comp, col_prod)
+    escrever_aba(
+        writer,
+        plano,
+        "Plano_Venda",
+        formatos={"Markup_%": "0.00%"},
+        larguras={
+            "Produto": 30, "Categoria": 18, "Subcategoria": 18, "Classe": 18,
+            "Quantidade_sugerida": 10, "Custo_base": 14, "Markup_%": 14,
+            "Valor_venda": 14, "Alerta": 15,
+        },
+    )
+    return plano
 
 
 # -------------------------------------------------
 # montar tudo
 # -------------------------------------------------
-def montar_relatorio_unificado(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame | None, caminho_saida: str):
+def preparar_boletim(df: pd.DataFrame) -> pd.DataFrame:
+    """Boletim com Categoria e Subcategoria (o que o relatório deriva dele)."""
+    col_prod = detectar_coluna_produto(df)
+    df = df.copy()
+    # preços em float32 (ler_boletim compacto) voltam a float64 para as contas
+    for col in df.columns[df.dtypes == "float32"]:
+        df[col] = parse_preco_br(df[col])
+    df["Categoria"] = categorizar(df[col_prod])
+    df["Subcategoria"] = subcategorizar(df[col_prod], df["Categoria"])
+    return df
+
+
+def montar_relatorio_unificado(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame | None, caminho_saida: str,
+                               cache: CacheDerivados | None = cache_padrao,
+                               historico: HistoricoPrecos | None = None):
+    """
+    Gera o relatório. Os derivados (boletim categorizado, comparativo e plano
+    de venda) vêm do cache pelo hash do conteúdo dos boletins + versão das
+    regras (e do histórico de preços, que entra na correção de escala do
+    comparativo); cache=None desliga.
+    """
     os.makedirs(os.path.dirname(caminho_saida), exist_ok=True)
 
     col_prod = detectar_coluna_produto(df_hoje)
+    original = df_hoje
+    if cache is not None:
+        versao = versao_regras()
+        hash_hoje = hash_frame(original)
+        hash_antigo = hash_frame(df_antigo) if df_antigo is not None else "sem_anterior"
+        if historico is not None:
+            hash_antigo = f"{hash_antigo}_{historico.versao}"
+
+    def derivado(nome, gerar, do_par=True):
+        if cache is None:
+            return gerar()
+        chave = f"{nome}_{hash_hoje}_{hash_antigo}" if do_par else f"{nome}_{hash_hoje}"
+        return cache.obter(f"{chave}_{versao}", gerar)
 
     # cria categorias
-    df_hoje["Categoria"] = df_hoje[col_prod].apply(categorizar_produto)
-    df_hoje["Subcategoria"] = df_hoje.apply(
-        lambda r: subcategorizar_hortifruti(r[col_prod]) if r["Categoria"] == "Hortifruti" else "",
-        axis=1,
-    )
+    df_hoje = derivado("base", lambda: preparar_boletim(original), do_par=False)
 
-    with pd.ExcelWriter(caminho_saida, engine="xlsxwriter") as writer:
+    with criar_writer(caminho_saida) as writer:
         # abas principais
         montar_abas_basicas(writer, df_hoje, col_prod)
 
         df_comp = None
         if df_antigo is not None:
-            df_comp, _ = comparar_com_anterior(df_hoje.copy(), df_antigo.copy())
+            df_comp = derivado("comp", lambda: comparar_com_anterior(df_hoje.copy(), df_antigo.copy(), historico)[0])
             if df_comp is not None:
-                df_comp.to_excel(writer, sheet_name="Comparativo", index=False)
-                df_comp[df_comp["status"] == "SUBIU"].to_excel(writer, sheet_name="Subiu", index=False)
-                df_comp[df_comp["status"] == "CAIU"].to_excel(writer, sheet_name="Caiu", index=False)
-                df_comp[df_comp["status"] == "NOVO"].to_excel(writer, sheet_name="Novos", index=False)
+                escrever_aba(writer, df_comp, "Comparativo")
+                escrever_aba(writer, df_comp[df_comp["status"] == "SUBIU"], "Subiu")
+                escrever_aba(writer, df_comp[df_comp["status"] == "CAIU"], "Caiu")
+                escrever_aba(writer, df_comp[df_comp["status"] == "NOVO"], "Novos")
 
         # plano de venda (usa comparativo se tiver)
-        adicionar_aba_plano_venda(writer, df_hoje, df_comp, col_prod)
+        plano = derivado("plano", lambda: montar_plano_venda(df_hoje, df_comp, col_prod))
+        adicionar_aba_plano_venda(writer, df_hoje, df_comp, col_prod, plano)
 
     print(f"✅ Relatório unificado salvo em: {caminho_saida}")
 
@@ -368,20 +334,22 @@ def montar_relatorio_unificado(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame |
 # main
 # -------------------------------------------------
 if __name__ == "__main__":
-    boletins = listar_boletins()
+    boletins = listar_boletins(n=2)
     if not boletins:
         raise SystemExit("Nenhum boletim encontrado em downloads/")
 
     caminho_hoje = boletins[0]
-    df_hoje = pd.read_excel(caminho_hoje, sheet_name="Boletim")
+    df_hoje = ler_boletim(caminho_hoje, compacto=True, relatar=True)
 
     df_antigo = None
     if len(boletins) > 1:
-        df_antigo = pd.read_excel(boletins[1], sheet_name="Boletim")
+        df_antigo = ler_boletim(boletins[1], compacto=True, relatar=True)
 
     # se quiser evitar erro de arquivo aberto, pode colocar timestamp:
     # data_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     # saida = os.path.join(DOWNLOAD_DIR, f"relatorio_ceasa_{data_str}.xlsx")
     saida = os.path.join(DOWNLOAD_DIR, "relatorio_ceasa.xlsx")
 
-    montar_relatorio_unificado(df_hoje, df_antigo, saida)
+    # histórico de preços por produto (python -m services.anomalias)
+    montar_relatorio_unificado(df_hoje, df_antigo, saida, historico=HistoricoPrecos.carregar())
+    print(f"🗃️ Cache de derivados: {cache_padrao.estatisticas()}")
@@ -1,11 +1,34 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+import hashlib
 import os
 
+from services.boletim_servido import CacheBoletim
+from services.delta_boletim import CacheDelta
+from services.indice_boletim import codificar_cursor, decodificar_cursor
+from services.respostas import (
+    CompressaoMiddleware,
+    RespostaJSON,
+    cabecalhos_serializacao,
+    escolher_codificacao,
+)
+
 # from scraper import extrair_boletim  # Caso queira rodar o scraper automaticamente
 
-app = FastAPI(title="API CEASA Boletim")
+app = FastAPI(title="API CEASA Boletim", default_response_class=RespostaJSON)
+
+# Caminho da pasta onde o scraper salva os boletins
+PASTA_DOWNLOADS = os.getenv("CEASA_DOWNLOADS", r"D:\ceasa_app\downloads")
+# CEASA_ARQUIVO_DIR, se definido, é o mesmo arquivo Parquet em que o scraper grava
+cache_boletim = CacheBoletim(PASTA_DOWNLOADS, arquivo=os.getenv("CEASA_ARQUIVO_DIR"))
+cache_delta = CacheDelta(cache_boletim.arquivo)
+
+LIMITE_MAXIMO = 1000          # linhas por página
+
+# brotli/gzip negociado acima do tamanho mínimo (services/respostas)
+app.add_middleware(CompressaoMiddleware)
 
 # Permite o acesso do Flutter (CORS liberado)
 app.add_middleware(
@@ -21,35 +44,131 @@ def root():
     return {"status": "online", "mensagem": "API CEASA rodando com sucesso"}
 
 @app.get("/boletim")
-def get_boletim():
-    # Caminho da pasta onde o scraper salva os boletins
-    pasta = r"D:\ceasa_app\downloads"
-
-    # Verifica se há arquivos Excel na pasta
-    arquivos = [f for f in os.listdir(pasta) if f.endswith(".xlsx")]
-    if not arquivos:
-        raise FileNotFoundError("Nenhum boletim encontrado na pasta de downloads.")
-
-    # Localiza o arquivo mais recente (último boletim)
-    arquivo_recente = max(arquivos, key=lambda f: os.path.getmtime(os.path.join(pasta, f)))
-    caminho_excel = os.path.join(pasta, arquivo_recente)
-
-    # Lê o conteúdo do Excel
-    df = pd.read_excel(caminho_excel)
-    df = df.fillna("")
-
-    # Padroniza nomes de colunas (opcional)
-    df.columns = [str(col).strip().replace(" ", "_").upper() for col in df.columns]
-
-    # Metadados da resposta
-    meta = {
-        "mercado": "CEASA Grande Vitória",
-        "data": arquivo_recente.split("_")[1] if "_" in arquivo_recente else "Data desconhecida",
-        "total": len(df)
+def get_boletim(
+    request: Request,
+    prefixo: Optional[str] = None,
+    categoria: Optional[str] = None,
+    subcategoria: Optional[str] = None,
+    preco_min: Optional[float] = None,
+    preco_max: Optional[float] = None,
+    campo_preco: str = "M.C.",
+    colunas: Optional[List[str]] = Query(None),
+    ordem: Optional[str] = None,
+    limite: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+):
+    """
+    Boletim mais recente. Sem parâmetros devolve o boletim inteiro (já
+    serializado em memória); com filtros (prefixo do nome, categoria,
+    subcategoria, faixa de preço), colunas, ordem ("MAX" ou "-MAX") e
+    página (limite + offset ou cursor) devolve só as linhas pedidas.
+    """
+    # Boletim em memória, já serializado; só é relido quando o arquivo muda
+    try:
+        boletim = cache_boletim.atual()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    consulta = str(request.query_params)
+    etag = boletim.etag
+    if consulta:
+        # cada consulta tem sua versão, derivada da do boletim
+        etag = f'"{boletim.etag[1:-1]}-{hashlib.sha256(consulta.encode()).hexdigest()[:12]}"'
+    cabecalhos = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(boletim.modificado_em, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if boletim.versao:
+        # o app guarda para pedir /boletim/delta?desde=<versão> depois
+        cabecalhos["X-Versao-Boletim"] = boletim.versao
+
+    # Cliente já tem esta versão: 304 sem corpo
+    if nao_modificado(request, etag, boletim.modificado_em):
+        return Response(status_code=304, headers=cabecalhos)
+
+    if not consulta:
+        # corpo e variantes comprimidas já prontos no cache
+        cabecalhos.update(cabecalhos_serializacao(len(boletim.corpo), boletim.tempo_serializacao, "cache"))
+        codificacao = escolher_codificacao(request.headers.get("accept-encoding", ""))
+        if codificacao is not None:
+            return Response(boletim.comprimidos[codificacao], media_type="application/json",
+                            headers={**cabecalhos, "Content-Encoding": codificacao})
+        return Response(boletim.corpo, media_type="application/json", headers=cabecalhos)
+
+    indice = boletim.indice
+    if cursor is not None:
+        try:
+            versao, offset = decodificar_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if versao != boletim.etag:
+            raise HTTPException(status_code=410, detail="O boletim mudou; recomece a paginação.")
+    # colunas=PRODUTO,MAX ou colunas=PRODUTO&colunas=MAX
+    colunas = [c.strip() for item in colunas or [] for c in item.split(",") if c.strip()]
+    try:
+        posicoes = indice.filtrar(prefixo, categoria, subcategoria, preco_min, preco_max, campo_preco)
+        if ordem:
+            posicoes = indice.ordenar(posicoes, ordem)
+        total = len(posicoes)
+        fim = total if limite is None else offset + limite
+        dados = indice.registros(posicoes[offset:fim], colunas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return RespostaJSON({
+        "mercado": cache_boletim.mercado,
+        "data": boletim.data,
+        "total": total,
+        "offset": offset,
+        "limite": limite,
+        "proximo_cursor": codificar_cursor(boletim.etag, fim) if fim < total else None,
+        "dados": dados,
+    }, headers=cabecalhos)
+
+
+@app.get("/boletim/delta")
+def get_boletim_delta(request: Request, desde: str):
+    """
+    Só o que mudou no boletim mais recente desde a versão (X-Versao-Boletim
+    ou "versao" de um delta anterior) ou a data do boletim que o cliente
+    tem: produtos novos, alterados (MIN, M.C. ou MAX) e removidos.
+    """
+    try:
+        delta, do_cache = cache_delta.delta(desde)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        # versão que não existe mais: o cliente baixa o /boletim inteiro
+        raise HTTPException(status_code=410, detail=str(e))
+
+    cabecalhos = {
+        "ETag": delta.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Versao-Boletim": delta.versao,
     }
+    if nao_modificado(request, delta.etag):
+        return Response(status_code=304, headers=cabecalhos)
+    cabecalhos.update(cabecalhos_serializacao(len(delta.corpo), delta.tempo_serializacao,
+                                              "cache" if do_cache else None))
+    return Response(delta.corpo, media_type="application/json", headers=cabecalhos)
 
-    # Converte o DataFrame em lista de dicionários
-    dados = df.to_dict(orient="records")
 
-    # Retorna o JSON completo com metadados e dados
-    return {**meta, "dados": dados}
+def nao_modificado(request: Request, etag: str, modificado_em=None) -> bool:
+    """If-None-Match tem prioridade; sem ele, vale o If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+        return "*" in etags or etag in etags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modificado_em is not None:
+        try:
+            return modificado_em <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
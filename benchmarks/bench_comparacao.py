@@ -0,0 +1,91 @@
+# benchmarks/bench_comparacao.py
+"""
+Benchmark da comparação entre dois boletins sintéticos: status/diferenças
+por máscaras (services/comparacao.py) contra o apply por linha antigo.
+
+Uso: python -m benchmarks.bench_comparacao --linhas 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.comparacao import calcular_variacao
+
+
+def gerar_par(linhas: int, semente=42) -> pd.DataFrame:
+    """Junção hoje x anterior com produtos novos e sem preço, como no merge real."""
+    rng = np.random.default_rng(semente)
+    anterior = np.round(rng.lognormal(mean=1.5, sigma=0.6, size=linhas), 2)
+    variacao = rng.choice([-0.5, 0.0, 0.0, 0.25, 0.5], size=linhas)
+    hoje = np.round(anterior + variacao, 2)
+    anterior[rng.random(linhas) < 0.03] = np.nan
+    hoje[rng.random(linhas) < 0.01] = np.nan
+    return pd.DataFrame({
+        "Produto": [f"PRODUTO {i}" for i in range(linhas)],
+        "preco_hoje": hoje,
+        "preco_anterior": anterior,
+    })
+
+
+def _status(row):
+    old = row["preco_anterior"]
+    new = row["preco_hoje"]
+    if pd.isna(old):
+        return "NOVO"
+    if pd.isna(new):
+        return "SEM PREÇO"
+    if new > old:
+        return "SUBIU"
+    if new < old:
+        return "CAIU"
+    return "IGUAL"
+
+
+def antigo(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["dif_abs"] = df["preco_hoje"] - df["preco_anterior"]
+    df["dif_pct"] = (df["dif_abs"] / df["preco_anterior"]) * 100
+    df["status"] = df.apply(_status, axis=1)
+    return df.sort_values(["status", "dif_abs"], ascending=[True, False])
+
+
+def novo(df: pd.DataFrame) -> pd.DataFrame:
+    df = calcular_variacao(df.copy())
+    return df.sort_values(["status", "dif_abs"], ascending=[True, False])
+
+
+def medir(funcao, df, repeticoes=3) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(df)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def executar(linhas=100_000, repeticoes=3) -> dict:
+    df = gerar_par(linhas)
+    # mesmo status nos dois caminhos
+    if not (antigo(df)["status"].sort_index() == novo(df)["status"].astype(str).sort_index()).all():
+        raise AssertionError("status vetorizado difere do apply por linha")
+    resultados = {
+        "linhas": linhas,
+        "antigo_s": medir(antigo, df, repeticoes),
+        "novo_s": medir(novo, df, repeticoes),
+    }
+    resultados["ganho"] = resultados["antigo_s"] / resultados["novo_s"]
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da classificação de variação de preço.")
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    r = executar(args.linhas, args.repeticoes)
+    print(f"{r['linhas']:,} linhas")
+    print(f"  antigo (apply por linha): {r['antigo_s']:.3f} s")
+    print(f"  novo (máscaras)         : {r['novo_s']:.4f} s  ({r['ganho']:.1f}x)")
@@ -0,0 +1,273 @@
+# benchmarks/bench_pipeline.py
+"""
+Benchmark de cada etapa do pipeline de análise sobre boletins sintéticos
+(benchmarks/dados.py) e um SQLite local: leitura (xlsx, sidecar, Parquet),
+comparar_boletins, comparar_com_anterior, montar_relatorio_unificado,
+salvar_excel_formatado e atualizar_dados_ceasa.
+
+Cada etapa roda `repeticoes` vezes (melhor e mediana do tempo) e mais uma
+com tracemalloc para o pico de memória. O resultado vai para um JSON com
+a versão do código (git), para comparar versões com --comparar.
+Roda offline: tudo fica numa pasta temporária.
+
+Uso: python -m benchmarks.bench_pipeline --produtos 800 --dias 30
+     python -m benchmarks.bench_pipeline --comparar antes.json depois.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+TOLERANCIA_REGRESSAO = 0.2   # 20% mais lento (ou mais memória) é regressão
+
+
+def _silencioso():
+    """As etapas imprimem progresso; no benchmark isso só atrapalha."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def medir(executar, preparar=lambda: (), repeticoes=3) -> dict:
+    """Tempo (melhor/mediana) e pico de memória alocada de executar(*preparar())."""
+    tempos = []
+    for _ in range(repeticoes):
+        argumentos = preparar()
+        with _silencioso():
+            inicio = time.perf_counter()
+            executar(*argumentos)
+            tempos.append(time.perf_counter() - inicio)
+
+    argumentos = preparar()
+    tracemalloc.start()
+    try:
+        with _silencioso():
+            executar(*argumentos)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "melhor_s": round(min(tempos), 4),
+        "mediana_s": round(statistics.median(tempos), 4),
+        "pico_mb": round(pico / 2**20, 2),
+        "rss_max_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def versao_codigo() -> str | None:
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+def _preparar_ambiente(pasta: str):
+    """Banco, cache e histórico de preços dentro da pasta do benchmark (antes de importar os módulos)."""
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(pasta, "base.db")
+    os.environ["CEASA_CACHE_DIR"] = os.path.join(pasta, "cache")
+    os.environ["CEASA_HISTORICO_PRECOS"] = os.path.join(pasta, "historico_precos.parquet")
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if raiz not in sys.path:
+        sys.path.insert(0, raiz)
+
+
+def executar(produtos=800, dias=30, repeticoes=3, semente=42, pasta=None) -> dict:
+    temporaria = None
+    if pasta is None:
+        temporaria = tempfile.TemporaryDirectory(prefix="bench_ceasa_")
+        pasta = temporaria.name
+    _preparar_ambiente(pasta)
+
+    # importados aqui: dependem das variáveis de ambiente acima
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import analise_ceasa
+    import comparar_ceasa
+    import models
+    from benchmarks.dados import gerar_boletins, gravar_fixtures
+    from database import engine
+    from services.anomalias import ESTADO_PADRAO
+    from services.arquivo_boletins import SUFIXO_SIDECAR, ler_boletim, listar_arquivados
+    from services.atualizar_ceasa import atualizar_dados_ceasa, ingerir_boletim
+    from services.cache_derivados import CacheDerivados
+    from services.scraper import salvar_excel_formatado
+
+    etapas = {}
+    try:
+        inicio = time.perf_counter()
+        with _silencioso():
+            fixtures = gravar_fixtures(pasta, produtos, dias, semente)
+        etapas["gerar_fixtures"] = {"melhor_s": round(time.perf_counter() - inicio, 4)}
+
+        xlsx_anterior, xlsx_hoje = fixtures["xlsx"]
+        parquet_hoje, parquet_anterior = (b["caminho"] for b in listar_arquivados(2, fixtures["arquivo"]))
+        hoje = ler_boletim(parquet_hoje)
+        anterior = ler_boletim(parquet_anterior)
+
+        # leitura
+        def sem_sidecar():
+            if os.path.exists(xlsx_hoje + SUFIXO_SIDECAR):
+                os.remove(xlsx_hoje + SUFIXO_SIDECAR)
+            return (xlsx_hoje,)
+
+        etapas["carregar_boletim_xlsx"] = medir(comparar_ceasa.carregar_boletim, sem_sidecar, repeticoes)
+        comparar_ceasa.carregar_boletim(xlsx_hoje)
+        etapas["carregar_boletim_sidecar"] = medir(comparar_ceasa.carregar_boletim, lambda: (xlsx_hoje,), repeticoes)
+        etapas["carregar_boletim_parquet"] = medir(comparar_ceasa.carregar_boletim, lambda: (parquet_hoje,), repeticoes)
+
+        # comparações
+        etapas["comparar_boletins"] = medir(
+            comparar_ceasa.comparar_boletins,
+            lambda: (comparar_ceasa.normalizar_boletim(hoje.copy()), comparar_ceasa.normalizar_boletim(anterior.copy())),
+            repeticoes,
+        )
+        base = analise_ceasa.preparar_boletim(hoje)
+        etapas["comparar_com_anterior"] = medir(
+            analise_ceasa.comparar_com_anterior, lambda: (base.copy(), anterior.copy()), repeticoes
+        )
+
+        # planilhas
+        saida = os.path.join(pasta, "saida")
+        etapas["montar_relatorio_unificado"] = medir(
+            lambda h, a: analise_ceasa.montar_relatorio_unificado(h, a, os.path.join(saida, "relatorio.xlsx"), cache=None),
+            lambda: (hoje.copy(), anterior.copy()),
+            repeticoes,
+        )
+        cache = CacheDerivados(os.path.join(pasta, "cache"))
+        with _silencioso():
+            analise_ceasa.montar_relatorio_unificado(hoje.copy(), anterior.copy(), os.path.join(saida, "r.xlsx"), cache)
+        etapas["montar_relatorio_unificado_cache"] = medir(
+            lambda h, a: analise_ceasa.montar_relatorio_unificado(h, a, os.path.join(saida, "relatorio.xlsx"), cache),
+            lambda: (hoje.copy(), anterior.copy()),
+            repeticoes,
+        )
+        etapas["salvar_excel_formatado"] = medir(
+            salvar_excel_formatado, lambda: (hoje, os.path.join(saida, "boletim.xlsx")), repeticoes
+        )
+
+        # banco: histórico dos dias anteriores numa base, cada repetição
+        # ingere o último boletim numa cópia dela
+        boletins = list(gerar_boletins(produtos, dias, semente=semente))
+        models.Base.metadata.create_all(engine)
+        sessao_base = sessionmaker(bind=engine)()
+        inicio = time.perf_counter()
+        with _silencioso():
+            for data, df in boletins[:-1]:
+                ingerir_boletim(sessao_base, df, data_boletim=data)
+        sessao_base.close()
+        etapas["ingestao_historico"] = {
+            "melhor_s": round(time.perf_counter() - inicio, 4),
+            "boletins": len(boletins) - 1,
+        }
+        engine.dispose()
+        shutil.copy(ESTADO_PADRAO, ESTADO_PADRAO + ".base")
+        ultimo = boletins[-1][1]
+        abertas = []
+
+        def banco_copiado():
+            copia = os.path.join(pasta, f"copia_{len(abertas)}.db")
+            shutil.copy(os.path.join(pasta, "base.db"), copia)
+            shutil.copy(ESTADO_PADRAO + ".base", ESTADO_PADRAO)
+            motor = create_engine(f"sqlite:///{copia}")
+            abertas.append(motor)
+            return (sessionmaker(bind=motor)(), ultimo.copy())
+
+        def atualizar(db, df):
+            resumo = atualizar_dados_ceasa(db, df)
+            db.close()
+            if resumo["status"] != "sucesso":
+                raise RuntimeError(resumo["mensagem"])
+
+        etapas["atualizar_dados_ceasa"] = medir(atualizar, banco_copiado, repeticoes)
+        for motor in abertas:
+            motor.dispose()
+    finally:
+        if temporaria is not None:
+            temporaria.cleanup()
+
+    return {
+        "versao": versao_codigo(),
+        "executado_em": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"produtos": produtos, "dias": dias, "repeticoes": repeticoes, "semente": semente},
+        "ambiente": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "etapas": etapas,
+    }
+
+
+def gravar_resultado(resultado: dict, caminho=None) -> str:
+    if caminho is None:
+        os.makedirs(RESULTADOS_DIR, exist_ok=True)
+        carimbo = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        caminho = os.path.join(RESULTADOS_DIR, f"pipeline_{resultado['versao'] or 'sem_git'}_{carimbo}.json")
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    return caminho
+
+
+def comparar_resultados(antes: dict, depois: dict, tolerancia=TOLERANCIA_REGRESSAO) -> list[dict]:
+    """Razão depois/antes do melhor tempo e do pico de memória de cada etapa."""
+    linhas = []
+    for etapa, medido in depois["etapas"].items():
+        anterior = antes["etapas"].get(etapa)
+        if anterior is None:
+            continue
+        linha = {"etapa": etapa}
+        for campo in ("melhor_s", "pico_mb"):
+            if anterior.get(campo) and medido.get(campo) is not None:
+                linha[campo] = round(medido[campo] / anterior[campo], 2)
+        linha["regressao"] = any(v > 1 + tolerancia for k, v in linha.items() if k in ("melhor_s", "pico_mb"))
+        linhas.append(linha)
+    return linhas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do pipeline de análise.")
+    parser.add_argument("--produtos", type=int, default=800)
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="JSON de saída (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara dois JSON gravados")
+    args = parser.parse_args()
+
+    if args.comparar:
+        with open(args.comparar[0], encoding="utf-8") as f:
+            antes = json.load(f)
+        with open(args.comparar[1], encoding="utf-8") as f:
+            depois = json.load(f)
+        print(f"{antes['versao']} -> {depois['versao']} (depois/antes)")
+        for linha in comparar_resultados(antes, depois):
+            marca = "  ⚠️ regressão" if linha["regressao"] else ""
+            print(f"  {linha['etapa']:<34} tempo {linha.get('melhor_s', '-'):>5}x  "
+                  f"memória {linha.get('pico_mb', '-'):>5}x{marca}")
+        raise SystemExit
+
+    r = executar(args.produtos, args.dias, args.repeticoes, args.semente)
+    caminho = gravar_resultado(r, args.saida)
+    print(f"{args.produtos} produtos x {args.dias} dias (versão {r['versao']})")
+    for etapa, medido in r["etapas"].items():
+        memoria = f"  pico {medido['pico_mb']:>7.2f} MB" if "pico_mb" in medido else ""
+        print(f"  {etapa:<34} {medido['melhor_s']:>8.4f} s{memoria}")
+    print(f"📊 Resultado salvo em: {caminho}")
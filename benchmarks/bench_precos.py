@@ -0,0 +1,80 @@
+# benchmarks/bench_precos.py
+"""
+Micro-benchmark da normalização de preços (services/precos.py) em colunas
+sintéticas grandes, contra o jeito antigo (conversão por linha em Python +
+correção da coluna inteira).
+
+Uso: python -m benchmarks.bench_precos --linhas 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.precos import parse_preco_br, corrigir_escala
+
+
+def gerar_coluna_br(linhas: int, semente=42) -> pd.Series:
+    """Preços em texto no formato do site: "4,55", "1.234,50", alguns inválidos."""
+    rng = np.random.default_rng(semente)
+    centavos = rng.lognormal(mean=6.0, sigma=1.2, size=linhas).astype(np.int64)
+    reais, cent = np.divmod(centavos, 100)
+    texto = pd.Series(reais).map("{:,}".format).str.replace(",", ".", regex=False)
+    texto = texto + "," + pd.Series(cent).map("{:02d}".format)
+    invalidos = rng.random(linhas) < 0.01
+    texto[invalidos] = "-"
+    return texto
+
+
+def _parse_por_linha(valor):
+    try:
+        return float(str(valor).replace(".", "").replace(",", "."))
+    except ValueError:
+        return np.nan
+
+
+def antigo(serie: pd.Series) -> pd.Series:
+    valores = serie.apply(_parse_por_linha)
+    if valores.max() and valores.max() > 50:
+        valores = valores / 100
+    return valores
+
+
+def novo(serie: pd.Series) -> pd.Series:
+    return corrigir_escala(parse_preco_br(serie), maximo=50)
+
+
+def medir(funcao, serie, repeticoes=3) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(serie)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def executar(linhas=1_000_000, repeticoes=3) -> dict:
+    serie = gerar_coluna_br(linhas)
+    numerica = parse_preco_br(serie)
+    resultados = {
+        "linhas": linhas,
+        "antigo_texto_s": medir(antigo, serie, repeticoes),
+        "novo_texto_s": medir(novo, serie, repeticoes),
+        "novo_numerico_s": medir(lambda s: corrigir_escala(parse_preco_br(s), maximo=50), numerica, repeticoes),
+    }
+    resultados["ganho_texto"] = resultados["antigo_texto_s"] / resultados["novo_texto_s"]
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da normalização de preços.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    r = executar(args.linhas, args.repeticoes)
+    print(f"{r['linhas']:,} linhas")
+    print(f"  antigo (apply por linha) : {r['antigo_texto_s']:.3f} s")
+    print(f"  novo (texto BR)          : {r['novo_texto_s']:.3f} s  ({r['ganho_texto']:.1f}x)")
+    print(f"  novo (coluna já numérica): {r['novo_numerico_s']:.4f} s")
@@ -0,0 +1,135 @@
+# benchmarks/dados.py
+"""
+Boletins sintéticos determinísticos para os benchmarks: N produtos, M dias,
+no formato da grade do site (Produto, Embalagem, MIN, M.C., MAX, Grupo,
+preços em texto "4,55" / "1.234,50") com nomes parecidos com os reais.
+
+Cada produto segue um passeio aleatório de preço a partir de uma base;
+alguns dias faltam produtos e, se pedido, uma fração dos preços vem 100x
+fora da escala (o erro que as análises corrigem).
+
+Uso: python -m benchmarks.dados --produtos 800 --dias 30 --pasta /tmp/ceasa
+"""
+import argparse
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# (nome, grupo, embalagem, preço base em R$)
+BASES = [
+    ("ABACAXI PÉROLA", "FRUTAS", "UN", 4.0), ("BANANA PRATA", "FRUTAS", "KG", 3.8),
+    ("BANANA NANICA", "FRUTAS", "KG", 2.6), ("LARANJA PÊRA", "FRUTAS", "KG", 2.3),
+    ("LIMÃO TAHITI", "FRUTAS", "KG", 3.2), ("MAMÃO PAPAYA", "FRUTAS", "KG", 4.55),
+    ("MAÇÃ NACIONAL", "FRUTAS", "KG", 8.5), ("MELANCIA", "FRUTAS", "KG", 1.5),
+    ("UVA NIÁGARA", "FRUTAS", "KG", 10.0), ("GOIABA", "FRUTAS", "KG", 5.0),
+    ("MANGA PALMER", "FRUTAS", "KG", 4.2), ("MARACUJÁ AZEDO", "FRUTAS", "KG", 6.0),
+    ("ALFACE CRESPA", "HORTALIÇAS", "MÇ", 2.0), ("BATATA INGLESA", "HORTALIÇAS", "KG", 4.2),
+    ("BETERRABA", "HORTALIÇAS", "KG", 2.5), ("CENOURA", "HORTALIÇAS", "KG", 3.3),
+    ("CHUCHU", "HORTALIÇAS", "KG", 1.4), ("COUVE", "HORTALIÇAS", "MÇ", 2.2),
+    ("PIMENTÃO VERDE", "HORTALIÇAS", "KG", 3.8), ("REPOLHO", "HORTALIÇAS", "KG", 1.6),
+    ("TOMATE LONGA VIDA", "HORTALIÇAS", "KG", 5.5), ("MANDIOCA", "HORTALIÇAS", "KG", 3.0),
+    ("CEBOLA NACIONAL", "HORTALIÇAS", "KG", 3.9), ("ALHO ROXO", "HORTALIÇAS", "KG", 22.0),
+    ("FEIJÃO CARIOCA", "CEREAIS", "SC 60KG", 320.0), ("ARROZ AGULHINHA", "CEREAIS", "SC 30KG", 140.0),
+    ("MILHO VERDE", "CEREAIS", "DZ", 9.0), ("TILÁPIA", "PESCADOS", "KG", 18.0),
+    ("CAMARÃO CINZA", "PESCADOS", "KG", 65.0), ("SARDINHA", "PESCADOS", "KG", 12.0),
+]
+VARIEDADES = ["", "EXTRA", "ESPECIAL", "PRIMEIRA", "SEGUNDA", "GRAÚDO", "MIÚDO", "ORGÂNICO",
+              "CAPIXABA", "MINEIRO", "BAIANO", "PAULISTA", "A", "AA", "AAA"]
+
+
+def gerar_catalogo(produtos: int, semente=42) -> pd.DataFrame:
+    """Nome, embalagem, grupo e preço base de cada produto (nomes únicos)."""
+    rng = np.random.default_rng(semente)
+    nomes, embalagens, grupos, precos = [], [], [], []
+    vistos = set()
+    while len(nomes) < produtos:
+        nome, grupo, embalagem, base = BASES[rng.integers(len(BASES))]
+        variedade = VARIEDADES[rng.integers(len(VARIEDADES))]
+        completo = f"{nome} {variedade}".strip()
+        if completo in vistos:
+            # catálogo grande: numera o lote como "TIPO 2", "TIPO 3"...
+            completo = f"{completo} TIPO {len(nomes)}"
+        vistos.add(completo)
+        nomes.append(completo)
+        embalagens.append(embalagem)
+        grupos.append(grupo)
+        precos.append(base * rng.uniform(0.7, 1.4))
+    return pd.DataFrame({"Produto": nomes, "Embalagem": embalagens, "Grupo": grupos, "base": precos})
+
+
+def preco_br(valores: np.ndarray) -> pd.Series:
+    """Float em texto no formato do site: 1234.5 -> "1.234,50" (NaN vira "-")."""
+    texto = pd.Series(valores).map("{:,.2f}".format, na_action="ignore")
+    texto = texto.str.replace(",", "_", regex=False).str.replace(".", ",", regex=False)
+    return texto.str.replace("_", ".", regex=False).fillna("-")
+
+
+def gerar_boletins(produtos=800, dias=30, inicio=date(2025, 1, 6), semente=42, ausencia=0.03,
+                   erros_escala=0.0):
+    """
+    Gera (data, DataFrame) de cada dia útil, do mais antigo ao mais novo,
+    sempre igual para a mesma semente. Os DataFrames saem como a grade do
+    site (preços em texto) com a coluna Data "dd/mm/aaaa".
+    """
+    rng = np.random.default_rng(semente)
+    catalogo = gerar_catalogo(produtos, semente)
+    preco = catalogo["base"].to_numpy()
+    data = inicio
+    for _ in range(dias):
+        while data.weekday() >= 5:   # boletim só em dia útil
+            data += timedelta(days=1)
+        preco = np.maximum(preco * np.exp(rng.normal(0, 0.03, produtos)), 0.1)
+        mc = np.round(preco, 2)
+        minimo = np.round(mc * rng.uniform(0.75, 0.95, produtos), 2)
+        maximo = np.round(mc * rng.uniform(1.05, 1.3, produtos), 2)
+        if erros_escala:
+            errados = rng.random(produtos) < erros_escala
+            mc = np.where(errados, mc * 100, mc)
+        presentes = rng.random(produtos) >= ausencia
+        df = pd.DataFrame({
+            "Produto": catalogo["Produto"],
+            "Embalagem": catalogo["Embalagem"],
+            "MIN": preco_br(minimo),
+            "M.C.": preco_br(mc),
+            "MAX": preco_br(maximo),
+            "Grupo": catalogo["Grupo"],
+        })[presentes].reset_index(drop=True)
+        df["Data"] = data.strftime("%d/%m/%Y")
+        yield data, df
+        data += timedelta(days=1)
+
+
+def gravar_fixtures(pasta: str, produtos=800, dias=30, semente=42, xlsx=2) -> dict:
+    """
+    Grava os boletins no arquivo Parquet (pasta/arquivo) e os `xlsx` mais
+    recentes como xlsx legados (pasta/boletim_<data>_00-00-00.xlsx), com
+    os preços já normalizados como o scraper grava.
+    """
+    from services.arquivo_boletins import arquivar_boletim
+    from services.precos import normalizar_colunas_preco
+    from services.scraper import salvar_excel_formatado
+
+    os.makedirs(pasta, exist_ok=True)
+    boletins = list(gerar_boletins(produtos, dias, semente=semente))
+    arquivo = os.path.join(pasta, "arquivo")
+    xlsx_gerados = []
+    for i, (data, df) in enumerate(boletins):
+        df = normalizar_colunas_preco(df.copy())
+        arquivar_boletim(df, data, arquivo)
+        if i >= len(boletins) - xlsx:
+            xlsx_gerados.append(salvar_excel_formatado(df, os.path.join(pasta, f"boletim_{data.isoformat()}_00-00-00.xlsx")))
+    return {"arquivo": arquivo, "xlsx": xlsx_gerados, "datas": [d.isoformat() for d, _ in boletins]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera boletins sintéticos (arquivo Parquet + xlsx).")
+    parser.add_argument("--produtos", type=int, default=800)
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--pasta", default=os.path.join("downloads", "sintetico"))
+    args = parser.parse_args()
+
+    gerados = gravar_fixtures(args.pasta, args.produtos, args.dias, args.semente)
+    print(f"{len(gerados['datas'])} boletins em {gerados['arquivo']}; xlsx: {', '.join(gerados['xlsx'])}")
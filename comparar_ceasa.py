@@ -2,10 +2,23 @@ import os
 from datetime import datetime
 import pandas as pd
 
+from services.anomalias import HistoricoPrecos, corrigir_coluna
+from services.arquivo_boletins import ARQUIVO_DIR, listar_arquivados, ler_boletim
+from services.canonico import chaves_para_comparar
+from services.comparacao import calcular_variacao, comparar_arquivo
+from services.exportar import criar_writer, escrever_aba
+
 DOWNLOAD_DIR = "downloads"
+LIMITE_PRECO_100 = 50
+
 
+def listar_boletins(pasta=DOWNLOAD_DIR, n=None, arquivo=ARQUIVO_DIR):
+    # boletins arquivados (onde o scraper grava): o manifesto já vem ordenado, sem varrer a pasta
+    arquivados = listar_arquivados(n, arquivo)
+    if arquivados:
+        return [b["caminho"] for b in arquivados]
 
-def listar_boletins(pasta=DOWNLOAD_DIR):
+    # legado: xlsx soltos em downloads/
     pasta_abs = os.path.abspath(pasta)
     arquivos = [
         os.path.join(pasta_abs, f)
@@ -13,7 +26,7 @@ def listar_boletins(pasta=DOWNLOAD_DIR):
         if f.startswith("boletim_") and f.endswith(".xlsx")
     ]
     arquivos.sort(key=os.path.getmtime, reverse=True)
-    return arquivos
+    return arquivos[:n]
 
 
 def detectar_coluna_produto(df: pd.DataFrame) -> str:
@@ -31,19 +44,27 @@ def escolher_coluna_preco(df: pd.DataFrame):
     return None
 
 
-def normalizar_col_preco_100(df: pd.DataFrame, col: str):
-    """Se a coluna veio como 455 em vez de 4,55, divide por 100."""
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-    if df[col].max() and df[col].max() > 50:
-        df[col] = df[col] / 100
+def normalizar_col_preco_100(df: pd.DataFrame, col: str, historico: HistoricoPrecos | None = None):
+    """
+    Valores que vieram como 455 em vez de 4,55 são divididos por 100 (um a
+    um), pelo histórico do produto; sem histórico, quando passam de
+    LIMITE_PRECO_100.
+    """
+    df[col] = corrigir_coluna(historico, df[detectar_coluna_produto(df)], df[col], col, maximo=LIMITE_PRECO_100)
     return df
 
 
-def carregar_boletim(caminho: str) -> pd.DataFrame:
-    df = pd.read_excel(caminho, sheet_name="Boletim")
+def carregar_boletim(caminho: str, colunas=None, compacto=True, relatar=False,
+                     historico: HistoricoPrecos | None = None) -> pd.DataFrame:
+    """Lê só as colunas pedidas (texto categórico, preços float32) e normaliza o preço."""
+    return normalizar_boletim(ler_boletim(caminho, colunas, compacto=compacto, relatar=relatar), historico)
+
+
+def normalizar_boletim(df: pd.DataFrame, historico: HistoricoPrecos | None = None) -> pd.DataFrame:
+    """Corrige a escala da coluna de preço usada na comparação."""
     col_preco = escolher_coluna_preco(df)
     if col_preco:
-        df = normalizar_col_preco_100(df, col_preco)
+        df = normalizar_col_preco_100(df, col_preco, historico)
     return df
 
 
@@ -57,9 +78,12 @@ def comparar_boletins(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame, n_dias_lab
     if not col_preco_hoje or not col_preco_ant:
         raise ValueError("Não encontrei coluna de preço em um dos boletins.")
 
-    # normaliza produto pra comparar (mais simples: tudo minúsculo)
-    df_hoje["_key_prod"] = df_hoje[col_prod_hoje].astype(str).str.strip().str.lower()
-    df_antigo["_key_prod"] = df_antigo[col_prod_ant].astype(str).str.strip().str.lower()
+    # chave de junção pelo nome canônico (sem acento/unidade, palavras em
+    # ordem); nomes do anterior são casados por similaridade com os de hoje
+    df_hoje["_key_prod"], df_antigo["_key_prod"] = chaves_para_comparar(
+        df_hoje[col_prod_hoje], df_antigo[col_prod_ant]
+    )
+    df_antigo = df_antigo.drop_duplicates("_key_prod", keep="last")
 
     # faz o merge
     df_join = pd.merge(
@@ -72,25 +96,8 @@ def comparar_boletins(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame, n_dias_lab
     # renomeia o preço de hoje pra ficar claro
     df_join = df_join.rename(columns={col_preco_hoje: "preco_hoje"})
 
-    # calcula diferença
-    df_join["dif_abs"] = df_join["preco_hoje"] - df_join[f"preco_{n_dias_label}"]
-    df_join["dif_pct"] = (df_join["dif_abs"] / df_join[f"preco_{n_dias_label}"]) * 100
-
-    # status
-    def status(row):
-        old = row[f"preco_{n_dias_label}"]
-        new = row["preco_hoje"]
-        if pd.isna(old):
-            return "NOVO"
-        if pd.isna(new):
-            return "SEM PREÇO"
-        if new > old:
-            return "SUBIU"
-        if new < old:
-            return "CAIU"
-        return "IGUAL"
-
-    df_join["status"] = df_join.apply(status, axis=1)
+    # diferenças e status (categórico ordenado)
+    df_join = calcular_variacao(df_join, "preco_hoje", f"preco_{n_dias_label}")
 
     # ordena pra ficar bonitinho: quem subiu primeiro
     df_join = df_join.sort_values(["status", "dif_abs"], ascending=[True, False])
@@ -98,9 +105,8 @@ def comparar_boletins(df_hoje: pd.DataFrame, df_antigo: pd.DataFrame, n_dias_lab
     return df_join, col_prod_hoje
 
 
-def salvar_comparativo(df_comp: pd.DataFrame, col_prod: str, caminho: str):
-    os.makedirs(os.path.dirname(caminho), exist_ok=True)
-    with pd.ExcelWriter(caminho, engine="xlsxwriter") as writer:
+def salvar_comparativo(df_comp: pd.DataFrame, col_prod: str, caminho: str, df_horizontes: pd.DataFrame | None = None):
+    with criar_writer(caminho) as writer:
         # planilha principal
         cols = [
             col_prod,
@@ -114,46 +120,33 @@ def salvar_comparativo(df_comp: pd.DataFrame, col_prod: str, caminho: str):
         if "Data" in df_comp.columns:
             cols.append("Data")
 
-        df_comp.to_excel(writer, sheet_name="Comparativo", index=False, columns=cols)
-        wb = writer.book
-        ws = writer.sheets["Comparativo"]
-
-        header_fmt = wb.add_format({"bold": True, "bg_color": "#D9D9D9"})
-        num_fmt = wb.add_format({"num_format": "#,##0.00"})
-        pct_fmt = wb.add_format({"num_format": "0.00%"})
-
-        for i, c in enumerate(cols):
-            ws.write(0, i, c, header_fmt)
-            ws.set_column(i, i, 18)
-
-        # formata as numéricas
-        if "preco_hoje" in cols:
-            idx = cols.index("preco_hoje")
-            ws.set_column(idx, idx, 12, num_fmt)
-        if "preco_anterior" in cols:
-            idx = cols.index("preco_anterior")
-            ws.set_column(idx, idx, 14, num_fmt)
-        if "dif_abs" in cols:
-            idx = cols.index("dif_abs")
-            ws.set_column(idx, idx, 12, num_fmt)
-        if "dif_pct" in cols:
-            idx = cols.index("dif_pct")
-            ws.set_column(idx, idx, 12, pct_fmt)
+        escrever_aba(
+            writer,
+            df_comp[cols],
+            "Comparativo",
+            formatos={"dif_pct": "0.00%"},
+            larguras={col_prod: 18, "preco_hoje": 12, "preco_anterior": 14,
+                      "dif_abs": 12, "dif_pct": 12, "status": 18, "Data": 18},
+        )
 
         # cria duas abas extras: subiu e caiu
         df_subiu = df_comp[df_comp["status"] == "SUBIU"]
         df_caiu = df_comp[df_comp["status"] == "CAIU"]
         df_novo = df_comp[df_comp["status"] == "NOVO"]
 
-        df_subiu.to_excel(writer, sheet_name="Subiu", index=False)
-        df_caiu.to_excel(writer, sheet_name="Caiu", index=False)
-        df_novo.to_excel(writer, sheet_name="Novos", index=False)
+        escrever_aba(writer, df_subiu, "Subiu")
+        escrever_aba(writer, df_caiu, "Caiu")
+        escrever_aba(writer, df_novo, "Novos")
+
+        # D-1 / D-7 / D-30 / ano anterior lado a lado (comparar_arquivo)
+        if df_horizontes is not None:
+            escrever_aba(writer, df_horizontes, "Horizontes")
 
     print(f"✅ Comparativo salvo em: {caminho}")
 
 
 if __name__ == "__main__":
-    boletins = listar_boletins()
+    boletins = listar_boletins(n=2)
     if len(boletins) < 2:
         print("Só encontrei um boletim. Gere outro amanhã pra comparar 😉")
         raise SystemExit
@@ -166,12 +159,20 @@ if __name__ == "__main__":
     print(f"Boletim de hoje:    {caminho_hoje}")
     print(f"Boletim anterior:   {caminho_ontem}")
 
-    df_hoje = carregar_boletim(caminho_hoje)
-    df_ontem = carregar_boletim(caminho_ontem)
+    # histórico de preços por produto (python -m services.anomalias)
+    historico = HistoricoPrecos.carregar()
+    df_hoje = carregar_boletim(caminho_hoje, relatar=True, historico=historico)
+    df_ontem = carregar_boletim(caminho_ontem, relatar=True, historico=historico)
 
     # faz a comparação
     df_comp, col_prod = comparar_boletins(df_hoje, df_ontem, n_dias_label="anterior")
 
+    # horizontes a partir do arquivo Parquet (se houver)
+    try:
+        df_horizontes = comparar_arquivo(pasta=ARQUIVO_DIR)
+    except FileNotFoundError:
+        df_horizontes = None
+
     # salva
     saida = os.path.join(DOWNLOAD_DIR, "comparativo_ceasa.xlsx")
-    salvar_comparativo(df_comp, col_prod, saida)
+    salvar_comparativo(df_comp, col_prod, saida, df_horizontes)
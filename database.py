@@ -7,6 +7,10 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# DATABASE_URL (ex.: sqlite:///bench.db) troca o SQL Server por outro banco,
+# para os benchmarks rodarem numa máquina sem ODBC
+DATABASE_URL = os.getenv("DATABASE_URL")
+
 DB_SERVER = os.getenv("DB_SERVER")
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
@@ -19,7 +23,13 @@ params = urllib.parse.quote_plus(
     f"UID={DB_USER};PWD={DB_PASSWORD}"
 )
 
-engine = create_engine(f"mssql+pyodbc:///?odbc_connect={params}", echo=True)
+if DATABASE_URL:
+    engine = create_engine(DATABASE_URL)
+else:
+    # fast_executemany faz o pyodbc enviar os executemany da ingestão em lote
+    engine = create_engine(
+        f"mssql+pyodbc:///?odbc_connect={params}", echo=True, fast_executemany=True
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
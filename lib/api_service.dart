@@ -22,4 +22,18 @@ class ApiService {
       throw Exception('Erro ao carregar vendas');
     }
   }
+
+  // Só o que mudou no boletim desde a versão que o app já tem
+  // (cabeçalho X-Versao-Boletim do /boletim ou "versao" do último delta).
+  // 410: a versão saiu do arquivo, baixe o /boletim inteiro.
+  Future<Map<String, dynamic>> getBoletimDelta(String desde) async {
+    final response = await http.get(
+      Uri.parse('$baseUrl/boletim/delta').replace(queryParameters: {'desde': desde}),
+    );
+    if (response.statusCode == 200) {
+      return jsonDecode(utf8.decode(response.bodyBytes));
+    } else {
+      throw Exception('Erro ao carregar alterações do boletim');
+    }
+  }
 }
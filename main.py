@@ -2,12 +2,13 @@ from fastapi import FastAPI, Depends
 from sqlalchemy.orm import Session
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
-from routes import produtos, clientes, vendas, relatorios, usuarios, estoque, auth
+from routes import produtos, clientes, vendas, relatorios, usuarios, estoque, auth, boletins, exportar
 
 import time
 
 from database import SessionLocal
 from services.atualizar_ceasa import atualizar_dados_ceasa
+from services.respostas import CompressaoMiddleware, RespostaJSON
 from routes import produtos, clientes
 
 # ======================================================
@@ -17,9 +18,13 @@ from routes import produtos, clientes
 app = FastAPI(
     title="CEASA App API",
     version="1.0",
-    description="API do Sistema CEASA - Controle de produtos, clientes e boletins automáticos."
+    description="API do Sistema CEASA - Controle de produtos, clientes e boletins automáticos.",
+    default_response_class=RespostaJSON,
 )
 
+# JSON rápido (orjson) e brotli/gzip negociado nas respostas grandes
+app.add_middleware(CompressaoMiddleware)
+
 
 # ======================================================
 # Conexão com o Banco de Dados
@@ -104,6 +109,8 @@ app.include_router(relatorios.router)
 app.include_router(usuarios.router)
 app.include_router(estoque.router)
 app.include_router(auth.router)
+app.include_router(boletins.router)
+app.include_router(exportar.router)
 
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, DECIMAL, Date, CheckConstraint
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, DECIMAL, Date, CheckConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -128,6 +128,10 @@ class Meta(Base):
 # =======================
 class BoletimCeasa(Base):
     __tablename__ = "boletins_ceasa"
+    __table_args__ = (
+        # um preço por produto em cada boletim: reingestões não duplicam
+        Index("ux_boletins_ceasa_data_produto", "data_boletim", "produto", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     data_boletim = Column(Date, nullable=False)
@@ -137,3 +141,35 @@ class BoletimCeasa(Base):
     preco_medio = Column(DECIMAL(10, 2))
     origem = Column(String(100))
     criado_em = Column(DateTime, default=datetime.now)
+
+
+# =======================
+# TABELA: INGESTOES_BOLETIM
+# =======================
+class IngestaoBoletim(Base):
+    __tablename__ = "ingestoes_boletim"
+
+    id = Column(Integer, primary_key=True, index=True)
+    data_boletim = Column(Date, nullable=False, unique=True)
+    hash_conteudo = Column(String(64), nullable=False)
+    linhas = Column(Integer, default=0)
+    criado_em = Column(DateTime, default=datetime.now)
+    atualizado_em = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+# =======================
+# TABELA: ALIASES_PRODUTO
+# =======================
+class AliasProduto(Base):
+    __tablename__ = "aliases_produto"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # nome normalizado (services/canonico.normalizar_nome) -> nome canônico
+    chave = Column(String(150), nullable=False, unique=True)
+    nome_canonico = Column(String(100), nullable=False)
+    chave_canonica = Column(String(150), nullable=False, index=True)
+    origem = Column(String(20), default="exato")  # exato | aproximado | manual
+    similaridade = Column(DECIMAL(4, 3))
+    # sugestões aproximadas ficam inativas até alguém confirmar
+    ativo = Column(Boolean, nullable=False, default=True)
+    criado_em = Column(DateTime, default=datetime.now)
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from datetime import date
+from typing import List, Optional
+
+from services.series_boletim import (
+    CAMPOS_PRECO,
+    DIAS_PADRAO,
+    JANELA_PADRAO,
+    series_de_preco,
+    resumo_atual,
+)
+
+router = APIRouter(prefix="/boletins", tags=["Boletins"])
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _validar_campo(campo: str):
+    if campo not in CAMPOS_PRECO:
+        raise HTTPException(status_code=400, detail=f"campo deve ser um de {', '.join(CAMPOS_PRECO)}")
+
+
+@router.get("/serie")
+def serie_precos(
+    produtos: Optional[List[str]] = Query(None),
+    janela: int = Query(JANELA_PADRAO, ge=1, le=365),
+    dias: int = Query(DIAS_PADRAO, ge=1, le=3650),
+    campo: str = "preco_medio",
+    ate: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """Séries de preço com média móvel, volatilidade, mín/máx de 52 semanas e variação %"""
+    _validar_campo(campo)
+    return series_de_preco(db, produtos, janela, dias, campo, ate)
+
+
+@router.get("/serie/resumo")
+def serie_resumo(
+    produtos: Optional[List[str]] = Query(None),
+    janela: int = Query(JANELA_PADRAO, ge=1, le=365),
+    campo: str = "preco_medio",
+    db: Session = Depends(get_db),
+):
+    """Último ponto da série de cada produto"""
+    _validar_campo(campo)
+    return resumo_atual(db, produtos, janela, campo)
+
+
+@router.get("/serie/{produto}")
+def serie_produto(
+    produto: str,
+    janela: int = Query(JANELA_PADRAO, ge=1, le=365),
+    dias: int = Query(DIAS_PADRAO, ge=1, le=3650),
+    campo: str = "preco_medio",
+    ate: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """Série de preço de um produto"""
+    _validar_campo(campo)
+    series = series_de_preco(db, [produto], janela, dias, campo, ate)
+    if not series:
+        raise HTTPException(status_code=404, detail="Produto sem histórico de boletins")
+    return series[0]
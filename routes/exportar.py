@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from database import SessionLocal
+from datetime import date
+from typing import Optional
+
+from services.exportar_stream import FORMATOS, TAMANHO_LOTE, exportar
+
+router = APIRouter(prefix="/exportar", tags=["Exportação"])
+
+
+@router.get("/{tabela}")
+def exportar_tabela(
+    tabela: str,
+    formato: str = "ndjson",
+    de: Optional[date] = None,
+    ate: Optional[date] = None,
+    lote: int = Query(TAMANHO_LOTE, ge=100, le=50_000),
+):
+    """
+    Exporta boletins, vendas (uma linha por item) ou estoque do período,
+    em NDJSON, CSV ou Parquet, em fluxo: lido do banco e enviado em lotes.
+    """
+    if de is not None and ate is not None and de > ate:
+        raise HTTPException(status_code=400, detail="de deve ser anterior a ate")
+    try:
+        pedacos = exportar(SessionLocal, tabela, formato, de, ate, lote)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    tipo, extensao = FORMATOS[formato]
+    nome = "_".join([tabela] + [d.isoformat() for d in (de, ate) if d is not None])
+    return StreamingResponse(
+        pedacos,
+        media_type=tipo,
+        headers={"Content-Disposition": f'attachment; filename="{nome}.{extensao}"'},
+    )
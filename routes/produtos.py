@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from database import SessionLocal
 from models import Produto
 from schemas import ProdutoCreate, ProdutoUpdate, ProdutoResponse
-from typing import List
+from services.canonico import confirmar_sugestao, sugestoes_pendentes
+from typing import List, Optional
 
 router = APIRouter(prefix="/produtos", tags=["Produtos"])
 
@@ -38,6 +39,27 @@ def listar_produtos(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
     produtos = db.query(Produto).offset(skip).limit(limit).all()
     return produtos
 
+# =======================
+# Sugestões de nome canônico (casamentos aproximados pendentes)
+# =======================
+@router.get("/aliases/sugestoes")
+def listar_sugestoes(db: Session = Depends(get_db)):
+    sugestoes = sugestoes_pendentes(db)
+    return sugestoes[["chave", "nome_canonico", "chave_canonica"]].to_dict(orient="records")
+
+
+@router.post("/aliases/sugestoes/confirmar")
+def decidir_sugestao(chave: str, aceitar: bool = True, nome: Optional[str] = None, db: Session = Depends(get_db)):
+    """aceitar=true junta a chave ao canônico sugerido; aceitar=false a mantém como produto próprio (com nome)."""
+    try:
+        confirmar_sugestao(db, chave, aceitar, nome)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    db.commit()
+    return {"mensagem": "Sugestão aceita." if aceitar else "Sugestão recusada."}
+
 # =======================
 # Buscar produto por ID
 # =======================
@@ -0,0 +1,315 @@
+# services/anomalias.py
+"""
+Detecção de preços fora do padrão pelo histórico de cada produto.
+
+Em vez do "divide por 100 se max > 50" aplicado à coluna inteira, cada
+preço novo é comparado com os últimos JANELA_HISTORICO preços do mesmo
+produto (chave canônica):
+
+  razão   preço / mediana do histórico
+  z       (preço - mediana) / (1,4826 * MAD), o z-score robusto
+
+Preço com |z| > LIMIAR_Z e razão fora de [1/FAIXA_RAZAO, FAIXA_RAZAO] é
+suspeito. Se dividir (ou multiplicar) por 100 o traz de volta para dentro
+dos limites, é erro de escala e é corrigido; senão fica para revisão.
+Produto com menos de MIN_HISTORICO preços não é avaliado (o chamador pode
+cair na heurística antiga).
+
+O histórico é mantido incrementalmente, um boletim por vez: uma matriz
+produto x janela x coluna de preço usada como anel, gravada em Parquet
+(historico_precos.parquet). Cada boletim novo só lê o estado, avalia e
+escreve uma posição do anel; o histórico completo nunca é relido.
+
+Uso: python -m services.anomalias [arquivo|banco]
+"""
+import json
+import os
+import sys
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.arquivo_boletins import ARQUIVO_DIR, COLUNAS_PRECO, listar_arquivados, ler_boletim, data_iso
+from services.canonico import normalizar_nome
+from services.precos import corrigir_escala, parse_preco_br
+
+ESTADO_PADRAO = os.getenv("CEASA_HISTORICO_PRECOS", os.path.join(ARQUIVO_DIR, "historico_precos.parquet"))
+JANELA_HISTORICO = 20      # boletins por produto
+MIN_HISTORICO = 3
+LIMIAR_Z = 3.5             # Iglewicz-Hoaglin
+FAIXA_RAZAO = 1.5
+MAD_MINIMO_REL = 0.01      # preço que nunca mudou ainda tem alguma escala
+FATORES_ESCALA = (100.0, 0.01)   # veio 455 em vez de 4,55 / 0.0455 em vez de 4,55
+
+# colunas do banco (boletins_ceasa) na ordem de COLUNAS_PRECO
+CAMPOS_BANCO = {"MIN": "preco_min", "M.C.": "preco_medio", "MAX": "preco_max"}
+
+STATUS_ANOMALIA = pd.CategoricalDtype(
+    ["CORRIGIDO", "REVISAR", "SEM HISTÓRICO", "SEM PREÇO", "OK"], ordered=True
+)
+
+
+class HistoricoPrecos:
+    """Últimos `janela` preços de cada produto, em anel, para as colunas de preço."""
+
+    def __init__(self, janela=JANELA_HISTORICO, colunas=COLUNAS_PRECO):
+        self.janela = janela
+        self.colunas = list(colunas)
+        self.ultima_data: str | None = None
+        self._linha: dict[str, int] = {}
+        self._valores = np.full((0, janela, len(self.colunas)), np.nan)
+        self._pos = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._linha)
+
+    @property
+    def versao(self) -> str:
+        """Muda a cada boletim registrado (para chaves de cache)."""
+        return f"{self.ultima_data}_{len(self)}_{self.janela}"
+
+    def _linhas(self, chaves: np.ndarray, criar=False) -> np.ndarray:
+        linhas = np.fromiter((self._linha.get(c, -1) for c in chaves), dtype=np.int64, count=len(chaves))
+        if criar and (linhas < 0).any():
+            novas = pd.unique(chaves[linhas < 0])
+            inicio = len(self._linha)
+            self._linha.update(zip(novas, range(inicio, inicio + len(novas))))
+            extra = np.full((len(novas), self.janela, len(self.colunas)), np.nan)
+            self._valores = np.concatenate([self._valores, extra])
+            self._pos = np.concatenate([self._pos, np.zeros(len(novas), dtype=np.int64)])
+            linhas = np.fromiter((self._linha[c] for c in chaves), dtype=np.int64, count=len(chaves))
+        return linhas
+
+    def estatisticas(self, chaves, colunas=None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Mediana, MAD e quantidade de preços (linhas x colunas) de cada chave."""
+        idx = [self.colunas.index(c) for c in (colunas or self.colunas)]
+        linhas = self._linhas(np.asarray(chaves, dtype=object))
+        janelas = np.full((len(linhas), self.janela, len(idx)), np.nan)
+        conhecidas = linhas >= 0
+        janelas[conhecidas] = self._valores[linhas[conhecidas]][:, :, idx]
+        with warnings.catch_warnings():
+            # produto sem nenhum preço: mediana NaN, sem aviso
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mediana = np.nanmedian(janelas, axis=1)
+            mad = np.nanmedian(np.abs(janelas - mediana[:, None, :]), axis=1)
+        return mediana, mad, (~np.isnan(janelas)).sum(axis=1)
+
+    def registrar(self, chaves, precos: np.ndarray, data=None):
+        """Acrescenta o preço de hoje de cada chave (a última, se repetir) ao anel."""
+        chaves = np.asarray(chaves, dtype=object)
+        precos = np.asarray(precos, dtype="float64").reshape(len(chaves), len(self.colunas))
+        com_preco = (chaves != "") & ~np.isnan(precos).all(axis=1)
+        chaves, precos = chaves[com_preco], precos[com_preco]
+        _, ultimas = np.unique(chaves[::-1], return_index=True)
+        ultimas = len(chaves) - 1 - ultimas
+        chaves, precos = chaves[ultimas], precos[ultimas]
+
+        linhas = self._linhas(chaves, criar=True)
+        self._valores[linhas, self._pos[linhas]] = precos
+        self._pos[linhas] = (self._pos[linhas] + 1) % self.janela
+        if data is not None:
+            self.ultima_data = data_iso(data)
+
+    # ---------------------------------------------
+    # persistência
+    # ---------------------------------------------
+    def salvar(self, caminho=ESTADO_PADRAO):
+        chaves = sorted(self._linha, key=self._linha.get)
+        largura = self.janela * len(self.colunas)
+        tabela = pa.table({
+            "chave": pa.array(chaves, pa.string()),
+            "pos": pa.array(self._pos, pa.int16()),
+            "precos": pa.FixedSizeListArray.from_arrays(pa.array(self._valores.reshape(-1)), largura),
+        })
+        metadados = {"janela": self.janela, "colunas": self.colunas, "ultima_data": self.ultima_data}
+        tabela = tabela.replace_schema_metadata({b"ceasa_historico": json.dumps(metadados).encode()})
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        pq.write_table(tabela, temporario)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho=ESTADO_PADRAO) -> "HistoricoPrecos":
+        """Estado gravado ou um histórico vazio se o arquivo não existir."""
+        if not os.path.exists(caminho):
+            return cls()
+        tabela = pq.read_table(caminho)
+        metadados = json.loads(tabela.schema.metadata[b"ceasa_historico"])
+        historico = cls(metadados["janela"], metadados["colunas"])
+        historico.ultima_data = metadados["ultima_data"]
+        chaves = tabela.column("chave").to_pylist()
+        historico._linha = dict(zip(chaves, range(len(chaves))))
+        historico._pos = tabela.column("pos").to_numpy().astype(np.int64)
+        valores = tabela.column("precos").combine_chunks().flatten().to_numpy(zero_copy_only=False)
+        historico._valores = valores.astype("float64").reshape(len(chaves), historico.janela, len(historico.colunas))
+        return historico
+
+
+def avaliar_precos(historico: HistoricoPrecos, chaves, precos: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Avalia as colunas de `precos` (nomes de historico.colunas) de uma vez.
+    Devolve os preços com os erros de escala corrigidos e o status de cada
+    célula (mesmo formato, categórico STATUS_ANOMALIA).
+    """
+    colunas = list(precos.columns)
+    valores = precos.to_numpy(dtype="float64")
+    mediana, mad, pontos = historico.estatisticas(chaves, colunas)
+    escala = np.maximum(1.4826 * mad, MAD_MINIMO_REL * mediana)
+
+    def dentro(v):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.abs(v - mediana) / escala
+            razao = v / mediana
+        return (z <= LIMIAR_Z) | ((razao >= 1 / FAIXA_RAZAO) & (razao <= FAIXA_RAZAO))
+
+    com_historico = pontos >= MIN_HISTORICO
+    suspeito = com_historico & ~np.isnan(valores) & ~dentro(valores)
+
+    corrigidos = valores.copy()
+    corrigivel = np.zeros_like(suspeito)
+    for fator in FATORES_ESCALA:
+        volta = suspeito & ~corrigivel & dentro(valores / fator)
+        corrigidos[volta] = valores[volta] / fator
+        corrigivel |= volta
+
+    status = np.select(
+        [np.isnan(valores), ~com_historico, corrigivel, suspeito],
+        ["SEM PREÇO", "SEM HISTÓRICO", "CORRIGIDO", "REVISAR"],
+        default="OK",
+    )
+    indice = precos.index
+    return (
+        pd.DataFrame(corrigidos, index=indice, columns=colunas),
+        pd.DataFrame({c: pd.Categorical(status[:, i], dtype=STATUS_ANOMALIA) for i, c in enumerate(colunas)},
+                     index=indice),
+    )
+
+
+def relatorio_anomalias(nomes: pd.Series, precos: pd.DataFrame, corrigidos: pd.DataFrame,
+                        status: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha por célula corrigida ou para revisar (produto, coluna, antes, depois)."""
+    partes = []
+    for col in status.columns:
+        marcados = status[col].isin(["CORRIGIDO", "REVISAR"]).to_numpy()
+        if marcados.any():
+            partes.append(pd.DataFrame({
+                "Produto": nomes.to_numpy()[marcados],
+                "coluna": col,
+                "preco_original": precos[col].to_numpy()[marcados],
+                "preco": corrigidos[col].to_numpy()[marcados],
+                "status": status[col].to_numpy()[marcados],
+            }))
+    if not partes:
+        return pd.DataFrame(columns=["Produto", "coluna", "preco_original", "preco", "status"])
+    return pd.concat(partes, ignore_index=True)
+
+
+def processar_boletim(historico: HistoricoPrecos, nomes: pd.Series, precos: pd.DataFrame,
+                      data=None, registrar=True) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Passo do fluxo contínuo: avalia o boletim contra o histórico e, se ele
+    for mais novo que o último registrado, registra os preços já corrigidos.
+    Devolve (preços corrigidos, relatório das anomalias). Com
+    registrar=False só avalia; o chamador registra depois (registrar_boletim).
+    """
+    precos = precos.apply(parse_preco_br)
+    chaves = normalizar_nome(nomes)
+    corrigidos, status = avaliar_precos(historico, chaves, precos)
+    if registrar:
+        registrar_boletim(historico, chaves, corrigidos, data)
+    return corrigidos, relatorio_anomalias(nomes, precos, corrigidos, status)
+
+
+def registrar_boletim(historico: HistoricoPrecos, chaves, corrigidos: pd.DataFrame, data=None):
+    """Registra os preços corrigidos se o boletim for mais novo que historico.ultima_data."""
+    novo = data is None or historico.ultima_data is None or data_iso(data) > historico.ultima_data
+    if novo and list(corrigidos.columns) == historico.colunas:
+        historico.registrar(chaves, corrigidos.to_numpy(), data)
+
+
+def corrigir_coluna(historico: HistoricoPrecos | None, nomes: pd.Series, serie: pd.Series, coluna: str,
+                    maximo: float | None = None, minimo: float | None = None) -> pd.Series:
+    """
+    Corrige uma coluna de preço pelo histórico (sem registrar nada). Produtos
+    sem histórico, ou sem histórico nenhum carregado, usam corrigir_escala
+    com maximo/minimo, a heurística antiga.
+    """
+    serie = parse_preco_br(serie)
+    if historico is None or coluna not in historico.colunas:
+        return corrigir_escala(serie, maximo, minimo)
+    corrigidos, status = avaliar_precos(historico, normalizar_nome(nomes), serie.to_frame(coluna))
+    resultado = corrigidos[coluna]
+    sem_historico = (status[coluna] == "SEM HISTÓRICO").to_numpy()
+    if sem_historico.any() and (maximo is not None or minimo is not None):
+        resultado[sem_historico] = corrigir_escala(serie[sem_historico], maximo, minimo).to_numpy()
+    return resultado.rename(serie.name)
+
+
+# -------------------------------------------------
+# alimentar o histórico (só os boletins ainda não vistos)
+# -------------------------------------------------
+def alimentar_do_arquivo(historico: HistoricoPrecos, pasta=ARQUIVO_DIR, col_produto="Produto") -> pd.DataFrame:
+    """Passa pelos boletins arquivados depois de historico.ultima_data, do mais antigo ao mais novo."""
+    relatorios = []
+    for b in reversed(listar_arquivados(pasta=pasta)):
+        if historico.ultima_data is not None and b["data"] <= historico.ultima_data:
+            continue
+        if col_produto not in b["colunas"]:
+            continue
+        colunas = [c for c in historico.colunas if c in b["colunas"]]
+        df = ler_boletim(b["caminho"], colunas=[col_produto, *colunas])
+        precos = df.reindex(columns=historico.colunas)
+        _, relatorio = processar_boletim(historico, df[col_produto], precos, b["data"])
+        if not relatorio.empty:
+            relatorios.append(relatorio.assign(data=b["data"]))
+    return pd.concat(relatorios, ignore_index=True) if relatorios else pd.DataFrame()
+
+
+def alimentar_do_banco(historico: HistoricoPrecos, db) -> pd.DataFrame:
+    """Mesmo que alimentar_do_arquivo, lendo boletins_ceasa uma data por vez."""
+    # import tardio: os scripts de análise usam este módulo sem banco
+    from sqlalchemy import select
+    from models import BoletimCeasa
+
+    consulta = select(BoletimCeasa.data_boletim).distinct().order_by(BoletimCeasa.data_boletim)
+    if historico.ultima_data is not None:
+        consulta = consulta.where(BoletimCeasa.data_boletim > date.fromisoformat(historico.ultima_data))
+    campos = [getattr(BoletimCeasa, CAMPOS_BANCO[c]) for c in historico.colunas]
+
+    relatorios = []
+    for (data_boletim,) in db.execute(consulta).all():
+        linhas = db.execute(
+            select(BoletimCeasa.produto, *campos).where(BoletimCeasa.data_boletim == data_boletim)
+        ).all()
+        df = pd.DataFrame(linhas, columns=["produto", *historico.colunas])
+        _, relatorio = processar_boletim(historico, df["produto"], df[historico.colunas], data_boletim)
+        if not relatorio.empty:
+            relatorios.append(relatorio.assign(data=data_boletim.isoformat()))
+    return pd.concat(relatorios, ignore_index=True) if relatorios else pd.DataFrame()
+
+
+def historico_do_banco(db, caminho=ESTADO_PADRAO) -> HistoricoPrecos:
+    """Estado gravado, completado com as datas do banco que ele ainda não viu."""
+    historico = HistoricoPrecos.carregar(caminho)
+    alimentar_do_banco(historico, db)
+    return historico
+
+
+if __name__ == "__main__":
+    origem = sys.argv[1] if len(sys.argv) > 1 else "arquivo"
+    historico = HistoricoPrecos.carregar()
+    if origem == "banco":
+        from database import SessionLocal
+
+        with SessionLocal() as db:
+            anomalias = alimentar_do_banco(historico, db)
+    else:
+        anomalias = alimentar_do_arquivo(historico)
+    historico.salvar()
+    print(f"📈 Histórico de {len(historico)} produtos até {historico.ultima_data} ({ESTADO_PADRAO})")
+    if not anomalias.empty:
+        print(anomalias.to_string(index=False))
@@ -0,0 +1,283 @@
+# services/arquivo_boletins.py
+"""
+Arquivo colunar dos boletins: cada boletim é gravado uma vez em Parquet,
+particionado pela data do boletim (downloads/arquivo/data_boletim=AAAA-MM-DD/),
+com um manifesto JSON que responde "últimos N boletins" sem varrer pastas.
+O xlsx passa a ser só uma exportação sob demanda (exportar_xlsx).
+
+ler_boletim lê só as colunas pedidas e, com compacto=True, devolve texto
+como categórico e preços em float32. Um xlsx legado é lido uma vez e
+ganha um Parquet ao lado (<xlsx>.parquet) com o mtime/tamanho de origem;
+as leituras seguintes vêm dele enquanto o xlsx não mudar.
+
+Uso: python -m services.arquivo_boletins importar [pasta_com_xlsx]
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from services.precos import parse_preco_br
+
+ARQUIVO_DIR = os.getenv("CEASA_ARQUIVO_DIR", os.path.join("downloads", "arquivo"))
+MANIFESTO = "manifesto.json"
+COLUNAS_PRECO = ["MIN", "M.C.", "MAX"]
+
+# python-calamine (Rust) lê xlsx bem mais rápido que o openpyxl, se instalado
+MOTOR_XLSX = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+SUFIXO_SIDECAR = ".parquet"
+_CHAVE_ORIGEM = b"ceasa_origem"
+
+# o backfill grava de várias threads; o manifesto é lido e regravado inteiro
+_trava_manifesto = threading.Lock()
+
+
+def data_iso(data_boletim) -> str:
+    """
+    Aceita date/datetime, "dd/mm/aaaa" (texto do site) ou "aaaa-mm-dd".
+    Outra coisa levanta ValueError: a data é a partição do arquivo e a
+    chave do manifesto, não dá para adivinhar.
+    """
+    if isinstance(data_boletim, datetime):
+        data_boletim = data_boletim.date()
+    if isinstance(data_boletim, date):
+        return data_boletim.isoformat()
+    texto = str(data_boletim).strip()
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto, formato).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"Data do boletim inválida: {data_boletim!r}")
+
+
+def ler_manifesto(pasta=ARQUIVO_DIR) -> dict:
+    caminho = os.path.join(pasta, MANIFESTO)
+    if not os.path.exists(caminho):
+        return {"boletins": []}
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _gravar_manifesto(pasta, manifesto: dict):
+    caminho = os.path.join(pasta, MANIFESTO)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def _tipar(df: pd.DataFrame) -> pd.DataFrame:
+    """Preços numéricos e texto como string, para o Parquet sair tipado."""
+    df = df.copy()
+    for col in df.columns:
+        if col in COLUNAS_PRECO:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        elif df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def arquivar_boletim(df: pd.DataFrame, data_boletim, pasta=ARQUIVO_DIR) -> str:
+    """
+    Grava o boletim da data (substitui se já existir) e atualiza o
+    manifesto. Devolve o caminho do arquivo Parquet.
+    """
+    iso = data_iso(data_boletim)
+    relativo = os.path.join(f"data_boletim={iso}", "boletim.parquet")
+    caminho = os.path.join(pasta, relativo)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+    tipado = _tipar(df)
+    tipado.to_parquet(caminho, index=False)
+    conteudo = pd.util.hash_pandas_object(tipado, index=False).to_numpy().tobytes()
+
+    entrada = {
+        "data": iso,
+        "arquivo": relativo.replace(os.sep, "/"),
+        "linhas": len(tipado),
+        "colunas": [str(c) for c in tipado.columns],
+        "hash": hashlib.sha256(conteudo).hexdigest(),
+        "gravado_em": datetime.now().isoformat(timespec="seconds"),
+    }
+    with _trava_manifesto:
+        manifesto = ler_manifesto(pasta)
+        boletins = [b for b in manifesto["boletins"] if b["data"] != iso]
+        boletins.append(entrada)
+        boletins.sort(key=lambda b: b["data"], reverse=True)
+        manifesto["boletins"] = boletins
+        _gravar_manifesto(pasta, manifesto)
+
+    print(f"🗄️ Boletim {iso} arquivado em: {caminho}")
+    return caminho
+
+
+def listar_arquivados(n=None, pasta=ARQUIVO_DIR) -> list[dict]:
+    """Entradas do manifesto, mais recente primeiro (caminho já absoluto)."""
+    boletins = ler_manifesto(pasta)["boletins"][:n]
+    pasta_abs = os.path.abspath(pasta)
+    return [{**b, "caminho": os.path.join(pasta_abs, b["arquivo"])} for b in boletins]
+
+
+def versao_arquivado(entrada: dict) -> str:
+    """Versão de um boletim arquivado: data + começo do hash do conteúdo ("2025-01-08.3f9a0c1b2d4e")."""
+    return f"{entrada['data']}.{entrada['hash'][:12]}"
+
+
+def _assinatura(caminho: str) -> dict:
+    st = os.stat(caminho)
+    return {"mtime_ns": st.st_mtime_ns, "tamanho": st.st_size}
+
+
+def _sidecar_valido(sidecar: str, origem: dict) -> bool:
+    try:
+        metadados = pq.read_schema(sidecar).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return json.loads(metadados.get(_CHAVE_ORIGEM, b"{}")) == origem
+
+
+def _gravar_sidecar(df: pd.DataFrame, sidecar: str, origem: dict):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = {**(tabela.schema.metadata or {}), _CHAVE_ORIGEM: json.dumps(origem).encode()}
+    temporario = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(tabela.replace_schema_metadata(metadados), temporario)
+        os.replace(temporario, sidecar)
+    except OSError as e:
+        # pasta só de leitura etc.: segue sem sidecar
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        print(f"⚠️ Sidecar não gravado ({os.path.basename(sidecar)}): {e}")
+
+
+def _ler_xlsx(caminho: str, colunas=None, sidecar=True) -> tuple[pd.DataFrame, str]:
+    """xlsx legado, pelo sidecar Parquet quando ele ainda vale."""
+    if not sidecar:
+        return pd.read_excel(caminho, sheet_name="Boletim", usecols=colunas, engine=MOTOR_XLSX), MOTOR_XLSX
+
+    lateral = caminho + SUFIXO_SIDECAR
+    origem = _assinatura(caminho)
+    if os.path.exists(lateral) and _sidecar_valido(lateral, origem):
+        return pd.read_parquet(lateral, columns=colunas), "sidecar"
+
+    # o sidecar guarda a aba inteira, para servir a qualquer recorte depois
+    df = pd.read_excel(caminho, sheet_name="Boletim", engine=MOTOR_XLSX)
+    for col in df.columns:
+        if col in COLUNAS_PRECO:
+            df[col] = parse_preco_br(df[col])
+        elif df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    _gravar_sidecar(df, lateral, origem)
+    return (df[colunas] if colunas is not None else df), MOTOR_XLSX
+
+
+def compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """Texto como categórico e preços em float32 (bem menos memória)."""
+    precos, tipos = {}, {}
+    for col in df.columns:
+        if col in COLUNAS_PRECO:
+            precos[col] = parse_preco_br(df[col]).astype("float32")
+        elif df[col].dtype == object or isinstance(df[col].dtype, pd.StringDtype):
+            tipos[col] = "category"
+    return df.assign(**precos).astype(tipos)
+
+
+def ler_boletim(caminho: str, colunas=None, compacto=False, sidecar=True, relatar=False) -> pd.DataFrame:
+    """
+    Lê um boletim do arquivo (Parquet) ou um xlsx legado, só com as
+    colunas pedidas. compacto=True aplica compactar(); sidecar=False lê o
+    xlsx direto. O tempo, a memória e a origem da leitura ficam em
+    df.attrs["leitura"] (e são impressos com relatar=True).
+    """
+    inicio = time.perf_counter()
+    if caminho.endswith(".parquet"):
+        df, origem = pd.read_parquet(caminho, columns=colunas), "parquet"
+    else:
+        df, origem = _ler_xlsx(caminho, colunas, sidecar)
+    if compacto:
+        df = compactar(df)
+
+    leitura = {
+        "origem": origem,
+        "segundos": round(time.perf_counter() - inicio, 3),
+        "linhas": len(df),
+        "bytes": int(df.memory_usage(deep=True).sum()),
+    }
+    df.attrs["leitura"] = leitura
+    if relatar:
+        print(f"📥 {os.path.basename(caminho)}: {leitura['linhas']} linhas via {origem} "
+              f"em {leitura['segundos']} s, {leitura['bytes'] / 2**20:.2f} MB")
+    return df
+
+
+def carregar_arquivado(data_boletim, colunas=None, pasta=ARQUIVO_DIR) -> pd.DataFrame:
+    iso = data_iso(data_boletim)
+    for b in listar_arquivados(pasta=pasta):
+        if b["data"] == iso:
+            return ler_boletim(b["caminho"], colunas)
+    raise FileNotFoundError(f"Boletim de {iso} não está no arquivo.")
+
+
+def exportar_xlsx(data_boletim, destino=None, pasta=ARQUIVO_DIR) -> str:
+    """Gera o xlsx formatado de um boletim arquivado, sob demanda."""
+    from services.scraper import salvar_excel_formatado
+
+    iso = data_iso(data_boletim)
+    destino = destino or os.path.join(os.path.dirname(os.path.abspath(pasta)), f"boletim_{iso}.xlsx")
+    salvar_excel_formatado(carregar_arquivado(iso, pasta=pasta), destino)
+    return destino
+
+
+def importar_xlsx_legados(pasta_xlsx="downloads", pasta=ARQUIVO_DIR) -> int:
+    """
+    Arquiva os boletim_*.xlsx antigos (o mais recente de cada data vence).
+    A data vem da coluna Data ou, se ela faltar ou for ilegível, do nome do
+    arquivo; sem nenhuma das duas o arquivo é pulado. Devolve quantos
+    foram arquivados.
+    """
+    arquivos = sorted(
+        (os.path.join(pasta_xlsx, f) for f in os.listdir(pasta_xlsx)
+         if f.startswith("boletim_") and f.endswith(".xlsx")),
+        key=os.path.getmtime,
+    )
+    arquivados = 0
+    for caminho in arquivos:
+        df = pd.read_excel(caminho, sheet_name="Boletim")
+        # boletim_<aaaa-mm-dd>_<hora>.xlsx
+        candidatas = []
+        if "Data" in df.columns and df["Data"].notna().any():
+            candidatas.append(df["Data"].dropna().iloc[0])
+        partes = os.path.splitext(os.path.basename(caminho))[0].split("_")
+        if len(partes) > 1:
+            candidatas.append(partes[1])
+        data = None
+        for candidata in candidatas:
+            try:
+                data = data_iso(candidata)
+                break
+            except ValueError:
+                pass
+        if data is None:
+            print(f"⚠️ {os.path.basename(caminho)} sem data legível (coluna Data nem nome): não arquivado")
+            continue
+        arquivar_boletim(df, data, pasta)
+        arquivados += 1
+    return arquivados
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "importar":
+        origem = sys.argv[2] if len(sys.argv) > 2 else "downloads"
+        print(f"{importar_xlsx_legados(origem)} boletins importados para {ARQUIVO_DIR}")
+    else:
+        for b in listar_arquivados():
+            print(f"{b['data']}  {b['linhas']:>5} linhas  {b['caminho']}")
@@ -1,78 +1,236 @@
-import subprocess
+import hashlib
+import time
 import pandas as pd
+from sqlalchemy import insert, update, delete
 from sqlalchemy.orm import Session
-from models import Produto, BoletimCeasa
-from datetime import datetime
-import os
+from models import Produto, BoletimCeasa, IngestaoBoletim
+from services.anomalias import CAMPOS_BANCO, HistoricoPrecos, historico_do_banco, processar_boletim, registrar_boletim
+from services.canonico import normalizar_nome, resolver_nomes
+from services.scraper import coletar_boletim
 
-def atualizar_dados_ceasa(db: Session):
-    try:
-        # 1. Executa o scraper
-        caminho_script = os.path.abspath("./scraper.py")
-        subprocess.run(["python", caminho_script], check=True)
-
-        # 2. Localiza o CSV gerado
-        caminho_csv = "./downloads/boletim_ceasa.csv"
-        if not os.path.exists(caminho_csv):
-            return {"status": "erro", "mensagem": "Arquivo CSV não encontrado."}
-
-        # 3. Lê o CSV em DataFrame
-        df = pd.read_csv(caminho_csv)
-        df.columns = [c.strip().lower() for c in df.columns]
-
-        total_inseridos = 0
-        total_atualizados = 0
-        total_historico = 0
-
-        for _, row in df.iterrows():
-            nome_produto = str(row["mercadoria"]).strip().title()
-            preco_min = float(row.get("preço mínimo", 0))
-            preco_max = float(row.get("preço máximo", 0))
-            preco_med = float(row.get("preço médio", 0))
-            origem = str(row.get("origem", "")).strip()
-
-            # --- Atualiza produto no banco
-            produto_existente = db.query(Produto).filter(Produto.nome == nome_produto).first()
-            if produto_existente:
-                if produto_existente.preco_venda != preco_max:
-                    produto_existente.preco_venda = preco_max
-                    db.commit()
-                    total_atualizados += 1
-            else:
-                novo_produto = Produto(
-                    nome=nome_produto,
-                    categoria="CEASA",
-                    unidade="kg",
-                    preco_compra=0.0,
-                    preco_venda=preco_max,
-                    estoque_minimo=0
-                )
-                db.add(novo_produto)
-                db.commit()
-                total_inseridos += 1
-
-            # --- Salva no histórico
-            boletim = BoletimCeasa(
-                data_boletim=datetime.now().date(),
-                produto=nome_produto,
-                preco_min=preco_min,
-                preco_max=preco_max,
-                preco_medio=preco_med,
-                origem=origem
-            )
-            db.add(boletim)
-            total_historico += 1
+# nomes aceitos para cada coluna: os do CSV antigo e os da grade do scraper
+COLUNAS_BOLETIM = {
+    "nome": ["mercadoria", "produto"],
+    "preco_min": ["preço mínimo", "min"],
+    "preco_max": ["preço máximo", "max"],
+    "preco_medio": ["preço médio", "m.c."],
+    "origem": ["origem"],
+}
 
-        db.commit()
 
+def _preparar_boletim(df: pd.DataFrame) -> pd.DataFrame:
+    """Extrai do boletim só as colunas gravadas no banco, já tipadas."""
+    por_nome = {str(c).strip().lower(): c for c in df.columns}
+
+    def coluna(campo):
+        for alias in COLUNAS_BOLETIM[campo]:
+            if alias in por_nome:
+                return df[por_nome[alias]]
+        return None
+
+    def numerica(campo):
+        serie = coluna(campo)
+        if serie is None:
+            return 0.0
+        return pd.to_numeric(serie, errors="coerce")
+
+    nomes = coluna("nome")
+    if nomes is None:
+        # mesma heurística do detectar_coluna_produto das análises
+        for nome, original in por_nome.items():
+            if any(k in nome for k in ("prod", "espec", "descr", "mercad")):
+                nomes = df[original]
+                break
+    if nomes is None:
+        raise KeyError("Coluna de produto (mercadoria) não encontrada no boletim.")
+    origem = coluna("origem")
+
+    boletim = pd.DataFrame({
+        "nome": nomes.astype(str).str.strip().str.title(),
+        "preco_min": numerica("preco_min"),
+        "preco_max": numerica("preco_max"),
+        "preco_medio": numerica("preco_medio"),
+        "origem": origem.fillna("").astype(str).str.strip() if origem is not None else "",
+    })
+    return boletim
+
+
+def data_do_boletim(df: pd.DataFrame):
+    """Data do próprio boletim (coluna "Data", dd/mm/aaaa) ou None."""
+    por_nome = {str(c).strip().lower(): c for c in df.columns}
+    if "data" not in por_nome or df.empty:
+        return None
+    datas = pd.to_datetime(df[por_nome["data"]], format="%d/%m/%Y", errors="coerce").dropna()
+    return datas.iloc[0].date() if not datas.empty else None
+
+
+def hash_boletim(boletim: pd.DataFrame) -> str:
+    """Hash do conteúdo já preparado, independente da ordem das linhas."""
+    ordenado = boletim.sort_values("nome", kind="stable").reset_index(drop=True)
+    valores = pd.util.hash_pandas_object(ordenado, index=False).to_numpy()
+    return hashlib.sha256(valores.tobytes()).hexdigest()
+
+
+def _registros(df: pd.DataFrame) -> list[dict]:
+    """Converte o DataFrame em parâmetros de executemany (NaN vira NULL)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def ingerir_boletim(db: Session, df: pd.DataFrame, data_boletim=None, atualizar_produtos=True,
+                    historico: HistoricoPrecos | None = None) -> dict:
+    """
+    Grava o boletim em lote: lê os produtos existentes uma vez, calcula
+    inserções e mudanças de preço com diffs no DataFrame e escreve tudo
+    com poucos executemany numa única transação.
+
+    Boletins antigos (backfill) passam data_boletim e atualizar_produtos=False
+    para só alimentar o histórico sem mexer no preço atual dos produtos.
+    Quem ingere vários boletins seguidos passa o mesmo `historico` de preços
+    (historico_do_banco) e o salva no fim; sem ele, o estado é carregado e
+    gravado a cada chamada.
+
+    A ingestão é idempotente por data do boletim: se o hash do conteúdo for
+    o mesmo já gravado, nada é escrito (uma única consulta). Se o boletim
+    daquela data mudou, o histórico da data é substituído. Sem data (nem
+    data_boletim nem coluna Data legível) levanta ValueError.
+    """
+    inicio = time.perf_counter()
+    boletim = _preparar_boletim(df)
+    # a data é a chave da idempotência: sem ela não dá para adivinhar
+    # (a data de hoje gravaria o mesmo boletim de novo a cada dia)
+    data_boletim = data_boletim or data_do_boletim(df)
+    if data_boletim is None:
+        raise ValueError("Boletim sem data: informe data_boletim ou a coluna Data (dd/mm/aaaa).")
+
+    # último preço de cada produto no boletim (como no laço antigo)
+    por_produto = boletim.drop_duplicates("nome", keep="last")
+    hash_conteudo = hash_boletim(por_produto)
+
+    ingestao = db.query(IngestaoBoletim).filter(IngestaoBoletim.data_boletim == data_boletim).first()
+    if ingestao is not None and ingestao.hash_conteudo == hash_conteudo:
         return {
             "status": "sucesso",
-            "inseridos": total_inseridos,
-            "atualizados": total_atualizados,
-            "historico": total_historico
+            "data_boletim": data_boletim.isoformat(),
+            "inalterado": True,
+            "inseridos": 0,
+            "atualizados": 0,
+            "historico": 0,
         }
 
-    except subprocess.CalledProcessError:
-        return {"status": "erro", "mensagem": "Falha ao executar o scraper."}
+    try:
+        # nomes canônicos (aliases_produto): variantes de acento, unidade e
+        # ordem das palavras viram o mesmo produto
+        por_produto = por_produto.assign(nome=resolver_nomes(db, por_produto["nome"]))
+        por_produto = por_produto.drop_duplicates("nome", keep="last")
+
+        # cada preço contra o histórico do próprio produto: erro de escala
+        # (100x) é corrigido antes de gravar, o resto só é marcado para revisão
+        salvar_historico = historico is None
+        if salvar_historico:
+            historico = historico_do_banco(db)
+        campos = list(CAMPOS_BANCO.values())
+        corrigidos, anomalias = processar_boletim(
+            historico, por_produto["nome"], por_produto[campos].set_axis(list(CAMPOS_BANCO), axis=1), data_boletim,
+            registrar=False,
+        )
+        por_produto[campos] = corrigidos.to_numpy()
+
+        novos = alterados = por_produto.iloc[0:0]
+
+        if atualizar_produtos:
+            existentes = pd.DataFrame(
+                db.query(Produto.id, Produto.nome, Produto.preco_venda).all(),
+                columns=["id", "nome_cadastro", "preco_venda"],
+            )
+            # cadastro antigo pode ter o mesmo produto escrito de outro jeito
+            existentes["chave"] = normalizar_nome(resolver_nomes(db, existentes["nome_cadastro"], gravar=False))
+            existentes = existentes.drop_duplicates("chave", keep="first")
+
+            cruzado = por_produto.assign(chave=normalizar_nome(por_produto["nome"]))
+            cruzado = cruzado.merge(existentes, on="chave", how="left")
+            novos = cruzado[cruzado["id"].isna()]
+            preco_atual = pd.to_numeric(cruzado["preco_venda"], errors="coerce").round(2)
+            preco_novo = cruzado["preco_max"].round(2)
+            mudou = (preco_atual != preco_novo) & ~(preco_atual.isna() & preco_novo.isna())
+            alterados = cruzado[cruzado["id"].notna() & mudou]
+
+        if not novos.empty:
+            produtos_novos = pd.DataFrame({
+                "nome": novos["nome"],
+                "categoria": "CEASA",
+                "unidade": "kg",
+                "preco_compra": 0.0,
+                "preco_venda": novos["preco_max"],
+                "estoque_minimo": 0,
+            })
+            db.execute(insert(Produto), _registros(produtos_novos))
+
+        if not alterados.empty:
+            precos = pd.DataFrame({
+                "id": alterados["id"].astype(int),
+                "preco_venda": alterados["preco_max"],
+            })
+            db.execute(update(Produto), _registros(precos))
+
+        # o histórico da data é reescrito inteiro (único por data + produto)
+        historico_gravado = por_produto.rename(columns={"nome": "produto"})
+        historico_gravado.insert(0, "data_boletim", data_boletim)
+        db.execute(delete(BoletimCeasa).where(BoletimCeasa.data_boletim == data_boletim))
+        db.execute(insert(BoletimCeasa), _registros(historico_gravado))
+
+        if ingestao is None:
+            db.add(IngestaoBoletim(
+                data_boletim=data_boletim, hash_conteudo=hash_conteudo, linhas=len(historico_gravado)
+            ))
+        else:
+            ingestao.hash_conteudo = hash_conteudo
+            ingestao.linhas = len(historico_gravado)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # só entra no anel o que foi gravado no banco
+    registrar_boletim(historico, normalizar_nome(por_produto["nome"]), corrigidos, data_boletim)
+    if salvar_historico:
+        historico.salvar()
+
+    duracao = time.perf_counter() - inicio
+    return {
+        "status": "sucesso",
+        "data_boletim": data_boletim.isoformat(),
+        "inalterado": False,
+        "inseridos": len(novos),
+        "atualizados": len(alterados),
+        "historico": len(historico_gravado),
+        "corrigidos": int((anomalias["status"] == "CORRIGIDO").sum()),
+        "revisar": _registros(anomalias[anomalias["status"] == "REVISAR"]),
+        "linhas_por_segundo": round(len(boletim) / duracao, 1) if duracao > 0 else None,
+    }
+
+
+def atualizar_dados_ceasa(db: Session, df: pd.DataFrame | None = None,
+                          download_dir="downloads", salvar_xlsx=False, backend=None):
+    """
+    Pipeline em processo: raspa o boletim (se nenhum DataFrame for passado)
+    e entrega o DataFrame direto para a ingestão, sem CSV intermediário.
+    O boletim fica no arquivo colunar; o xlsx só é gerado com salvar_xlsx.
+    """
+    try:
+        # 1. Executa o scraper no próprio processo
+        tempos_scraper = None
+        if df is None:
+            resultado = coletar_boletim(download_dir, salvar_xlsx=salvar_xlsx, backend=backend)
+            if resultado is None:
+                return {"status": "erro", "mensagem": "Nenhuma tabela encontrada no boletim."}
+            df = resultado["df"]
+            tempos_scraper = resultado["tempos"]
+
+        # 2. Grava produtos e histórico em lote
+        resumo = ingerir_boletim(db, df)
+        if tempos_scraper is not None:
+            resumo["tempos_scraper"] = tempos_scraper
+        return resumo
+
     except Exception as e:
         return {"status": "erro", "mensagem": str(e)}
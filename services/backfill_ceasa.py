@@ -0,0 +1,155 @@
+# services/backfill_ceasa.py
+"""
+Backfill do histórico de boletins: lista todas as datas oferecidas no
+filtro do CEASA, pula as que já estão em boletins_ceasa e busca as que
+faltam com um pool limitado de workers HTTP. As datas concluídas vão para
+um checkpoint JSON (na pasta de downloads), então um backfill interrompido
+continua de onde parou.
+
+Uso: python -m services.backfill_ceasa --workers 4 --desde 2023-01-01 [--pasta downloads]
+"""
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date
+
+from sqlalchemy.orm import Session
+
+from models import BoletimCeasa
+from services.anomalias import historico_do_banco
+from services.atualizar_ceasa import ingerir_boletim
+from services.scraper import URL_BOLETIM
+from services.scraper_http import criar_sessao, listar_datas_http, coletar_boletim_http
+
+NOME_CHECKPOINT = "backfill_checkpoint.json"
+
+
+def _data_da_opcao(texto: str) -> date | None:
+    try:
+        return datetime.strptime(texto.strip(), "%d/%m/%Y").date()
+    except ValueError:
+        return None
+
+
+def carregar_checkpoint(caminho: str) -> dict:
+    if not os.path.exists(caminho):
+        return {"concluidas": [], "falhas": {}}
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar_checkpoint(caminho: str, checkpoint: dict):
+    # grava num temporário e troca, para não corromper o arquivo se cair no meio
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+
+def datas_pendentes(db: Session, opcoes, checkpoint: dict, desde=None, ate=None) -> list[tuple[date, str]]:
+    """Datas do filtro que ainda não estão no banco nem no checkpoint."""
+    no_banco = {d for (d,) in db.query(BoletimCeasa.data_boletim).distinct()}
+    concluidas = set(checkpoint["concluidas"])
+
+    pendentes = []
+    for _, texto in opcoes:
+        data = _data_da_opcao(texto)
+        if data is None or data in no_banco or data.isoformat() in concluidas:
+            continue
+        if (desde and data < desde) or (ate and data > ate):
+            continue
+        pendentes.append((data, texto))
+    # da mais antiga para a mais nova: o histórico de preços (anomalias)
+    # só registra boletins mais novos que o último que viu
+    return sorted(pendentes)
+
+
+def executar_backfill(db: Session, workers=4, desde=None, ate=None, checkpoint_path=None,
+                      url=URL_BOLETIM, download_dir="downloads") -> dict:
+    """
+    Busca em paralelo (até `workers` downloads simultâneos) os boletins que
+    faltam e grava no histórico em ordem crescente de data: um download que
+    termina antes de uma data mais antiga espera por ela. A gravação no
+    banco fica na thread principal, com uma única sessão, e o histórico de
+    preços (anomalias) é carregado uma vez e salvo no fim.
+    O checkpoint fica em download_dir se checkpoint_path não for passado.
+    """
+    checkpoint_path = checkpoint_path or os.path.join(download_dir, NOME_CHECKPOINT)
+    checkpoint = carregar_checkpoint(checkpoint_path)
+    opcoes = listar_datas_http(url=url)
+    pendentes = datas_pendentes(db, opcoes, checkpoint, desde, ate)
+    print(f"📅 {len(opcoes)} datas no filtro, {len(pendentes)} pendentes.")
+
+    # uma sessão HTTP (com pool keep-alive) por thread de download
+    local = threading.local()
+
+    def baixar(texto):
+        if not hasattr(local, "sessao"):
+            local.sessao = criar_sessao(pool=1)
+        resultado = coletar_boletim_http(download_dir=download_dir, data=texto, url=url, sessao=local.sessao)
+        return resultado["df"] if resultado else None
+
+    ingeridas = 0
+    historico = historico_do_banco(db)
+
+    def gravar(futuro, data):
+        nonlocal ingeridas
+        chave = data.isoformat()
+        try:
+            df = futuro.result()
+            if df is None:
+                raise Exception("Nenhuma tabela encontrada no boletim.")
+            ingerir_boletim(db, df, data_boletim=data, atualizar_produtos=False, historico=historico)
+        except Exception as e:
+            checkpoint["falhas"][chave] = str(e)
+            print(f"❌ {chave}: {e}")
+        else:
+            checkpoint["concluidas"].append(chave)
+            checkpoint["falhas"].pop(chave, None)
+            ingeridas += 1
+            print(f"✅ {chave} gravado ({ingeridas}/{len(pendentes)})")
+        salvar_checkpoint(checkpoint_path, checkpoint)
+
+    prontos = {}    # posição em `pendentes` -> download terminado fora de ordem
+    proxima = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futuros = {pool.submit(baixar, texto): i for i, (_, texto) in enumerate(pendentes)}
+            for futuro in as_completed(futuros):
+                prontos[futuros[futuro]] = futuro
+                while proxima in prontos:
+                    gravar(prontos.pop(proxima), pendentes[proxima][0])
+                    proxima += 1
+    finally:
+        # interrompido ou não, o anel tem só o que já foi gravado no banco
+        historico.salvar()
+
+    return {
+        "status": "sucesso",
+        "disponiveis": len(opcoes),
+        "pendentes": len(pendentes),
+        "ingeridas": ingeridas,
+        "falhas": len(pendentes) - ingeridas,
+    }
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Backfill do histórico de boletins do CEASA.")
+    parser.add_argument("--workers", type=int, default=4, help="downloads simultâneos")
+    parser.add_argument("--desde", type=date.fromisoformat, help="primeira data (AAAA-MM-DD)")
+    parser.add_argument("--ate", type=date.fromisoformat, help="última data (AAAA-MM-DD)")
+    parser.add_argument("--pasta", default="downloads", help="pasta de downloads (e do checkpoint)")
+    parser.add_argument("--checkpoint", help=f"padrão: <pasta>/{NOME_CHECKPOINT}")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(executar_backfill(db, args.workers, args.desde, args.ate, args.checkpoint,
+                                download_dir=args.pasta))
+    finally:
+        db.close()
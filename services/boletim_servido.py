@@ -0,0 +1,121 @@
+# services/boletim_servido.py
+"""
+Boletim mais recente pronto para a API (api.py /boletim).
+
+O arquivo é lido uma vez e a resposta fica em memória já serializada (JSON
+em bytes e as variantes comprimidas de services/respostas), com ETag e Last-Modified, junto com o índice
+colunar (services/indice_boletim) que responde filtros e páginas. A cada requisição só
+se confere a assinatura da fonte (mtime/tamanho do manifesto do arquivo
+Parquet ou, no legado, da pasta e do xlsx mais novo): enquanto ela não
+muda, nada é relido nem reserializado.
+"""
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from services.arquivo_boletins import MANIFESTO, listar_arquivados, ler_boletim, versao_arquivado
+from services.indice_boletim import IndiceBoletim
+from services.respostas import CODIFICACOES, comprimir, serializar
+
+MERCADO = "CEASA Grande Vitória"
+
+
+@dataclass
+class BoletimServido:
+    data: str
+    versao: str | None         # versão no arquivo (None no xlsx legado)
+    df: pd.DataFrame
+    corpo: bytes
+    comprimidos: dict          # codificação ("br", "gzip") -> corpo comprimido
+    tempo_serializacao: float
+    etag: str
+    modificado_em: datetime
+    indice: IndiceBoletim
+
+
+def padronizar_boletim(df: pd.DataFrame) -> pd.DataFrame:
+    """Mesmo formato que o /boletim sempre devolveu: vazio no lugar de nulo, colunas em MAIÚSCULAS_COM_SUBLINHADO."""
+    df = df.astype(object).where(df.notna(), "")
+    df.columns = [str(col).strip().replace(" ", "_").upper() for col in df.columns]
+    return df
+
+
+class CacheBoletim:
+    """Último boletim de `pasta` (arquivo Parquet em `arquivo`, padrão pasta/arquivo, ou xlsx legados)."""
+
+    def __init__(self, pasta: str, mercado=MERCADO, arquivo: str | None = None):
+        self.pasta = pasta
+        self.arquivo = arquivo or os.path.join(pasta, "arquivo")
+        self.mercado = mercado
+        self._atual: BoletimServido | None = None
+        self._assinatura = None
+        self._pasta_legado = None   # (mtime da pasta, xlsx mais novo)
+        self._trava = threading.Lock()
+
+    def _xlsx_mais_novo(self) -> str:
+        # a pasta só muda de mtime quando entra/sai arquivo: só então lista de novo
+        mtime_pasta = os.stat(self.pasta).st_mtime_ns
+        if self._pasta_legado is None or self._pasta_legado[0] != mtime_pasta:
+            arquivos = [f for f in os.listdir(self.pasta) if f.startswith("boletim_") and f.endswith(".xlsx")]
+            if not arquivos:
+                raise FileNotFoundError("Nenhum boletim encontrado na pasta de downloads.")
+            recente = max(arquivos, key=lambda f: os.path.getmtime(os.path.join(self.pasta, f)))
+            self._pasta_legado = (mtime_pasta, os.path.join(self.pasta, recente))
+        return self._pasta_legado[1]
+
+    def _fonte(self) -> tuple[str, tuple]:
+        """Arquivo que define o boletim atual e sua assinatura (mtime, tamanho)."""
+        manifesto = os.path.join(self.arquivo, MANIFESTO)
+        if os.path.exists(manifesto):
+            caminho = manifesto
+        else:
+            caminho = self._xlsx_mais_novo()
+        st = os.stat(caminho)
+        return caminho, (caminho, st.st_mtime_ns, st.st_size)
+
+    def _carregar(self, fonte: str, assinatura: tuple) -> BoletimServido:
+        if fonte.endswith(MANIFESTO):
+            ultimo = listar_arquivados(1, self.arquivo)[0]
+            df, data_boletim = ler_boletim(ultimo["caminho"]), ultimo["data"]
+            versao = versao_arquivado(ultimo)
+        else:
+            nome = os.path.basename(fonte)
+            df = ler_boletim(fonte)
+            data_boletim = nome.split("_")[1] if "_" in nome else "Data desconhecida"
+            versao = None
+
+        df = padronizar_boletim(df)
+        meta = {"mercado": self.mercado, "data": data_boletim, "total": len(df)}
+        inicio = time.perf_counter()
+        corpo = serializar({**meta, "dados": df.to_dict(orient="records")})
+        tempo_serializacao = time.perf_counter() - inicio
+        return BoletimServido(
+            data=data_boletim,
+            versao=versao,
+            df=df,
+            corpo=corpo,
+            comprimidos={codificacao: comprimir(corpo, codificacao) for codificacao in CODIFICACOES},
+            tempo_serializacao=tempo_serializacao,
+            etag='"' + hashlib.sha256(corpo).hexdigest()[:32] + '"',
+            modificado_em=datetime.fromtimestamp(assinatura[1] / 1e9, tz=timezone.utc).replace(microsecond=0),
+            indice=IndiceBoletim(df),
+        )
+
+    def atual(self) -> BoletimServido:
+        fonte, assinatura = self._fonte()
+        if assinatura == self._assinatura:
+            return self._atual
+        with self._trava:
+            if assinatura != self._assinatura:
+                self._atual = self._carregar(fonte, assinatura)
+                self._assinatura = assinatura
+            return self._atual
+
+    def limpar(self):
+        with self._trava:
+            self._atual = self._assinatura = self._pasta_legado = None
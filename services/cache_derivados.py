@@ -0,0 +1,138 @@
+# services/cache_derivados.py
+"""
+Cache em disco dos DataFrames derivados dos boletins (normalizado +
+categorizado, comparações entre pares).
+
+A chave é o hash do conteúdo do(s) boletim(ns) de origem mais a versão das
+regras (arquivo de categorias + VERSAO_DERIVADOS), então mudar um boletim
+ou uma regra gera entradas novas sozinho. Cada entrada é um Parquet;
+as menos usadas saem primeiro quando o total passa de MAX_BYTES.
+"""
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from services.categorias import REGRAS_PADRAO
+
+CACHE_DIR = os.getenv("CEASA_CACHE_DIR", os.path.join("downloads", "cache"))
+MAX_BYTES = int(os.getenv("CEASA_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# aumente quando mudar o código que gera os derivados (não só as regras)
+VERSAO_DERIVADOS = "1"
+
+
+def hash_frame(df: pd.DataFrame) -> str:
+    """Hash do conteúdo (valores + nomes das colunas), como no arquivo de boletins."""
+    valores = pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+    colunas = "\x1f".join(map(str, df.columns)).encode("utf-8")
+    return hashlib.sha256(colunas + valores).hexdigest()
+
+
+def versao_regras(caminho_regras: str = REGRAS_PADRAO) -> str:
+    with open(caminho_regras, "rb") as f:
+        regras = f.read()
+    return hashlib.sha256(VERSAO_DERIVADOS.encode() + regras).hexdigest()[:16]
+
+
+class CacheDerivados:
+    """Cache LRU por tamanho, com contadores de acertos e faltas."""
+
+    def __init__(self, pasta: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.pasta = pasta
+        self.max_bytes = max_bytes
+        self.acertos = 0
+        self.faltas = 0
+        self._trava = threading.Lock()
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.pasta, f"{chave}.parquet")
+
+    def obter(self, chave: str, gerar) -> pd.DataFrame:
+        """Devolve o frame da chave ou chama gerar() e guarda o resultado."""
+        caminho = self._caminho(chave)
+        if os.path.exists(caminho):
+            # outro worker do ProcessPool pode despejar a entrada entre o
+            # exists e o utime: nesse caso conta como falta e gera de novo
+            try:
+                df = pd.read_parquet(caminho)
+                os.utime(caminho)  # LRU pelo mtime
+            except FileNotFoundError:
+                pass
+            except Exception:
+                self._remover(caminho)  # entrada corrompida: gera de novo
+            else:
+                with self._trava:
+                    self.acertos += 1
+                return df
+
+        with self._trava:
+            self.faltas += 1
+        df = gerar()
+        if df is not None:
+            self._gravar(caminho, df)
+        return df
+
+    def _gravar(self, caminho: str, df: pd.DataFrame):
+        os.makedirs(self.pasta, exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(temporario, index=False)
+            os.replace(temporario, caminho)
+        except Exception as e:
+            # tipo que o Parquet não aceita: segue sem cache para esta entrada
+            self._remover(temporario)
+            print(f"⚠️ Cache não gravado ({os.path.basename(caminho)}): {e}")
+            return
+        self.despejar()
+
+    def _entradas(self) -> list[tuple[float, int, str]]:
+        if not os.path.isdir(self.pasta):
+            return []
+        entradas = []
+        for nome in os.listdir(self.pasta):
+            if nome.endswith(".parquet"):
+                caminho = os.path.join(self.pasta, nome)
+                try:
+                    st = os.stat(caminho)
+                except FileNotFoundError:
+                    continue
+                entradas.append((st.st_mtime, st.st_size, caminho))
+        return entradas
+
+    def despejar(self):
+        """Remove as entradas usadas há mais tempo até caber em max_bytes."""
+        entradas = sorted(self._entradas())
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in entradas:
+            if total <= self.max_bytes:
+                break
+            self._remover(caminho)
+            total -= tamanho
+
+    def limpar(self):
+        for _, _, caminho in self._entradas():
+            self._remover(caminho)
+
+    @staticmethod
+    def _remover(caminho: str):
+        # a pasta é compartilhada entre processos: alguém pode ter removido antes
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+    def estatisticas(self) -> dict:
+        entradas = self._entradas()
+        consultas = self.acertos + self.faltas
+        return {
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "taxa_acerto": round(self.acertos / consultas, 3) if consultas else None,
+            "entradas": len(entradas),
+            "bytes": sum(tamanho for _, tamanho, _ in entradas),
+        }
+
+
+cache_padrao = CacheDerivados()
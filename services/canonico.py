@@ -0,0 +1,232 @@
+# services/canonico.py
+"""
+Nomes canônicos de produto.
+
+normalizar_nome gera a chave de comparação: sem acento, minúscula, sem
+pontuação, sem unidades/embalagens ("KG", "CX 20KG", "MAÇO") e com as
+palavras em ordem alfabética. "MAMÃO PAPAYA KG" e "papaya mamao" dão a
+mesma chave. Classificações ("G", "T1", "EXTRA") ficam na chave: "BANANA
+PRATA G" e "BANANA PRATA" são produtos diferentes.
+
+Chaves que não batem exatamente são casadas por similaridade com um índice
+de blocos (prefixos das palavras): cada chave só é comparada com as que
+dividem algum bloco com ela, nunca com o catálogo inteiro, e só com as de
+mesma classificação.
+
+resolver_nomes usa a tabela aliases_produto (chave -> nome canônico) e grava
+nela, em lote, as chaves novas. Casamentos aproximados ficam gravados como
+sugestão (origem "aproximado", inativa) e só passam a valer depois de
+confirmados com confirmar_sugestao.
+"""
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+# unidades/embalagens que aparecem coladas ao nome em alguns boletins; sem
+# letras isoladas: "G" sozinho é a classificação (graúdo), não grama
+UNIDADES = (
+    "kg", "kgs", "gr", "un", "und", "unid", "dz", "duzia", "cx", "caixa",
+    "sc", "saco", "mc", "maco", "bdj", "bandeja", "pct", "pacote", "engradado", "eng",
+)
+_RE_UNIDADES = re.compile(
+    r"\b\d*[.,]?\d*\s*(?:" + "|".join(UNIDADES) + r")\b\.?"
+    # grama só com o peso na frente: "500G", "500 g"
+    r"|\b\d+[.,]?\d*\s*g\b\.?"
+)
+_RE_NAO_ALFANUM = re.compile(r"[^a-z0-9]+")
+
+# palavras de classificação/tipo: nomes que diferem nelas nunca são casados
+CLASSIFICACOES = {
+    "extra", "especial", "primeira", "segunda", "terceira", "graudo", "miudo", "medio",
+    "tipo", "selecionado", "comum", "organico",
+}
+_LIGACOES = {"de", "da", "do", "e"}
+
+LIMIAR_SIMILARIDADE = 0.88
+TAMANHO_BLOCO = 4
+
+
+def normalizar_nome(serie: pd.Series) -> pd.Series:
+    """Chave canônica de cada nome (tratando cada nome distinto uma vez)."""
+    codigos, distintos = pd.factorize(serie)
+    texto = (
+        pd.Series(distintos, dtype="string")
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace(_RE_UNIDADES, " ", regex=True)
+        .str.replace(_RE_NAO_ALFANUM, " ", regex=True)
+    )
+    chaves = texto.str.split().map(lambda palavras: " ".join(sorted(palavras)), na_action="ignore")
+    chaves = chaves.fillna("").to_numpy(dtype=object)
+    valores = pd.Series(chaves[codigos], index=serie.index, name=serie.name, dtype=object)
+    return valores.where(codigos >= 0, "")
+
+
+def _blocos(chave: str) -> set[str]:
+    return {p[:TAMANHO_BLOCO] for p in chave.split() if len(p) >= 3}
+
+
+def classificacao(chave: str) -> frozenset[str]:
+    """Palavras de classificação da chave: as de CLASSIFICACOES, as de até 2 letras ("g", "aa") e as com dígito ("t1")."""
+    return frozenset(
+        p for p in chave.split()
+        if p not in _LIGACOES and (p in CLASSIFICACOES or len(p) <= 2 or any(c.isdigit() for c in p))
+    )
+
+
+class IndiceAproximado:
+    """Índice de blocos para casar uma chave com a mais parecida já conhecida."""
+
+    def __init__(self, chaves=()):
+        self._blocos = defaultdict(set)
+        for chave in chaves:
+            self.adicionar(chave)
+
+    def adicionar(self, chave: str):
+        for bloco in _blocos(chave):
+            self._blocos[bloco].add(chave)
+
+    def candidatos(self, chave: str) -> set[str]:
+        encontrados = set()
+        for bloco in _blocos(chave):
+            encontrados |= self._blocos.get(bloco, set())
+        return encontrados
+
+    def melhor(self, chave: str, limiar=LIMIAR_SIMILARIDADE) -> tuple[str | None, float]:
+        """Chave conhecida mais parecida (e a similaridade) ou (None, 0)."""
+        melhor, nota = None, 0.0
+        comparador = SequenceMatcher(b=chave, autojunk=False)
+        classes = classificacao(chave)
+        for candidata in self.candidatos(chave):
+            if classificacao(candidata) != classes:
+                continue
+            comparador.set_seq1(candidata)
+            if comparador.real_quick_ratio() < limiar or comparador.quick_ratio() < limiar:
+                continue
+            r = comparador.ratio()
+            if r > nota:
+                melhor, nota = candidata, r
+        if nota >= limiar:
+            return melhor, nota
+        return None, 0.0
+
+
+def casar_chaves(chaves: pd.Series, referencia, limiar=LIMIAR_SIMILARIDADE) -> pd.Series:
+    """
+    Troca as chaves que não existem em `referencia` pela chave mais parecida
+    de `referencia` (se houver uma acima do limiar). Usado nas comparações
+    entre boletins, sem banco.
+    """
+    conhecidas = set(referencia)
+    faltando = [c for c in pd.unique(chaves) if c and c not in conhecidas]
+    if not faltando:
+        return chaves
+    indice = IndiceAproximado(conhecidas)
+    trocas = {}
+    for chave in faltando:
+        parecida, _ = indice.melhor(chave, limiar)
+        if parecida is not None:
+            trocas[chave] = parecida
+    return chaves.replace(trocas) if trocas else chaves
+
+
+def chaves_para_comparar(nomes_hoje: pd.Series, nomes_anterior: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Chaves de junção dos dois boletins, com o anterior casado ao de hoje."""
+    chaves_hoje = normalizar_nome(nomes_hoje)
+    chaves_anterior = casar_chaves(normalizar_nome(nomes_anterior), chaves_hoje)
+    return chaves_hoje, chaves_anterior
+
+
+def carregar_aliases(db: Session) -> pd.DataFrame:
+    # import tardio: as comparações usam este módulo sem banco configurado
+    from models import AliasProduto
+
+    linhas = db.execute(
+        select(AliasProduto.chave, AliasProduto.nome_canonico, AliasProduto.chave_canonica,
+               AliasProduto.origem, AliasProduto.ativo)
+    ).all()
+    return pd.DataFrame(linhas, columns=["chave", "nome_canonico", "chave_canonica", "origem", "ativo"])
+
+
+def resolver_nomes(db: Session, nomes: pd.Series, limiar=LIMIAR_SIMILARIDADE, gravar=True) -> pd.Series:
+    """
+    Nome canônico de cada nome, em lote: uma leitura da tabela de aliases,
+    casamento aproximado só para as chaves novas e um insert com os aliases
+    novos (na transação de quem chamou, sem commit).
+
+    Um casamento aproximado não é aplicado: a chave entra como sugestão
+    inativa apontando para o canônico parecido e, até ser confirmada, o
+    nome resolve para ele mesmo.
+    """
+    chaves = normalizar_nome(nomes)
+    aliases = carregar_aliases(db)
+    ativos = aliases[aliases["ativo"].astype(bool)]
+    canonico = dict(zip(ativos["chave"], ativos["nome_canonico"]))
+    indice = IndiceAproximado(set(ativos["chave_canonica"]))
+    canonica_para_nome = dict(zip(ativos["chave_canonica"], ativos["nome_canonico"]))
+
+    # primeiro nome visto de cada chave nova vira o canônico (como o .title() de antes)
+    primeiros = pd.DataFrame({"chave": chaves, "nome": nomes.astype(str).str.strip().str.title()})
+    primeiros = primeiros[(primeiros["chave"] != "") & ~primeiros["chave"].isin(set(aliases["chave"]))]
+    primeiros = primeiros.drop_duplicates("chave")
+
+    novos = []
+    for chave, nome in zip(primeiros["chave"], primeiros["nome"]):
+        parecida, nota = indice.melhor(chave, limiar)
+        if parecida is not None:
+            # sugestão: fica gravada, mas só vale depois de confirmada
+            novos.append({"chave": chave, "nome_canonico": canonica_para_nome[parecida],
+                          "chave_canonica": parecida, "origem": "aproximado",
+                          "similaridade": round(nota, 3), "ativo": False})
+            continue
+        registro = {"chave": chave, "nome_canonico": nome[:100],
+                    "chave_canonica": chave, "origem": "exato", "similaridade": 1.0, "ativo": True}
+        indice.adicionar(chave)
+        canonica_para_nome[chave] = registro["nome_canonico"]
+        canonico[chave] = registro["nome_canonico"]
+        novos.append(registro)
+
+    if novos and gravar:
+        from models import AliasProduto
+
+        db.execute(insert(AliasProduto), novos)
+
+    resolvidos = chaves.map(canonico)
+    # nome vazio/inválido fica como veio
+    return resolvidos.fillna(nomes.astype(str).str.strip().str.title())
+
+
+def sugestoes_pendentes(db: Session) -> pd.DataFrame:
+    """Casamentos aproximados ainda não confirmados (chave -> canônico sugerido)."""
+    aliases = carregar_aliases(db)
+    return aliases[~aliases["ativo"].astype(bool)].reset_index(drop=True)
+
+
+def confirmar_sugestao(db: Session, chave: str, aceitar=True, nome: str | None = None):
+    """
+    Decide uma sugestão (sem commit). aceitar=True ativa o casamento
+    sugerido; aceitar=False torna a chave um produto próprio, com `nome`
+    como canônico. As duas viram origem "manual".
+    """
+    from models import AliasProduto
+
+    if aceitar:
+        valores = {"ativo": True, "origem": "manual"}
+    else:
+        if not nome:
+            raise ValueError("Informe o nome canônico do produto para recusar a sugestão.")
+        valores = {"ativo": True, "origem": "manual", "nome_canonico": nome.strip()[:100],
+                   "chave_canonica": chave, "similaridade": 1.0}
+    resultado = db.execute(
+        update(AliasProduto)
+        .where(AliasProduto.chave == chave, AliasProduto.ativo.is_(False))
+        .values(**valores)
+    )
+    if resultado.rowcount == 0:
+        raise LookupError(f"Nenhuma sugestão pendente para a chave '{chave}'.")
@@ -0,0 +1,88 @@
+# services/categorias.py
+"""
+Categorização de produtos por palavras-chave.
+
+As regras ficam em regras_categorias.json (ou no arquivo apontado por
+CEASA_REGRAS_CATEGORIAS): cada conjunto tem uma lista ordenada de regras
+{nome, palavras} e um valor padrão. Todas as palavras de um conjunto viram
+uma única regex; a primeira regra da lista que tiver alguma palavra contida
+no nome vence, como nos antigos any(k in n for k in ...).
+
+O resultado é memorizado por nome distinto, então uma coluna com milhões
+de linhas custa só os nomes diferentes que ela tem.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+REGRAS_PADRAO = os.getenv(
+    "CEASA_REGRAS_CATEGORIAS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "regras_categorias.json"),
+)
+SEM_NOME = "Outros"
+
+
+class Categorizador:
+    """Um conjunto de regras compilado numa regex só, com cache por nome."""
+
+    def __init__(self, regras: list[dict], padrao: str, sem_nome: str = SEM_NOME):
+        self.nomes = [r["nome"] for r in regras]
+        self.padrao = padrao
+        self.sem_nome = sem_nome
+        # um grupo por regra, dentro de um lookahead: a busca testa todas as
+        # posições do nome, inclusive palavras sobrepostas; numa mesma
+        # posição a alternância já escolhe a regra mais prioritária
+        grupos = "|".join(
+            "(" + "|".join(re.escape(p.lower()) for p in sorted(r["palavras"], key=len, reverse=True)) + ")"
+            for r in regras
+        )
+        self._regex = re.compile(f"(?=(?:{grupos}))")
+        self._cache: dict[str, str] = {}
+
+    def classificar(self, nome) -> str:
+        if not isinstance(nome, str):
+            return self.sem_nome
+        n = nome.lower()
+        resultado = self._cache.get(n)
+        if resultado is None:
+            melhor = None
+            for m in self._regex.finditer(n):
+                if melhor is None or m.lastindex < melhor:
+                    melhor = m.lastindex
+                    if melhor == 1:
+                        break
+            resultado = self.padrao if melhor is None else self.nomes[melhor - 1]
+            self._cache[n] = resultado
+        return resultado
+
+    def classificar_serie(self, serie: pd.Series) -> pd.Series:
+        """Classifica a coluna inteira tratando cada nome distinto uma vez."""
+        codigos, distintos = pd.factorize(serie)
+        rotulos = np.array([self.classificar(n) for n in distintos] + [self.sem_nome], dtype=object)
+        # código -1 (nulo) cai no último rótulo
+        return pd.Series(rotulos[codigos], index=serie.index, name=serie.name)
+
+
+@lru_cache(maxsize=None)
+def carregar_regras(caminho: str = REGRAS_PADRAO) -> dict[str, Categorizador]:
+    """Lê o arquivo de regras e compila um Categorizador por conjunto."""
+    with open(caminho, encoding="utf-8") as f:
+        conjuntos = json.load(f)
+    return {
+        chave: Categorizador(conjunto["regras"], conjunto["padrao"])
+        for chave, conjunto in conjuntos.items()
+    }
+
+
+def categorizar(serie: pd.Series, caminho: str = REGRAS_PADRAO) -> pd.Series:
+    return carregar_regras(caminho)["categorias"].classificar_serie(serie)
+
+
+def subcategorizar(serie: pd.Series, categorias: pd.Series, caminho: str = REGRAS_PADRAO) -> pd.Series:
+    """Subcategoria só para os itens de Hortifruti; o resto fica vazio."""
+    subcategorias = carregar_regras(caminho)["subcategorias_hortifruti"].classificar_serie(serie)
+    return subcategorias.where(categorias == "Hortifruti", "")
@@ -0,0 +1,178 @@
+# services/comparacao.py
+"""
+Comparação de preços entre boletins, compartilhada por comparar_ceasa e
+analise_ceasa. Status e diferenças são calculados por coluna (máscaras),
+sem apply por linha.
+
+comparar_arquivo compara o boletim de referência com vários horizontes
+(D-1, D-7, D-30, mesmo dia da semana do ano anterior) lendo cada boletim
+do arquivo uma vez e pivotando tudo numa matriz produto x data.
+"""
+import numpy as np
+import pandas as pd
+
+from services.arquivo_boletins import ARQUIVO_DIR, listar_arquivados, ler_boletim
+from services.canonico import casar_chaves, normalizar_nome
+from services.precos import parse_preco_br
+
+# ordem de exibição: quem subiu primeiro; SEM BOLETIM só nos horizontes
+# sem boletim dentro da tolerância (comparar_horizontes)
+STATUS_VARIACAO = pd.CategoricalDtype(
+    ["SUBIU", "CAIU", "IGUAL", "NOVO", "SEM PREÇO", "SEM BOLETIM"], ordered=True
+)
+
+
+def classificar_variacao(preco_hoje: pd.Series, preco_anterior: pd.Series) -> pd.Series:
+    """
+    Status de cada produto como categórico ordenado:
+    NOVO (sem preço anterior), SEM PREÇO (sem preço hoje), SUBIU, CAIU, IGUAL.
+
+    Sem preço hoje e com preço antes é SEM PREÇO de propósito: o apply
+    antigo do analise_ceasa caía em IGUAL nesse caso (nem > nem < com NaN),
+    escondendo que o produto ficou sem cotação.
+    """
+    hoje = preco_hoje.to_numpy(dtype="float64")
+    anterior = preco_anterior.to_numpy(dtype="float64")
+    status = np.select(
+        [np.isnan(anterior), np.isnan(hoje), hoje > anterior, hoje < anterior],
+        ["NOVO", "SEM PREÇO", "SUBIU", "CAIU"],
+        default="IGUAL",
+    )
+    return pd.Series(pd.Categorical(status, dtype=STATUS_VARIACAO), index=preco_hoje.index)
+
+
+def calcular_variacao(df: pd.DataFrame, col_hoje="preco_hoje", col_anterior="preco_anterior") -> pd.DataFrame:
+    """Acrescenta dif_abs, dif_pct (em %) e status ao DataFrame."""
+    hoje = pd.to_numeric(df[col_hoje], errors="coerce")
+    anterior = pd.to_numeric(df[col_anterior], errors="coerce")
+    df["dif_abs"] = hoje - anterior
+    df["dif_pct"] = (df["dif_abs"] / anterior) * 100
+    df["status"] = classificar_variacao(hoje, anterior)
+    return df
+
+
+# -------------------------------------------------
+# vários horizontes de uma vez
+# -------------------------------------------------
+# dias para trás a partir do boletim de referência; 364 = mesmo dia da
+# semana do ano anterior
+HORIZONTES_PADRAO = {"D-1": 1, "D-7": 7, "D-30": 30, "ano_anterior": 364}
+
+# boletim mais antigo que (alvo - tolerância) não conta para o horizonte
+TOLERANCIA_DIAS = 7
+
+
+def datas_dos_horizontes(datas, data_ref, horizontes=HORIZONTES_PADRAO, tolerancia=TOLERANCIA_DIAS) -> dict:
+    """
+    Para cada horizonte, o boletim mais recente em ou antes de
+    data_ref - dias (segunda-feira D-1 = sexta). None se não houver
+    boletim dentro da tolerância.
+    """
+    disponiveis = pd.DatetimeIndex(sorted(pd.to_datetime(list(datas))))
+    ref = pd.Timestamp(data_ref)
+    escolhidas = {}
+    for nome, dias in horizontes.items():
+        alvo = ref - pd.Timedelta(days=dias)
+        pos = disponiveis.searchsorted(alvo, side="right") - 1
+        if pos >= 0 and alvo - disponiveis[pos] <= pd.Timedelta(days=tolerancia):
+            escolhidas[nome] = disponiveis[pos]
+        else:
+            escolhidas[nome] = None
+    return escolhidas
+
+
+def carregar_janela(data_ref=None, horizontes=HORIZONTES_PADRAO, col_produto="Produto", col_preco="M.C.",
+                    pasta=ARQUIVO_DIR, tolerancia=TOLERANCIA_DIAS) -> tuple[pd.DataFrame, pd.Timestamp, dict]:
+    """
+    Lê do arquivo Parquet só os boletins que os horizontes usam (cada um uma
+    vez, só as colunas de produto e preço) e devolve a tabela longa
+    (data, Produto, preco), a data de referência e as datas por horizonte.
+    """
+    arquivados = {pd.Timestamp(b["data"]): b["caminho"] for b in listar_arquivados(pasta=pasta)}
+    if not arquivados:
+        raise FileNotFoundError(f"Nenhum boletim arquivado em {pasta}.")
+    ref = pd.Timestamp(data_ref) if data_ref is not None else max(arquivados)
+    if ref not in arquivados:
+        raise FileNotFoundError(f"Boletim de {ref.date()} não está no arquivo.")
+
+    datas = datas_dos_horizontes(arquivados, ref, horizontes, tolerancia)
+    partes = []
+    for data in sorted({ref, *(d for d in datas.values() if d is not None)}):
+        df = ler_boletim(arquivados[data], colunas=[col_produto, col_preco])
+        partes.append(pd.DataFrame({
+            "data": data,
+            "Produto": df[col_produto],
+            "preco": parse_preco_br(df[col_preco]),
+        }))
+    return pd.concat(partes, ignore_index=True), ref, datas
+
+
+def matriz_precos(longo: pd.DataFrame, data_ref=None) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Pivota a tabela longa em produto x data (chave canônica do produto; com
+    data_ref, os nomes das outras datas são casados com os dessa data).
+    Devolve a matriz e o nome de exibição de cada chave (o mais recente).
+    Produto listado sem preço numa data fica com NaN, mas continua na matriz.
+    """
+    chaves = normalizar_nome(longo["Produto"])
+    if data_ref is not None:
+        chaves = casar_chaves(chaves, chaves[longo["data"] == pd.Timestamp(data_ref)])
+    longo = longo.assign(_key_prod=chaves)
+    matriz = longo.groupby(["_key_prod", "data"])["preco"].last().unstack("data")
+    nomes = longo.sort_values("data", kind="stable").drop_duplicates("_key_prod", keep="last")
+    return matriz, nomes.set_index("_key_prod")["Produto"]
+
+
+def comparar_horizontes(matriz: pd.DataFrame, data_ref, datas: dict, nomes: pd.Series | None = None,
+                        produtos=None) -> pd.DataFrame:
+    """
+    Uma linha por produto do boletim de referência (produtos: chaves; sem
+    elas, os que têm preço na data) e, para cada horizonte, preco_<h>,
+    dif_abs_<h>, dif_pct_<h> e status_<h>. Todas as diferenças saem de uma
+    única operação sobre a matriz (produtos x horizontes).
+    """
+    ref = pd.Timestamp(data_ref)
+    matriz = matriz.reindex(columns=matriz.columns.union([ref]))
+    if produtos is None:
+        produtos = matriz.index[matriz[ref].notna()]
+    matriz = matriz.reindex(pd.Index(produtos).unique())
+    hoje = matriz[ref].to_numpy(dtype="float64")
+
+    nomes_h = list(datas)
+    sem_boletim = np.array([d is None or d not in matriz.columns for d in datas.values()], dtype=bool)
+    anteriores = np.column_stack([
+        np.full(len(matriz), np.nan) if falta else matriz[d].to_numpy(dtype="float64")
+        for d, falta in zip(datas.values(), sem_boletim)
+    ]) if nomes_h else np.empty((len(matriz), 0))
+
+    atual = hoje[:, None]
+    dif_abs = atual - anteriores
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dif_pct = dif_abs / anteriores * 100
+    status = np.select(
+        [np.broadcast_to(sem_boletim, anteriores.shape), np.isnan(anteriores),
+         np.isnan(atual) & ~np.isnan(anteriores), atual > anteriores, atual < anteriores],
+        ["SEM BOLETIM", "NOVO", "SEM PREÇO", "SUBIU", "CAIU"],
+        default="IGUAL",
+    )
+
+    resultado = pd.DataFrame({
+        "Produto": nomes.reindex(matriz.index).to_numpy() if nomes is not None else matriz.index.to_numpy(),
+        "preco_hoje": hoje,
+    })
+    for i, h in enumerate(nomes_h):
+        resultado[f"preco_{h}"] = anteriores[:, i]
+        resultado[f"dif_abs_{h}"] = dif_abs[:, i]
+        resultado[f"dif_pct_{h}"] = dif_pct[:, i]
+        resultado[f"status_{h}"] = pd.Categorical(status[:, i], dtype=STATUS_VARIACAO)
+    resultado.attrs["datas"] = {h: (d.date().isoformat() if d is not None else None) for h, d in datas.items()}
+    return resultado.sort_values("Produto", ignore_index=True)
+
+
+def comparar_arquivo(data_ref=None, horizontes=HORIZONTES_PADRAO, col_produto="Produto", col_preco="M.C.",
+                     pasta=ARQUIVO_DIR, tolerancia=TOLERANCIA_DIAS) -> pd.DataFrame:
+    """carregar_janela + matriz_precos + comparar_horizontes."""
+    longo, ref, datas = carregar_janela(data_ref, horizontes, col_produto, col_preco, pasta, tolerancia)
+    matriz, nomes = matriz_precos(longo, ref)
+    produtos = normalizar_nome(longo.loc[longo["data"] == ref, "Produto"])
+    return comparar_horizontes(matriz, ref, datas, nomes, produtos)
@@ -0,0 +1,153 @@
+# services/delta_boletim.py
+"""
+Diferença entre duas versões do boletim arquivado (api.py /boletim/delta),
+para o app sincronizar só o que mudou desde o último boletim que ele tem:
+
+- novos: produtos que não estavam na versão do cliente;
+- alterados: produtos com MIN, M.C. ou MAX diferentes;
+- removidos: nomes dos produtos que saíram do boletim.
+
+Linhas novas e alteradas vêm inteiras, no mesmo formato do /boletim. O
+conteúdo de cada versão é fixo (versão = data + hash do arquivo), então o
+delta de um par de versões é calculado uma vez e fica serializado em
+memória até sair do LRU.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from services.arquivo_boletins import listar_arquivados, ler_boletim, versao_arquivado
+from services.boletim_servido import MERCADO, padronizar_boletim
+from services.indice_boletim import coluna_produto
+from services.precos import COLUNAS_PRECO, parse_preco_br
+from services.respostas import serializar
+
+MAXIMO_DELTAS = 64   # pares de versões guardados
+
+
+@dataclass
+class DeltaServido:
+    versao_base: str
+    versao: str
+    corpo: bytes
+    etag: str
+    tempo_serializacao: float
+
+
+def calcular_delta(base: pd.DataFrame, atual: pd.DataFrame) -> dict:
+    """Novos, alterados e removidos de `atual` em relação a `base` (já padronizados)."""
+    col_atual = coluna_produto(list(atual.columns))
+    col_base = coluna_produto(list(base.columns))
+    chave_atual = atual[col_atual].astype(str).str.strip()
+    chave_base = base[col_base].astype(str).str.strip()
+    # nome repetido no boletim: vale a última linha, como na ingestão
+    atual = atual[~chave_atual.duplicated(keep="last")]
+    chave_atual = chave_atual[atual.index]
+    base = base[~chave_base.duplicated(keep="last")]
+    chave_base = chave_base[base.index]
+
+    precos = [c for c in COLUNAS_PRECO if c in atual.columns and c in base.columns]
+    na_base = chave_atual.isin(chave_base)
+    anteriores = (
+        pd.DataFrame({c: parse_preco_br(base[c]).round(2).to_numpy() for c in precos}, index=chave_base.to_numpy())
+        .reindex(chave_atual[na_base].to_numpy())
+    )
+    agora = pd.DataFrame({c: parse_preco_br(atual.loc[na_base, c]).round(2).to_numpy() for c in precos},
+                         index=anteriores.index)
+    # sem preço nos dois lados conta como igual
+    mudou = ((agora != anteriores) & ~(agora.isna() & anteriores.isna())).any(axis=1).to_numpy()
+
+    alterados = np.zeros(len(atual), dtype=bool)
+    alterados[np.flatnonzero(na_base.to_numpy())[mudou]] = True
+    return {
+        "novos": atual[~na_base.to_numpy()].to_dict(orient="records"),
+        "alterados": atual[alterados].to_dict(orient="records"),
+        "removidos": chave_base[~chave_base.isin(chave_atual)].tolist(),
+    }
+
+
+def _data_desde(texto: str):
+    for formato in ("%Y-%m-%d", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(texto, formato).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError("desde deve ser uma data (aaaa-mm-dd) ou uma versão do boletim (aaaa-mm-dd.hash)")
+
+
+class CacheDelta:
+    """Deltas entre versões do arquivo Parquet em `arquivo`, num LRU de pares de versões."""
+
+    def __init__(self, arquivo: str, mercado=MERCADO, maximo=MAXIMO_DELTAS):
+        self.arquivo = arquivo
+        self.mercado = mercado
+        self.maximo = maximo
+        self._deltas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def _base(self, desde: str, boletins: list[dict]) -> dict:
+        """Entrada do manifesto que o cliente tem: a versão exata ou o último boletim até a data."""
+        desde = desde.strip()
+        if "." in desde and "/" not in desde:
+            data = _data_desde(desde.split(".", 1)[0])
+            for b in boletins:
+                if b["data"] == data:
+                    if versao_arquivado(b) == desde:
+                        return b
+                    break
+            raise LookupError(f"A versão {desde} não está mais no arquivo; baixe o boletim completo.")
+        data = _data_desde(desde)
+        for b in boletins:   # mais recente primeiro
+            if b["data"] <= data:
+                return b
+        raise LookupError(f"Nenhum boletim arquivado até {data}; baixe o boletim completo.")
+
+    def delta(self, desde: str) -> tuple[DeltaServido, bool]:
+        """Delta do boletim atual desde a versão (ou data) `desde`; o bool diz se veio do cache."""
+        boletins = listar_arquivados(pasta=self.arquivo)
+        if not boletins:
+            raise FileNotFoundError("Nenhum boletim no arquivo.")
+        atual = boletins[0]
+        base = self._base(desde, boletins)
+        par = (versao_arquivado(base), versao_arquivado(atual))
+
+        with self._trava:
+            if par in self._deltas:
+                self._deltas.move_to_end(par)
+                return self._deltas[par], True
+
+        if par[0] == par[1]:
+            diferenca = {"novos": [], "alterados": [], "removidos": []}
+        else:
+            diferenca = calcular_delta(padronizar_boletim(ler_boletim(base["caminho"])),
+                                       padronizar_boletim(ler_boletim(atual["caminho"])))
+        inicio = time.perf_counter()
+        corpo = serializar({
+            "mercado": self.mercado,
+            "data": atual["data"],
+            "versao": par[1],
+            "desde": par[0],
+            "total": atual["linhas"],
+            **diferenca,
+        })
+        servido = DeltaServido(
+            versao_base=par[0],
+            versao=par[1],
+            corpo=corpo,
+            etag=f'"{par[0]}..{par[1]}"',
+            tempo_serializacao=time.perf_counter() - inicio,
+        )
+        with self._trava:
+            self._deltas[par] = servido
+            while len(self._deltas) > self.maximo:
+                self._deltas.popitem(last=False)
+        return servido, False
+
+    def limpar(self):
+        with self._trava:
+            self._deltas.clear()
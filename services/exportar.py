@@ -0,0 +1,148 @@
+# services/exportar.py
+"""
+Exportação de planilhas compartilhada pelo scraper, comparar_ceasa e
+analise_ceasa.
+
+- larguras das colunas calculadas com operações vetorizadas de string;
+- xlsxwriter em modo constant_memory: as linhas vão para o disco em
+  ordem, em blocos, sem montar a planilha inteira em memória;
+- acima de LIMITE_LINHAS_XLSX a tabela sai em CSV/Parquet (a aba do xlsx
+  só aponta para o arquivo).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from services.precos import parse_preco_br
+
+LIMITE_LINHAS_XLSX = int(os.getenv("CEASA_LIMITE_LINHAS_XLSX", "200000"))
+FORMATO_ALTERNATIVO = os.getenv("CEASA_FORMATO_ALTERNATIVO", "csv")
+LINHAS_POR_BLOCO = 10_000
+
+FORMATO_CABECALHO = {"bold": True, "bg_color": "#D9D9D9"}
+FORMATO_NUMERO = "#,##0.00"
+FORMATO_DATA = "dd/mm/yyyy"
+FORMATO_DATA_HORA = "dd/mm/yyyy hh:mm:ss"
+
+
+def larguras_colunas(df: pd.DataFrame, maximo=40, folga=2) -> list[int]:
+    """Largura de cada coluna (maior entre cabeçalho e conteúdo), sem laço por célula."""
+    larguras = []
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            # dígitos da parte inteira + separadores de milhar + ",00"
+            maior = serie.abs().max()
+            if pd.isna(maior) or maior < 1:
+                conteudo = 4
+            else:
+                digitos = int(np.floor(np.log10(maior))) + 1
+                conteudo = digitos + (digitos - 1) // 3 + 3 + int((serie < 0).any())
+        else:
+            tamanhos = serie.astype("string").str.len()
+            conteudo = int(tamanhos.max()) if tamanhos.notna().any() else 0
+        larguras.append(min(max(conteudo, len(str(col))), maximo) + folga)
+    return larguras
+
+
+def criar_writer(caminho: str) -> pd.ExcelWriter:
+    """ExcelWriter do xlsxwriter em modo constant_memory."""
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    return pd.ExcelWriter(
+        caminho,
+        engine="xlsxwriter",
+        engine_kwargs={"options": {"constant_memory": True, "nan_inf_to_errors": True}},
+    )
+
+
+def exportar_alternativo(df: pd.DataFrame, caminho_base: str, formato=None) -> str:
+    """Grava a tabela em CSV ou Parquet (caminho_base sem extensão)."""
+    formato = formato or FORMATO_ALTERNATIVO
+    if formato == "parquet":
+        caminho = caminho_base + ".parquet"
+        df.to_parquet(caminho, index=False)
+    else:
+        caminho = caminho_base + ".csv"
+        df.to_csv(caminho, index=False, encoding="utf-8-sig")
+    return caminho
+
+
+def _formato_data(serie: pd.Series) -> str:
+    # só data (meia-noite em todas as linhas) ou data e hora
+    serie = serie.dropna()
+    return FORMATO_DATA if (serie == serie.dt.normalize()).all() else FORMATO_DATA_HORA
+
+
+def escrever_aba(writer: pd.ExcelWriter, df: pd.DataFrame, aba: str, formatos: dict | None = None,
+                 larguras: dict | None = None, formato_cabecalho=None, autofiltro=False,
+                 limite_linhas=None):
+    """
+    Escreve df numa aba nova, linha a linha e em ordem (exigência do
+    constant_memory). formatos: {coluna: num_format}; colunas numéricas sem
+    formato usam FORMATO_NUMERO e as de data FORMATO_DATA (ou
+    FORMATO_DATA_HORA, se alguma tiver hora). larguras: {coluna: largura} fixas.
+    Acima de limite_linhas a tabela vai para um CSV/Parquet ao lado do xlsx.
+    Devolve a worksheet.
+    """
+    wb = writer.book
+    ws = wb.add_worksheet(aba)
+    writer.sheets[aba] = ws
+    cabecalho = wb.add_format(formato_cabecalho or FORMATO_CABECALHO)
+
+    limite = LIMITE_LINHAS_XLSX if limite_linhas is None else limite_linhas
+    if len(df) > limite:
+        # o pandas abre o arquivo e passa o handle ao xlsxwriter
+        destino = getattr(wb.filename, "name", wb.filename)
+        base = os.path.splitext(os.path.abspath(destino))[0] + f"_{aba}"
+        caminho = exportar_alternativo(df, base)
+        ws.write(0, 0, "Arquivo", cabecalho)
+        ws.write(1, 0, f"{len(df)} linhas exportadas em {caminho}")
+        ws.set_column(0, 0, 80)
+        print(f"📦 Aba {aba} grande demais para o xlsx, salva em: {caminho}")
+        return ws
+
+    # float32 (boletim compacto) sai com o decimal mais curto, sem ruído
+    curtos = [c for c in df.columns if df[c].dtype == "float32"]
+    if curtos:
+        df = df.assign(**{c: parse_preco_br(df[c]) for c in curtos})
+
+    formatos = formatos or {}
+    larguras = larguras or {}
+    calculadas = larguras_colunas(df)
+    for i, col in enumerate(df.columns):
+        num_format = formatos.get(col)
+        if num_format is None and pd.api.types.is_float_dtype(df[col]):
+            num_format = FORMATO_NUMERO
+        elif num_format is None and pd.api.types.is_datetime64_any_dtype(df[col]):
+            num_format = _formato_data(df[col])
+        fmt = wb.add_format({"num_format": num_format}) if num_format else None
+        ws.set_column(i, i, larguras.get(col, calculadas[i]), fmt)
+
+    ws.write_row(0, 0, [str(c) for c in df.columns], cabecalho)
+    linha = 1
+    for inicio in range(0, len(df), LINHAS_POR_BLOCO):
+        bloco = df.iloc[inicio:inicio + LINHAS_POR_BLOCO]
+        bloco = bloco.astype(object).where(bloco.notna(), None)
+        for valores in bloco.itertuples(index=False, name=None):
+            ws.write_row(linha, 0, valores)
+            linha += 1
+
+    if autofiltro and len(df.columns):
+        ws.autofilter(0, 0, len(df), len(df.columns) - 1)
+    return ws
+
+
+def exportar_tabela(df: pd.DataFrame, caminho: str, aba="Boletim", limite_linhas=None, **opcoes) -> str:
+    """
+    Exporta uma tabela única. Até limite_linhas gera o xlsx formatado;
+    acima disso grava direto CSV/Parquet. Devolve o caminho gerado.
+    """
+    limite = LIMITE_LINHAS_XLSX if limite_linhas is None else limite_linhas
+    if len(df) > limite:
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        return exportar_alternativo(df, os.path.splitext(caminho)[0])
+
+    with criar_writer(caminho) as writer:
+        escrever_aba(writer, df, aba, limite_linhas=limite, **opcoes)
+    return caminho
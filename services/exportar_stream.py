@@ -0,0 +1,189 @@
+# services/exportar_stream.py
+"""
+Exportação em fluxo das tabelas de histórico (routes/exportar.py):
+boletins (BoletimCeasa), vendas (Venda + ItemVenda, uma linha por item)
+e estoque (movimentações).
+
+A consulta roda com stream_results/yield_per (cursor no servidor) e é
+lida em lotes de tamanho fixo; cada lote vira um pedaço da resposta
+(NDJSON, CSV ou um row group Parquet) e é descartado antes do próximo.
+Nada de objetos ORM nem .all(): a memória fica em um lote, qualquer que
+seja o período pedido.
+"""
+import csv
+import io
+import os
+from datetime import date, datetime, time, timedelta
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import DECIMAL, Date, DateTime, Integer, select
+
+from models import BoletimCeasa, Estoque, ItemVenda, Venda
+from services.respostas import serializar
+
+TAMANHO_LOTE = int(os.getenv("CEASA_EXPORTAR_LOTE", "5000"))   # linhas por lote
+
+FORMATOS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _consulta_boletins():
+    colunas = [BoletimCeasa.data_boletim, BoletimCeasa.produto, BoletimCeasa.preco_min,
+               BoletimCeasa.preco_medio, BoletimCeasa.preco_max, BoletimCeasa.origem]
+    return select(*colunas).order_by(BoletimCeasa.data_boletim, BoletimCeasa.produto), BoletimCeasa.data_boletim
+
+
+def _consulta_vendas():
+    colunas = [
+        Venda.id.label("id_venda"), Venda.data_venda, Venda.id_cliente, Venda.id_usuario,
+        Venda.forma_pagamento, Venda.status, Venda.valor_total,
+        ItemVenda.id.label("id_item"), ItemVenda.id_produto, ItemVenda.quantidade, ItemVenda.preco_unitario,
+    ]
+    consulta = (
+        select(*colunas)
+        .select_from(Venda)
+        .outerjoin(ItemVenda, ItemVenda.id_venda == Venda.id)
+        .order_by(Venda.data_venda, Venda.id, ItemVenda.id)
+    )
+    return consulta, Venda.data_venda
+
+
+def _consulta_estoque():
+    colunas = [Estoque.id, Estoque.data_movimento, Estoque.id_produto, Estoque.quantidade,
+               Estoque.tipo, Estoque.origem, Estoque.observacao]
+    return select(*colunas).order_by(Estoque.data_movimento, Estoque.id), Estoque.data_movimento
+
+
+# tabela -> (consulta ordenada, coluna de data do filtro de período)
+TABELAS = {
+    "boletins": _consulta_boletins,
+    "vendas": _consulta_vendas,
+    "estoque": _consulta_estoque,
+}
+
+
+def montar_consulta(tabela: str, de: date | None = None, ate: date | None = None):
+    if tabela not in TABELAS:
+        raise ValueError(f"tabela deve ser uma de {', '.join(TABELAS)}")
+    consulta, coluna_data = TABELAS[tabela]()
+    com_hora = isinstance(coluna_data.type, DateTime)
+    if de is not None:
+        consulta = consulta.where(coluna_data >= (datetime.combine(de, time.min) if com_hora else de))
+    if ate is not None:
+        # período inclusivo: no DateTime vale o dia inteiro de `ate`
+        if com_hora:
+            consulta = consulta.where(coluna_data < datetime.combine(ate + timedelta(days=1), time.min))
+        else:
+            consulta = consulta.where(coluna_data <= ate)
+    return consulta
+
+
+def _tipo_arrow(tipo_sql) -> pa.DataType:
+    if isinstance(tipo_sql, DECIMAL):
+        return pa.decimal128(tipo_sql.precision or 18, tipo_sql.scale or 0)
+    if isinstance(tipo_sql, DateTime):
+        return pa.timestamp("us")
+    if isinstance(tipo_sql, Date):
+        return pa.date32()
+    if isinstance(tipo_sql, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def esquema_arrow(consulta) -> pa.Schema:
+    return pa.schema([(col.name, _tipo_arrow(col.type)) for col in consulta.selected_columns])
+
+
+def lotes(db, consulta, tamanho=TAMANHO_LOTE):
+    """Linhas da consulta em listas de até `tamanho`, lidas do cursor no servidor."""
+    resultado = db.execute(consulta.execution_options(stream_results=True, yield_per=tamanho))
+    try:
+        yield from resultado.partitions(tamanho)
+    finally:
+        resultado.close()
+
+
+def _valor_csv(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+class _Vazao(io.RawIOBase):
+    """Destino do ParquetWriter que guarda o que foi escrito até ser drenado."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def drenar(self) -> bytes:
+        dados, self._partes = b"".join(self._partes), []
+        return dados
+
+
+def gerar_ndjson(db, consulta, tamanho=TAMANHO_LOTE):
+    for lote in lotes(db, consulta, tamanho):
+        yield b"".join(serializar(linha._asdict()) + b"\n" for linha in lote)
+
+
+def gerar_csv(db, consulta, tamanho=TAMANHO_LOTE):
+    # mesmo CSV das exportações em arquivo: vírgula e utf-8 com BOM (abre direto no Excel)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n")
+    escritor.writerow([col.name for col in consulta.selected_columns])
+    yield buffer.getvalue().encode("utf-8-sig")
+    for lote in lotes(db, consulta, tamanho):
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows([_valor_csv(v) for v in linha] for linha in lote)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gerar_parquet(db, consulta, tamanho=TAMANHO_LOTE):
+    """Um row group por lote; o rodapé do arquivo sai no último pedaço."""
+    esquema = esquema_arrow(consulta)
+    vazao = _Vazao()
+    escritor = pq.ParquetWriter(vazao, esquema)
+    try:
+        for lote in lotes(db, consulta, tamanho):
+            colunas = list(zip(*lote))
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(colunas, esquema)], schema=esquema
+            ))
+            yield vazao.drenar()
+    finally:
+        escritor.close()
+    yield vazao.drenar()
+
+
+GERADORES = {"ndjson": gerar_ndjson, "csv": gerar_csv, "parquet": gerar_parquet}
+
+
+def exportar(sessao_fabrica, tabela: str, formato="ndjson", de=None, ate=None, tamanho=TAMANHO_LOTE):
+    """
+    Valida o pedido e devolve o gerador de pedaços da exportação. A sessão
+    é aberta com sessao_fabrica() só quando o fluxo começa e fechada no fim
+    dele (a resposta vive mais que a dependência get_db da rota).
+    """
+    if formato not in GERADORES:
+        raise ValueError(f"formato deve ser um de {', '.join(GERADORES)}")
+    consulta = montar_consulta(tabela, de, ate)
+
+    def pedacos():
+        db = sessao_fabrica()
+        try:
+            yield from GERADORES[formato](db, consulta, tamanho)
+        finally:
+            db.close()
+
+    return pedacos()
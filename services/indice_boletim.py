@@ -0,0 +1,157 @@
+# services/indice_boletim.py
+"""
+Índice colunar do boletim servido pela API, montado uma vez por boletim,
+para responder filtros sem varrer nem reserializar a tabela inteira:
+
+- nomes normalizados (sem acento, maiúsculos) num array ordenado: prefixo
+  vira duas buscas binárias;
+- um bitmap (array booleano) por categoria e por subcategoria, dos mesmos
+  categorizadores de analise_ceasa;
+- preços como float64, para faixas de preço;
+- posto de cada linha por coluna, calculado na primeira ordenação por ela.
+"""
+import base64
+
+import numpy as np
+import pandas as pd
+
+from services.categorias import categorizar, subcategorizar
+from services.precos import COLUNAS_PRECO, parse_preco_br
+
+COLUNAS_CATEGORIA = ["CATEGORIA", "SUBCATEGORIA"]
+
+
+def chave_busca(serie: pd.Series) -> np.ndarray:
+    """Texto para busca por prefixo: sem acento, maiúsculo, espaços simples."""
+    return (
+        serie.astype("string")
+        .fillna("")
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.upper()
+        .str.split()
+        .str.join(" ")
+        .to_numpy(dtype=str)
+    )
+
+
+def coluna_produto(colunas) -> str:
+    """Coluna do nome do produto (mesma heurística do detectar_coluna_produto das análises)."""
+    for nome in colunas:
+        low = str(nome).lower()
+        if "prod" in low or "espec" in low or "descr" in low:
+            return nome
+    return colunas[0]
+
+
+class IndiceBoletim:
+    def __init__(self, df: pd.DataFrame):
+        """df já no formato da API (colunas em MAIÚSCULAS, vazio no lugar de nulo)."""
+        self.colunas = list(df.columns)
+        self.col_produto = coluna_produto(self.colunas)
+        produtos = df[self.col_produto].astype(str)
+        categoria = categorizar(produtos)
+        subcategoria = subcategorizar(produtos, categoria)
+        self.tabela = df.assign(CATEGORIA=categoria.to_numpy(), SUBCATEGORIA=subcategoria.to_numpy())
+        self.n = len(df)
+
+        chaves = chave_busca(produtos)
+        self._ordem_nome = np.argsort(chaves, kind="stable")
+        self._nomes_ordenados = chaves[self._ordem_nome]
+
+        self._bitmaps = {}
+        for col in COLUNAS_CATEGORIA:
+            codigos, rotulos = pd.factorize(self.tabela[col])
+            self._bitmaps[col] = {chave: codigos == i for i, chave in enumerate(chave_busca(pd.Series(rotulos)))}
+        # "" (sem preço) vira NaN no parse
+        self.precos = {
+            col: parse_preco_br(df[col]).to_numpy(dtype="float64")
+            for col in COLUNAS_PRECO if col in df.columns
+        }
+        self._postos = {}
+
+    # ---------------------------------------------
+    # filtros
+    # ---------------------------------------------
+    def por_prefixo(self, prefixo: str) -> np.ndarray:
+        chave = chave_busca(pd.Series([prefixo]))[0]
+        inicio = np.searchsorted(self._nomes_ordenados, chave, side="left")
+        fim = np.searchsorted(self._nomes_ordenados, chave + "\uffff", side="left")
+        mascara = np.zeros(self.n, dtype=bool)
+        mascara[self._ordem_nome[inicio:fim]] = True
+        return mascara
+
+    def por_categoria(self, coluna: str, valor: str) -> np.ndarray:
+        chave = chave_busca(pd.Series([valor]))[0]
+        return self._bitmaps[coluna].get(chave, np.zeros(self.n, dtype=bool))
+
+    def filtrar(self, prefixo=None, categoria=None, subcategoria=None, preco_min=None, preco_max=None,
+                campo_preco="M.C.") -> np.ndarray:
+        """Posições (em ordem do boletim) das linhas que passam em todos os filtros."""
+        mascara = np.ones(self.n, dtype=bool)
+        if prefixo:
+            mascara &= self.por_prefixo(prefixo)
+        if categoria:
+            mascara &= self.por_categoria("CATEGORIA", categoria)
+        if subcategoria:
+            mascara &= self.por_categoria("SUBCATEGORIA", subcategoria)
+        if preco_min is not None or preco_max is not None:
+            if campo_preco not in self.precos:
+                raise ValueError(f"campo_preco deve ser um de {', '.join(self.precos)}")
+            precos = self.precos[campo_preco]
+            if preco_min is not None:
+                mascara &= precos >= preco_min
+            if preco_max is not None:
+                mascara &= precos <= preco_max
+        return np.flatnonzero(mascara)
+
+    # ---------------------------------------------
+    # ordenação e página
+    # ---------------------------------------------
+    def _posto(self, coluna: str) -> np.ndarray:
+        """Posto de cada linha na coluna (sem preço fica por último)."""
+        if coluna not in self._postos:
+            if coluna in self.precos:
+                valores = self.precos[coluna]
+            else:
+                valores = chave_busca(self.tabela[coluna])
+            ordem = np.argsort(valores, kind="stable")
+            posto = np.empty(self.n, dtype=np.int64)
+            posto[ordem] = np.arange(self.n)
+            if coluna in self.precos:
+                posto[np.isnan(self.precos[coluna])] = self.n
+            self._postos[coluna] = posto
+        return self._postos[coluna]
+
+    def ordenar(self, posicoes: np.ndarray, ordem: str) -> np.ndarray:
+        """ordem: "COLUNA" (crescente) ou "-COLUNA" (decrescente)."""
+        decrescente = ordem.startswith("-")
+        coluna = ordem.lstrip("-")
+        if coluna not in self.tabela.columns:
+            raise ValueError(f"ordem: coluna {coluna} não existe")
+        posto = self._posto(coluna)[posicoes]
+        if decrescente:
+            # sem preço continua no fim
+            posto = np.where(posto == self.n, self.n, -posto)
+        return posicoes[np.argsort(posto, kind="stable")]
+
+    def registros(self, posicoes: np.ndarray, colunas=None) -> list[dict]:
+        colunas = list(colunas) if colunas else self.colunas
+        desconhecidas = [c for c in colunas if c not in self.tabela.columns]
+        if desconhecidas:
+            raise ValueError(f"colunas desconhecidas: {', '.join(desconhecidas)}")
+        return self.tabela.iloc[posicoes][colunas].to_dict(orient="records")
+
+
+def codificar_cursor(versao: str, posicao: int) -> str:
+    return base64.urlsafe_b64encode(f"{versao}:{posicao}".encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        versao, posicao = texto.rsplit(":", 1)
+        return versao, int(posicao)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("cursor inválido")
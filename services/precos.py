@@ -0,0 +1,79 @@
+# services/precos.py
+"""
+Normalização de preços compartilhada pelo scraper e pelas análises.
+
+Tudo é vetorizado e elemento a elemento: um valor fora da escala é
+corrigido sozinho, sem mudar o resto da coluna.
+"""
+import numpy as np
+import pandas as pd
+
+COLUNAS_PRECO = ["MIN", "M.C.", "MAX"]
+
+# "1.234" / "12.345.678": ponto como separador de milhar sem vírgula decimal
+_SO_MILHAR = r"^-?\d{1,3}(?:\.\d{3})+$"
+
+
+def _parse_texto(valores: pd.Series) -> pd.Series:
+    texto = valores.astype("string").str.replace(r"[^\d,.\-]", "", regex=True)
+    tem_virgula = texto.str.contains(",", regex=False, na=False)
+    so_milhar = texto.str.match(_SO_MILHAR, na=False)
+    # com vírgula (ou só milhar), pontos são milhar; a vírgula é o decimal
+    sem_milhar = texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    texto = texto.mask(tem_virgula | so_milhar, sem_milhar)
+    return pd.to_numeric(texto, errors="coerce").astype("float64")
+
+
+def parse_preco_br(serie: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna em float64 entendendo o formato brasileiro:
+    "4,55", "1.234,50", "R$ 12,00", "1.234" (milhar) e também "4.55".
+    Colunas já numéricas só mudam de tipo. Texto inválido vira NaN.
+    """
+    if serie.dtype == "float32":
+        # boletim compacto: volta pelo decimal mais curto (4.55, não 4.550000190734863)
+        return serie.astype(str).astype("float64")
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype("float64")
+
+    # preços se repetem muito: o texto é tratado só uma vez por valor distinto
+    codigos, distintos = pd.factorize(serie)
+    convertidos = _parse_texto(pd.Series(distintos, dtype=object)).to_numpy()
+    valores = np.full(len(codigos), np.nan)
+    validos = codigos >= 0
+    valores[validos] = convertidos[codigos[validos]]
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+def corrigir_escala(serie: pd.Series, maximo: float | None = None, minimo: float | None = None) -> pd.Series:
+    """
+    Corrige a escala de cada valor isoladamente:
+      - valor > maximo       -> dividido por 100 (veio 455 em vez de 4,55)
+      - 0 < valor < minimo   -> multiplicado por 100 (veio 0.0455 em vez de 4,55)
+    """
+    valores = serie.to_numpy(dtype="float64", copy=True)
+    if maximo is not None:
+        acima = valores > maximo
+        valores[acima] = valores[acima] / 100
+    if minimo is not None:
+        abaixo = (valores > 0) & (valores < minimo)
+        valores[abaixo] = valores[abaixo] * 100
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+def normalizar_precos(serie: pd.Series, maximo: float | None = None, minimo: float | None = None) -> pd.Series:
+    """parse_preco_br + corrigir_escala numa chamada."""
+    serie = parse_preco_br(serie)
+    if maximo is None and minimo is None:
+        return serie
+    return corrigir_escala(serie, maximo, minimo)
+
+
+def normalizar_colunas_preco(df: pd.DataFrame, colunas=COLUNAS_PRECO,
+                             maximo: float | None = None, minimo: float | None = None) -> pd.DataFrame:
+    """Aplica normalizar_precos nas colunas de preço presentes no DataFrame."""
+    for col in colunas:
+        if col in df.columns:
+            df[col] = normalizar_precos(df[col], maximo, minimo)
+    return df
+
@@ -0,0 +1,138 @@
+# services/relatorios_lote.py
+"""
+Gera em lote o relatorio_ceasa e o comparativo_ceasa de cada par de
+boletins consecutivos do arquivo (ou de um intervalo de datas), com um
+pool de processos.
+
+Os pares pendentes são divididos em trechos contínuos, um por tarefa: cada
+processo lê cada boletim do seu trecho uma vez e o reaproveita nos dois
+pares vizinhos. Os nomes de saída são fixos por par
+(relatorio_ceasa_<data>_vs_<anterior>.xlsx), e pares já gerados são pulados.
+
+Uso: python -m services.relatorios_lote --desde 2025-01-01 --workers 4
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from services.anomalias import HistoricoPrecos
+from services.arquivo_boletins import ARQUIVO_DIR, listar_arquivados, ler_boletim
+
+SAIDA_PADRAO = os.path.join("downloads", "relatorios")
+
+
+def saidas_do_par(data: str, anterior: str, saida=SAIDA_PADRAO) -> dict:
+    sufixo = f"{data}_vs_{anterior}.xlsx"
+    return {
+        "relatorio": os.path.join(saida, f"relatorio_ceasa_{sufixo}"),
+        "comparativo": os.path.join(saida, f"comparativo_ceasa_{sufixo}"),
+    }
+
+
+def pares_pendentes(desde=None, ate=None, saida=SAIDA_PADRAO, pasta=ARQUIVO_DIR, forcar=False) -> list[tuple]:
+    """
+    Pares (anterior, atual) de entradas do manifesto, em ordem de data. O
+    primeiro par de um intervalo usa o boletim imediatamente anterior a ele.
+    """
+    boletins = sorted(listar_arquivados(pasta=pasta), key=lambda b: b["data"])
+    pares = []
+    for anterior, atual in zip(boletins, boletins[1:]):
+        data = date.fromisoformat(atual["data"])
+        if (desde and data < desde) or (ate and data > ate):
+            continue
+        saidas = saidas_do_par(atual["data"], anterior["data"], saida)
+        if not forcar and all(os.path.exists(c) for c in saidas.values()):
+            continue
+        pares.append((anterior, atual))
+    return pares
+
+
+def trechos(pares: list[tuple], quantidade: int) -> list[list[tuple]]:
+    """Divide os pares em trechos contínuos (boletins vizinhos no mesmo trecho)."""
+    if not pares:
+        return []
+    # pares separados por um buraco (par já gerado) não dividem boletim
+    blocos, atual = [], [pares[0]]
+    for par in pares[1:]:
+        if par[0]["data"] == atual[-1][1]["data"]:
+            atual.append(par)
+        else:
+            blocos.append(atual)
+            atual = [par]
+    blocos.append(atual)
+
+    tamanho = max(1, -(-len(pares) // quantidade))
+    return [bloco[i:i + tamanho] for bloco in blocos for i in range(0, len(bloco), tamanho)]
+
+
+def gerar_trecho(trecho: list[tuple], saida=SAIDA_PADRAO) -> list[dict]:
+    """Roda num processo do pool: gera os dois relatórios de cada par do trecho."""
+    # importados aqui: são scripts da raiz e só o processo filho precisa deles
+    import analise_ceasa
+    import comparar_ceasa
+
+    os.makedirs(saida, exist_ok=True)
+    historico = HistoricoPrecos.carregar()
+    carregados = {}
+    resultados = []
+    for anterior, atual in trecho:
+        for b in (anterior, atual):
+            if b["data"] not in carregados:
+                carregados[b["data"]] = ler_boletim(b["caminho"], compacto=True)
+        # o boletim mais antigo não é usado de novo no trecho
+        for data in [d for d in carregados if d < anterior["data"]]:
+            del carregados[data]
+
+        df_anterior, df_atual = carregados[anterior["data"]], carregados[atual["data"]]
+        saidas = saidas_do_par(atual["data"], anterior["data"], saida)
+        try:
+            analise_ceasa.montar_relatorio_unificado(
+                df_atual.copy(), df_anterior.copy(), saidas["relatorio"], historico=historico
+            )
+            df_comp, col_prod = comparar_ceasa.comparar_boletins(
+                comparar_ceasa.normalizar_boletim(df_atual.copy(), historico),
+                comparar_ceasa.normalizar_boletim(df_anterior.copy(), historico),
+            )
+            comparar_ceasa.salvar_comparativo(df_comp, col_prod, saidas["comparativo"])
+        except Exception as e:
+            resultados.append({"data": atual["data"], "anterior": anterior["data"], "erro": str(e)})
+        else:
+            resultados.append({"data": atual["data"], "anterior": anterior["data"], **saidas})
+    return resultados
+
+
+def gerar_lote(desde=None, ate=None, workers=None, saida=SAIDA_PADRAO, pasta=ARQUIVO_DIR, forcar=False) -> dict:
+    pares = pares_pendentes(desde, ate, saida, pasta, forcar)
+    workers = workers or os.cpu_count() or 1
+    print(f"📚 {len(pares)} pares de boletins para gerar com {workers} processos.")
+
+    resultados = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [pool.submit(gerar_trecho, t, saida) for t in trechos(pares, workers)]
+        for futuro in as_completed(futuros):
+            for r in futuro.result():
+                resultados.append(r)
+                if "erro" in r:
+                    print(f"❌ {r['data']} x {r['anterior']}: {r['erro']}")
+
+    falhas = [r for r in resultados if "erro" in r]
+    return {
+        "status": "sucesso" if not falhas else "parcial",
+        "pares": len(pares),
+        "gerados": len(resultados) - len(falhas),
+        "falhas": len(falhas),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatórios e comparativos de todos os pares de boletins.")
+    parser.add_argument("--desde", type=date.fromisoformat, help="primeira data (AAAA-MM-DD)")
+    parser.add_argument("--ate", type=date.fromisoformat, help="última data (AAAA-MM-DD)")
+    parser.add_argument("--workers", type=int, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument("--saida", default=SAIDA_PADRAO)
+    parser.add_argument("--arquivo", default=ARQUIVO_DIR, help="pasta do arquivo Parquet")
+    parser.add_argument("--forcar", action="store_true", help="gera de novo mesmo se já existir")
+    args = parser.parse_args()
+
+    print(gerar_lote(args.desde, args.ate, args.workers, args.saida, args.arquivo, args.forcar))
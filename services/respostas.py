@@ -0,0 +1,213 @@
+# services/respostas.py
+"""
+Camada de resposta compartilhada por main.py e api.py.
+
+- RespostaJSON: classe de resposta padrão dos dois apps. Serializa com
+  orjson quando instalado (json da biblioteca padrão, compacto, quando
+  não) e informa o tamanho do JSON e o tempo gasto nos cabeçalhos
+  X-Tamanho-Serializado e Server-Timing (serializar;dur=ms).
+- CompressaoMiddleware: comprime a resposta inteira em brotli (se o
+  pacote brotli/brotlicffi estiver instalado) ou gzip, conforme o
+  Accept-Encoding, só acima de TAMANHO_MINIMO_COMPRESSAO bytes. Respostas
+  em fluxo (exportações) são comprimidas pedaço a pedaço; as já
+  codificadas (corpo gzip em cache) passam intactas. O tempo de
+  compressão entra no Server-Timing (comprimir;dur=ms).
+"""
+import gzip
+import json
+import os
+import time
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # sem orjson, json da biblioteca padrão
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:  # sem brotli, só gzip
+        brotli = None
+
+TAMANHO_MINIMO_COMPRESSAO = int(os.getenv("CEASA_COMPRESSAO_MINIMO", "1024"))  # bytes
+NIVEL_GZIP = 6
+NIVEL_BROTLI = 5
+TIPOS_COMPRIMIVEIS = ("application/json", "application/x-ndjson", "text/")
+CODIFICACOES = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _json_padrao(valor):
+    # datas do xlsx legado, escalares numpy que sobram no astype(object)
+    # e Numeric do banco em dicts montados à mão
+    if isinstance(valor, (datetime, date, pd.Timestamp)):
+        return valor.isoformat()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    # como o json da biblioteca padrão: tipo desconhecido é erro, não texto
+    raise TypeError(f"Objeto do tipo {type(valor).__name__} não é serializável em JSON")
+
+
+if orjson is not None:
+    _OPCOES_ORJSON = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def serializar(dados) -> bytes:
+        return orjson.dumps(dados, default=_json_padrao, option=_OPCOES_ORJSON)
+else:
+    def serializar(dados) -> bytes:
+        return json.dumps(dados, ensure_ascii=False, separators=(",", ":"), default=_json_padrao).encode("utf-8")
+
+
+def server_timing(nome: str, segundos: float, descricao: str | None = None) -> str:
+    valor = f"{nome};dur={segundos * 1000:.2f}"
+    return valor + f';desc="{descricao}"' if descricao else valor
+
+
+def cabecalhos_serializacao(tamanho: int, segundos: float, descricao: str | None = None) -> dict:
+    """Cabeçalhos de tamanho e tempo de serialização (também para corpos já prontos em cache)."""
+    return {
+        "X-Tamanho-Serializado": str(tamanho),
+        "Server-Timing": server_timing("serializar", segundos, descricao),
+    }
+
+
+class RespostaJSON(JSONResponse):
+    """JSONResponse com o serializador rápido e a medição do próprio render."""
+
+    def render(self, content) -> bytes:
+        inicio = time.perf_counter()
+        corpo = serializar(content)
+        self.tempo_serializacao = time.perf_counter() - inicio
+        return corpo
+
+    def __init__(self, content=None, status_code=200, headers=None, media_type=None, background=None):
+        super().__init__(content, status_code, headers, media_type, background)
+        self.headers.update(cabecalhos_serializacao(len(self.body), self.tempo_serializacao))
+
+
+def escolher_codificacao(accept_encoding: str) -> str | None:
+    """Melhor codificação suportada que o cliente aceita (q=0 recusa)."""
+    aceitas = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.strip().partition(";")
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        if nome:
+            aceitas[nome.strip().lower()] = q
+    candidatas = [c for c in CODIFICACOES if aceitas.get(c, aceitas.get("*", 0.0)) > 0]
+    if not candidatas:
+        return None
+    # maior q; empate fica com a ordem de CODIFICACOES (br antes de gzip)
+    return max(candidatas, key=lambda c: aceitas.get(c, aceitas.get("*", 0.0)))
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(corpo, quality=NIVEL_BROTLI)
+    return gzip.compress(corpo, NIVEL_GZIP)
+
+
+def compressor_fluxo(codificacao: str):
+    """(comprimir pedaço, finalizar) de um fluxo; cada pedaço sai inteiro (sync flush)."""
+    if codificacao == "br":
+        compressor = brotli.Compressor(quality=NIVEL_BROTLI)
+        processar = getattr(compressor, "process", None) or compressor.compress
+        return (lambda dados: processar(dados) + compressor.flush()), compressor.finish
+    compressor = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 31)   # 31: cabeçalho gzip
+    return (lambda dados: compressor.compress(dados) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+class CompressaoMiddleware:
+    """Middleware ASGI de compressão negociada (brotli ou gzip) acima de um tamanho mínimo."""
+
+    def __init__(self, app, minimo: int = TAMANHO_MINIMO_COMPRESSAO):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio_resposta = None
+        em_fluxo = False
+        fluxo = None   # (comprimir pedaço, finalizar) da resposta em fluxo comprimida
+
+        def marcar(cabecalhos):
+            cabecalhos["Content-Encoding"] = codificacao
+            if "accept-encoding" not in cabecalhos.get("vary", "").lower():
+                cabecalhos.add_vary_header("Accept-Encoding")
+
+        async def enviar(mensagem):
+            nonlocal inicio_resposta, em_fluxo, fluxo
+            if em_fluxo:
+                if fluxo is not None and mensagem["type"] == "http.response.body":
+                    corpo = fluxo[0](mensagem.get("body", b""))
+                    if not mensagem.get("more_body", False):
+                        corpo += fluxo[1]()
+                    mensagem = {**mensagem, "body": corpo}
+                await send(mensagem)
+                return
+            if mensagem["type"] == "http.response.start":
+                inicio_resposta = mensagem
+                return
+            if mensagem["type"] != "http.response.body":
+                await send(mensagem)
+                return
+
+            corpo = mensagem.get("body", b"")
+            cabecalhos = MutableHeaders(raw=inicio_resposta["headers"])
+            comprimivel = (
+                "content-encoding" not in cabecalhos
+                and cabecalhos.get("content-type", "").startswith(TIPOS_COMPRIMIVEIS)
+            )
+            if mensagem.get("more_body", False):
+                # resposta em fluxo (exportações): comprimida pedaço a pedaço,
+                # sem Content-Length; tipos binários (Parquet) vão como vieram
+                em_fluxo = True
+                if comprimivel:
+                    fluxo = compressor_fluxo(codificacao)
+                    marcar(cabecalhos)
+                    del cabecalhos["content-length"]
+                    mensagem = {**mensagem, "body": fluxo[0](corpo)}
+                await send(inicio_resposta)
+                await send(mensagem)
+                return
+
+            if not comprimivel or len(corpo) < self.minimo:
+                await send(inicio_resposta)
+                await send(mensagem)
+                return
+
+            inicio = time.perf_counter()
+            comprimido = comprimir(corpo, codificacao)
+            tempo = server_timing("comprimir", time.perf_counter() - inicio)
+            marcar(cabecalhos)
+            cabecalhos["Content-Length"] = str(len(comprimido))
+            if "server-timing" in cabecalhos:
+                tempo = cabecalhos["server-timing"] + ", " + tempo
+            cabecalhos["Server-Timing"] = tempo
+            await send(inicio_resposta)
+            await send({"type": "http.response.body", "body": comprimido})
+
+        await self.app(scope, receive, enviar)
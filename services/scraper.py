@@ -0,0 +1,303 @@
+# services/scraper.py
+import pandas as pd
+import time
+import os
+import io
+from datetime import datetime
+
+from services.arquivo_boletins import ARQUIVO_DIR, arquivar_boletim
+from services.exportar import exportar_tabela
+from services.precos import COLUNAS_PRECO, normalizar_colunas_preco
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import Select, WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+    from webdriver_manager.chrome import ChromeDriverManager
+except ImportError:  # o backend HTTP não precisa do Chrome
+    webdriver = None
+
+URL_BOLETIM = "http://200.198.51.71/detec/filtro_boletim_es/filtro_boletim_es.php"
+MERCADO = "CEASA GRANDE VITÓRIA"
+BACKEND_PADRAO = os.getenv("CEASA_SCRAPER_BACKEND", "selenium")
+
+XPATHS_CAMPO_DATA = [
+    "//select[@id='id_sc_field_data']",
+    "//select[contains(@id, 'id_sc_field_data')]",
+    "//select[contains(@name, 'data')]",
+    "//select[contains(@id, 'data')]",
+]
+XPATH_GRADE = "//table[contains(@class, 'scGridTabela')]"
+
+# intervalo de checagem das esperas por condição e tempo que a grade
+# precisa ficar com o mesmo número de linhas para ser considerada pronta
+INTERVALO_ESPERA = 0.1
+GRADE_ESTAVEL_POR = 0.3
+
+
+def marcar_tempo(tempos: dict, fase: str, inicio: float) -> float:
+    """Registra em tempos[fase] os segundos desde inicio; devolve o novo início."""
+    agora = time.perf_counter()
+    tempos[fase] = round(agora - inicio, 3)
+    return agora
+
+
+def achar_select_data(driver, timeout=15):
+    """Espera o campo de data aparecer já com a lista de opções preenchida."""
+    def select_populado(d):
+        for xp in XPATHS_CAMPO_DATA:
+            elems = d.find_elements(By.XPATH, xp)
+            if elems:
+                opcoes = elems[0].find_elements(By.TAG_NAME, "option")
+                if any(op.text.strip() for op in opcoes):
+                    return elems[0]
+        return False
+
+    try:
+        return WebDriverWait(
+            driver, timeout, poll_frequency=INTERVALO_ESPERA,
+            ignored_exceptions=(StaleElementReferenceException,),
+        ).until(select_populado)
+    except TimeoutException:
+        raise Exception("Não consegui encontrar o campo de DATA na página.")
+
+
+def esperar_grade(driver, timeout=30):
+    """
+    Espera as tabelas da grade terem linhas de dados e pararem de crescer
+    por GRADE_ESTAVEL_POR segundos. Devolve False se estourar o timeout.
+    """
+    estado = {"linhas": -1, "desde": 0.0}
+
+    def grade_estavel(d):
+        linhas = len(d.find_elements(By.XPATH, XPATH_GRADE + "//tr"))
+        agora = time.monotonic()
+        if linhas <= 1 or linhas != estado["linhas"]:
+            estado["linhas"], estado["desde"] = linhas, agora
+            return False
+        return agora - estado["desde"] >= GRADE_ESTAVEL_POR
+
+    try:
+        WebDriverWait(
+            driver, timeout, poll_frequency=INTERVALO_ESPERA,
+            ignored_exceptions=(StaleElementReferenceException,),
+        ).until(grade_estavel)
+        return True
+    except TimeoutException:
+        return False
+
+
+def normalizar_preco_br(df: pd.DataFrame) -> pd.DataFrame:
+    # a grade vem como texto ("4,55", "1.234,50"); o parse em formato
+    # brasileiro já dá a escala certa, sem o "divide por 100 se max > 50"
+    return normalizar_colunas_preco(df, COLUNAS_PRECO)
+
+
+def salvar_excel_formatado(df: pd.DataFrame, path: str) -> str:
+    """
+    Grava o boletim formatado (cabeçalho, filtro, larguras). Acima de
+    LIMITE_LINHAS_XLSX sai em CSV/Parquet; devolve o caminho gravado.
+    """
+    path = exportar_tabela(
+        df,
+        path,
+        aba="Boletim",
+        formato_cabecalho={"bold": True, "bg_color": "#D9D9D9", "border": 1},
+        autofiltro=True,
+    )
+    print(f"📘 Excel salvo em: {path}")
+    return path
+
+
+def ler_tabelas_grade(htmls_tabelas) -> list[pd.DataFrame]:
+    """Converte o HTML de cada tabela scGridTabela em DataFrame."""
+    dfs = []
+    for html_tabela in htmls_tabelas:
+        try:
+            # thousands=None: os preços ficam como texto para o parse brasileiro
+            df = pd.read_html(io.StringIO(html_tabela), header=0, thousands=None)[0]
+            dfs.append(df)
+        except ValueError:
+            pass
+    return dfs
+
+
+def finalizar_boletim(dfs, data_texto, download_dir="downloads", salvar_csv=False, salvar_xlsx=False,
+                      tempos=None, arquivar=True, pasta_arquivo=None):
+    """
+    Junta as tabelas da grade, normaliza os preços, grava o boletim no
+    arquivo colunar e as saídas opcionais (CSV/xlsx). É o passo final comum
+    aos backends Selenium e HTTP.
+    tempos recebe as fases já medidas pelo backend e ganha "ler_tabelas",
+    "salvar" e "total". O arquivo colunar é o mesmo que as análises leem
+    (ARQUIVO_DIR) se pasta_arquivo não for passada.
+    """
+    tempos = {} if tempos is None else tempos
+    if not dfs:
+        print("❌ Nenhuma tabela encontrada!")
+        return None
+    inicio = time.perf_counter()
+
+    abs_download_dir = os.path.abspath(download_dir)
+    os.makedirs(abs_download_dir, exist_ok=True)
+
+    df_final = pd.concat(dfs, ignore_index=True)
+    df_final = normalizar_preco_br(df_final)
+    df_final["Data"] = data_texto
+    # soma ao tempo de leitura das tabelas já medido pelo backend
+    inicio = marcar_tempo(tempos, "ler_tabelas", inicio - tempos.get("ler_tabelas", 0.0))
+
+    arquivo_path = None
+    if arquivar:
+        arquivo_path = arquivar_boletim(df_final, data_texto, pasta_arquivo or ARQUIVO_DIR)
+
+    csv_path = None
+    if salvar_csv:
+        # CSV fixo (pode sobrescrever)
+        csv_path = os.path.join(abs_download_dir, "boletim_ceasa.csv")
+        df_final.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        print(f"💾 Dados salvos em '{csv_path}' ({len(df_final)} linhas)")
+
+    xlsx_path = None
+    if salvar_xlsx:
+        # nome único: data do boletim + horário da geração
+        try:
+            data_dt = datetime.strptime(data_texto, "%d/%m/%Y").date()
+            base_data = data_dt.isoformat()
+        except Exception:
+            base_data = datetime.now().strftime("%Y-%m-%d")
+
+        hora = datetime.now().strftime("%H-%M-%S")
+        xlsx_path = os.path.join(
+            abs_download_dir, f"boletim_{base_data}_{hora}.xlsx"
+        )
+
+        xlsx_path = salvar_excel_formatado(df_final, xlsx_path)
+    marcar_tempo(tempos, "salvar", inicio)
+    tempos["total"] = round(sum(tempos.values()), 3)
+    print("⏱️ Tempos do scraper (s): " + ", ".join(f"{k}={v}" for k, v in tempos.items()))
+
+    return {
+        "df": df_final,
+        "data_boletim": data_texto,
+        "csv": csv_path,
+        "xlsx": xlsx_path,
+        "arquivo": arquivo_path,
+        "tempos": tempos,
+    }
+
+
+def coletar_boletim(download_dir="downloads", salvar_csv=False, salvar_xlsx=False, backend=None, arquivar=True,
+                    pasta_arquivo=None):
+    """
+    Raspa o boletim e devolve um dict com o DataFrame normalizado ("df"),
+    a data do boletim e os caminhos dos arquivos gravados (CSV e xlsx são
+    saídas opcionais; None quando não foram gerados).
+
+    backend: "selenium" (Chrome) ou "http" (requests + lxml, sem navegador).
+    O padrão vem da variável de ambiente CEASA_SCRAPER_BACKEND.
+    """
+    backend = backend or BACKEND_PADRAO
+    if backend == "http":
+        from services.scraper_http import coletar_boletim_http
+        return coletar_boletim_http(download_dir, salvar_csv=salvar_csv, salvar_xlsx=salvar_xlsx, arquivar=arquivar,
+                                    pasta_arquivo=pasta_arquivo)
+    if backend != "selenium":
+        raise ValueError(f"Backend de scraper desconhecido: {backend}")
+    if webdriver is None:
+        raise RuntimeError("Selenium não instalado; use o backend 'http'.")
+
+    abs_download_dir = os.path.abspath(download_dir)
+    os.makedirs(abs_download_dir, exist_ok=True)
+
+    tempos = {}
+    inicio = time.perf_counter()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-infobars")
+    options.add_argument("--disable-extensions")
+
+    prefs = {
+        "download.default_directory": abs_download_dir,
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "plugins.always_open_pdf_externally": True,
+    }
+    options.add_experimental_option("prefs", prefs)
+
+    driver = webdriver.Chrome(
+        service=Service(ChromeDriverManager().install()), options=options
+    )
+    wait = WebDriverWait(driver, 20, poll_frequency=INTERVALO_ESPERA)
+    inicio = marcar_tempo(tempos, "iniciar_driver", inicio)
+
+    try:
+        print("🌐 Acessando site do CEASA...")
+        driver.get(URL_BOLETIM)
+
+        # mercado
+        select_mercado = wait.until(
+            EC.presence_of_element_located((By.ID, "id_sc_field_mercado"))
+        )
+        inicio = marcar_tempo(tempos, "carregar_pagina", inicio)
+        Select(select_mercado).select_by_visible_text(MERCADO)
+        print("✅ Mercado selecionado")
+
+        # data: espera a lista de datas do mercado ser carregada
+        print("⏳ Procurando o campo de data (pode demorar alguns segundos)...")
+        select_data = achar_select_data(driver, timeout=15)
+        inicio = marcar_tempo(tempos, "selecionar_mercado", inicio)
+        opcoes = select_data.find_elements(By.TAG_NAME, "option")
+
+        data_texto = "Data não encontrada"
+        if len(opcoes) > 1:
+            opcoes[1].click()
+            data_texto = opcoes[1].text.strip()
+        elif len(opcoes) == 1:
+            opcoes[0].click()
+            data_texto = opcoes[0].text.strip()
+        print(f"✅ Data selecionada: {data_texto}")
+
+        # ok
+        botao_ok = wait.until(
+            EC.element_to_be_clickable(
+                (By.XPATH, "//span[@class='btn-label' and normalize-space(text())='Ok']")
+            )
+        )
+        botao_ok.click()
+        print("✅ Botão 'Ok' clicado!")
+        inicio = marcar_tempo(tempos, "selecionar_data", inicio)
+
+        # tabela: espera as linhas da grade aparecerem e estabilizarem
+        if not esperar_grade(driver, timeout=30):
+            print("⚠️ A grade não estabilizou no tempo limite; lendo o que houver.")
+        inicio = marcar_tempo(tempos, "renderizar_grade", inicio)
+
+        print("📄 Extraindo tabela da página...")
+        tabelas = driver.find_elements(By.XPATH, XPATH_GRADE)
+        dfs = ler_tabelas_grade(t.get_attribute("outerHTML") for t in tabelas)
+        marcar_tempo(tempos, "ler_tabelas", inicio)
+    finally:
+        driver.quit()
+
+    return finalizar_boletim(dfs, data_texto, abs_download_dir, salvar_csv, salvar_xlsx, tempos, arquivar,
+                             pasta_arquivo)
+
+
+def extrair_boletim(download_dir="downloads", salvar_csv=True, salvar_xlsx=True, retornar_df=False, backend=None):
+    """
+    Raspa o boletim gravando CSV/xlsx em download_dir. Devolve o caminho do
+    xlsx ou, com retornar_df=True, o próprio DataFrame normalizado.
+    """
+    resultado = coletar_boletim(download_dir, salvar_csv=salvar_csv, salvar_xlsx=salvar_xlsx, backend=backend)
+    if resultado is None:
+        return None
+    return resultado["df"] if retornar_df else resultado["xlsx"]
+
+
+if __name__ == "__main__":
+    extrair_boletim()
@@ -0,0 +1,174 @@
+# services/scraper_http.py
+"""
+Backend do scraper sem navegador: envia o mesmo formulário do filtro do
+CEASA (mercado -> recarga das datas -> busca) com requests e lê a grade
+scGridTabela com lxml. Devolve o mesmo dict de coletar_boletim.
+"""
+import os
+import time
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from services.scraper import (
+    URL_BOLETIM,
+    MERCADO,
+    XPATHS_CAMPO_DATA,
+    XPATH_GRADE,
+    ler_tabelas_grade,
+    finalizar_boletim,
+    marcar_tempo,
+)
+
+# o ScriptCase recarrega o formulário com nmgp_opcao=recarga (é o que o
+# evento de troca do mercado faz) e executa o filtro com nmgp_opcao=busca
+OPCAO_RECARGA = "recarga"
+OPCAO_BUSCA = "busca"
+
+# formulários de auto-submit (redirecionamento via JS) seguidos até a grade
+MAX_REDIRECIONAMENTOS = 3
+
+
+def criar_sessao(pool=4, tentativas=3) -> requests.Session:
+    """Sessão com pool de conexões keep-alive e retentativas em 5xx."""
+    sessao = requests.Session()
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=None,
+    )
+    adaptador = HTTPAdapter(pool_connections=pool, pool_maxsize=pool, max_retries=retry)
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    sessao.headers["User-Agent"] = "Mozilla/5.0 (ceasa_app)"
+    return sessao
+
+
+def _pagina(resposta, gravar_em=None, passo=None):
+    resposta.raise_for_status()
+    if gravar_em:
+        os.makedirs(gravar_em, exist_ok=True)
+        with open(os.path.join(gravar_em, f"{passo}.html"), "wb") as f:
+            f.write(resposta.content)
+    return lxml_html.fromstring(resposta.content, base_url=resposta.url)
+
+
+def _formulario(doc):
+    # o formulário do filtro é o que contém o campo de mercado
+    for form in doc.forms:
+        if form.xpath(".//select[@id='id_sc_field_mercado']"):
+            return form
+    if doc.forms:
+        return doc.forms[0]
+    raise Exception("Formulário do filtro não encontrado na página.")
+
+
+def _opcoes(select):
+    return [
+        (op.get("value", op.text_content().strip()), op.text_content().strip())
+        for op in select.xpath(".//option")
+    ]
+
+
+def _enviar(sessao, form, campos, timeout):
+    dados = dict(form.form_values())
+    dados.update(campos)
+    url = form.action or form.base_url
+    if (form.method or "POST").upper() == "GET":
+        return sessao.get(url, params=dados, timeout=timeout)
+    return sessao.post(url, data=dados, timeout=timeout)
+
+
+def abrir_filtro(sessao, url=URL_BOLETIM, timeout=30, gravar_em=None, tempos=None):
+    """
+    Abre o filtro, escolhe o mercado e devolve (form, campos, nome do campo
+    de data, opções de data) prontos para a busca de qualquer data.
+    """
+    tempos = {} if tempos is None else tempos
+    inicio = time.perf_counter()
+    doc = _pagina(sessao.get(url, timeout=timeout), gravar_em, "01_filtro")
+    form = _formulario(doc)
+    inicio = marcar_tempo(tempos, "carregar_pagina", inicio)
+
+    select_mercado = form.xpath(".//select[@id='id_sc_field_mercado']")
+    if not select_mercado:
+        raise Exception("Campo de MERCADO não encontrado na página.")
+    select_mercado = select_mercado[0]
+    valores = [v for v, texto in _opcoes(select_mercado) if texto == MERCADO]
+    if not valores:
+        raise Exception(f"Mercado '{MERCADO}' não está entre as opções do filtro.")
+    campos = {select_mercado.name: valores[0]}
+
+    resposta = _enviar(sessao, form, {**campos, "nmgp_opcao": OPCAO_RECARGA}, timeout)
+    doc = _pagina(resposta, gravar_em, "02_recarga")
+    form = _formulario(doc)
+    marcar_tempo(tempos, "selecionar_mercado", inicio)
+
+    for xp in XPATHS_CAMPO_DATA:
+        selects = doc.xpath(xp)
+        if selects:
+            select_data = selects[0]
+            return form, campos, select_data.name, _opcoes(select_data)
+    raise Exception("Não consegui encontrar o campo de DATA na página.")
+
+
+def listar_datas_http(sessao=None, url=URL_BOLETIM, timeout=30):
+    """Lista (valor, texto) de todas as datas de boletim oferecidas no filtro."""
+    sessao = sessao or criar_sessao()
+    _, _, _, opcoes = abrir_filtro(sessao, url, timeout)
+    return [(valor, texto) for valor, texto in opcoes if valor and texto]
+
+
+def _tabelas_da_resposta(sessao, doc, timeout, gravar_em):
+    tabelas = doc.xpath(XPATH_GRADE)
+    saltos = 0
+    # a busca pode devolver só um formulário que redireciona para a grade
+    while not tabelas and doc.forms and saltos < MAX_REDIRECIONAMENTOS:
+        saltos += 1
+        form = doc.forms[0]
+        doc = _pagina(_enviar(sessao, form, {}, timeout), gravar_em, f"03_grade_{saltos}")
+        tabelas = doc.xpath(XPATH_GRADE)
+    return [lxml_html.tostring(t, encoding="unicode") for t in tabelas]
+
+
+def coletar_boletim_http(download_dir="downloads", salvar_csv=False, salvar_xlsx=False,
+                         data=None, url=URL_BOLETIM, sessao=None, timeout=30, gravar_em=None,
+                         arquivar=True, pasta_arquivo=None):
+    """
+    Versão sem navegador de coletar_boletim. data é o texto da opção
+    (ex.: "10/11/2025"); sem ela usa a mesma opção que o Selenium clica.
+    gravar_em salva o HTML de cada passo para reprodução offline.
+    """
+    sessao = sessao or criar_sessao()
+    tempos = {}
+
+    print("🌐 Acessando site do CEASA (HTTP)...")
+    form, campos, nome_data, opcoes = abrir_filtro(sessao, url, timeout, gravar_em, tempos)
+    inicio = time.perf_counter()
+
+    if data is not None:
+        escolhidas = [(v, t) for v, t in opcoes if t == data]
+        if not escolhidas:
+            raise Exception(f"Data {data} não está disponível no filtro.")
+        valor, data_texto = escolhidas[0]
+    elif len(opcoes) > 1:
+        valor, data_texto = opcoes[1]
+    elif len(opcoes) == 1:
+        valor, data_texto = opcoes[0]
+    else:
+        raise Exception("Nenhuma data disponível no filtro.")
+    print(f"✅ Data selecionada: {data_texto}")
+    inicio = marcar_tempo(tempos, "selecionar_data", inicio)
+
+    # sem navegador, "renderizar" a grade é só baixar a resposta da busca
+    campos = {**campos, nome_data: valor, "nmgp_opcao": OPCAO_BUSCA}
+    doc = _pagina(_enviar(sessao, form, campos, timeout), gravar_em, "03_grade")
+    htmls_tabelas = _tabelas_da_resposta(sessao, doc, timeout, gravar_em)
+    inicio = marcar_tempo(tempos, "renderizar_grade", inicio)
+
+    dfs = ler_tabelas_grade(htmls_tabelas)
+    marcar_tempo(tempos, "ler_tabelas", inicio)
+    return finalizar_boletim(dfs, data_texto, download_dir, salvar_csv, salvar_xlsx, tempos, arquivar,
+                             pasta_arquivo)
@@ -0,0 +1,145 @@
+# services/series_boletim.py
+"""
+Séries históricas de preço a partir de boletins_ceasa: média móvel,
+volatilidade, mínimo/máximo de 52 semanas e variação percentual.
+
+O histórico é lido numa consulta só (todas as datas/produtos pedidos) e as
+janelas são calculadas com rolling do pandas por produto. O resultado fica
+em cache por (produtos, janela, dias, campo) até a próxima ingestão, que é
+detectada pela tabela ingestoes_boletim.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models import BoletimCeasa, IngestaoBoletim
+
+CAMPOS_PRECO = ("preco_min", "preco_medio", "preco_max")
+JANELA_PADRAO = 7        # boletins
+DIAS_PADRAO = 90         # período devolvido
+JANELA_52_SEMANAS = "364D"
+MAX_ENTRADAS_CACHE = 64
+
+_cache: OrderedDict = OrderedDict()
+_versao_cache = None
+_trava_cache = threading.Lock()
+
+
+def versao_historico(db: Session):
+    """
+    Muda sempre que um boletim é ingerido (ou reingerido com mudança): a
+    última marca de tempo, o total de ingestões e o hash do conteúdo das
+    ingestões com essa marca. O hash cobre a reingestão no mesmo instante
+    (DATETIME do banco com resolução grossa), em que marca e total não mudam.
+    """
+    marca = func.coalesce(IngestaoBoletim.atualizado_em, IngestaoBoletim.criado_em)
+    ultima, total = db.execute(select(func.max(marca), func.count(IngestaoBoletim.id))).one()
+    hashes = db.execute(
+        select(IngestaoBoletim.hash_conteudo).where(marca == ultima).order_by(IngestaoBoletim.hash_conteudo)
+    ).scalars().all()
+    return (ultima, total, tuple(hashes))
+
+
+def ler_historico(db: Session, produtos=None, desde: date | None = None, ate: date | None = None,
+                  campo="preco_medio") -> pd.DataFrame:
+    """Uma consulta para todo o histórico pedido: colunas data, produto, preco."""
+    coluna = getattr(BoletimCeasa, campo)
+    consulta = select(BoletimCeasa.data_boletim, BoletimCeasa.produto, coluna)
+    if produtos:
+        consulta = consulta.where(BoletimCeasa.produto.in_(list(produtos)))
+    if desde is not None:
+        consulta = consulta.where(BoletimCeasa.data_boletim >= desde)
+    if ate is not None:
+        consulta = consulta.where(BoletimCeasa.data_boletim <= ate)
+    linhas = db.execute(consulta).all()
+
+    df = pd.DataFrame(linhas, columns=["data", "produto", "preco"])
+    df["data"] = pd.to_datetime(df["data"])
+    df["preco"] = pd.to_numeric(df["preco"], errors="coerce").astype("float64")
+    return df
+
+
+def calcular_series(historico: pd.DataFrame, janela=JANELA_PADRAO) -> pd.DataFrame:
+    """
+    Acrescenta, por produto:
+      media_movel   média dos últimos `janela` boletins
+      volatilidade  desvio padrão da variação diária nesses boletins (em %)
+      min_52s/max_52s  extremos das últimas 52 semanas (por data)
+      variacao_pct  variação em % contra `janela` boletins atrás
+    """
+    df = historico.sort_values(["produto", "data"], ignore_index=True)
+    por_produto = df.groupby("produto", sort=False)["preco"]
+
+    df["media_movel"] = por_produto.transform(lambda s: s.rolling(janela, min_periods=1).mean())
+    retorno = por_produto.pct_change(fill_method=None) * 100
+    df["volatilidade"] = retorno.groupby(df["produto"], sort=False).transform(
+        lambda s: s.rolling(janela, min_periods=2).std()
+    )
+    df["variacao_pct"] = por_produto.pct_change(periods=janela, fill_method=None) * 100
+
+    por_data = df.set_index("data").groupby("produto", sort=False)["preco"]
+    df["min_52s"] = por_data.transform(lambda s: s.rolling(JANELA_52_SEMANAS).min()).to_numpy()
+    df["max_52s"] = por_data.transform(lambda s: s.rolling(JANELA_52_SEMANAS).max()).to_numpy()
+    return df
+
+
+def _para_json(df: pd.DataFrame) -> list[dict]:
+    """Agrupa os pontos por produto, com NaN como null."""
+    df = df.assign(data=df["data"].dt.date.map(date.isoformat))
+    df = df.replace({np.nan: None})
+    colunas = ["data", "preco", "media_movel", "volatilidade", "min_52s", "max_52s", "variacao_pct"]
+    return [
+        {"produto": produto, "pontos": grupo[colunas].to_dict(orient="records")}
+        for produto, grupo in df.groupby("produto", sort=True)
+    ]
+
+
+def series_de_preco(db: Session, produtos=None, janela=JANELA_PADRAO, dias=DIAS_PADRAO,
+                    campo="preco_medio", ate: date | None = None) -> list[dict]:
+    """
+    Séries dos últimos `dias` até `ate` (padrão: boletim mais recente), já
+    com as janelas. O histórico lido começa 52 semanas + folga antes, para
+    as janelas do primeiro ponto já estarem completas.
+    """
+    global _versao_cache
+    if campo not in CAMPOS_PRECO:
+        raise ValueError(f"campo deve ser um de {', '.join(CAMPOS_PRECO)}")
+
+    chave = (tuple(sorted(set(produtos))) if produtos else None, janela, dias, campo, ate)
+    versao = versao_historico(db)
+    with _trava_cache:
+        if versao != _versao_cache:
+            _cache.clear()
+            _versao_cache = versao
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave]
+
+    ate = ate or db.execute(select(func.max(BoletimCeasa.data_boletim))).scalar() or date.today()
+    inicio = ate - timedelta(days=dias)
+    historico = ler_historico(db, produtos, inicio - timedelta(days=364 + 7 * janela), ate, campo)
+    series = calcular_series(historico, janela)
+    resultado = _para_json(series[series["data"] >= pd.Timestamp(inicio)])
+
+    with _trava_cache:
+        if versao == _versao_cache:
+            _cache[chave] = resultado
+            while len(_cache) > MAX_ENTRADAS_CACHE:
+                _cache.popitem(last=False)
+    return resultado
+
+
+def resumo_atual(db: Session, produtos=None, janela=JANELA_PADRAO, campo="preco_medio") -> list[dict]:
+    """Último ponto de cada produto (lista das telas, sem a série inteira)."""
+    series = series_de_preco(db, produtos, janela, dias=7 * janela, campo=campo)
+    return [{"produto": s["produto"], **s["pontos"][-1]} for s in series if s["pontos"]]
+
+
+def limpar_cache():
+    with _trava_cache:
+        _cache.clear()
@@ -0,0 +1,33 @@
+-- Ingestão idempotente dos boletins (SQL Server).
+-- Preenche data_boletim nula com a data de gravação da linha (e apaga as que
+-- nem isso têm), remove as cópias repetidas de boletins_ceasa (fica a linha
+-- mais recente de cada data + produto), torna data_boletim NOT NULL como no
+-- modelo, cria o índice único e a tabela de hashes por boletim.
+
+UPDATE boletins_ceasa
+SET data_boletim = CAST(criado_em AS DATE)
+WHERE data_boletim IS NULL AND criado_em IS NOT NULL;
+
+DELETE FROM boletins_ceasa WHERE data_boletim IS NULL;
+
+WITH duplicados AS (
+    SELECT id,
+           ROW_NUMBER() OVER (PARTITION BY data_boletim, produto ORDER BY id DESC) AS ordem
+    FROM boletins_ceasa
+)
+DELETE FROM duplicados WHERE ordem > 1;
+
+-- antes do índice: o SQL Server não altera coluna usada por índice
+ALTER TABLE boletins_ceasa ALTER COLUMN data_boletim DATE NOT NULL;
+
+CREATE UNIQUE INDEX ux_boletins_ceasa_data_produto
+    ON boletins_ceasa (data_boletim, produto);
+
+CREATE TABLE ingestoes_boletim (
+    id INT IDENTITY(1, 1) PRIMARY KEY,
+    data_boletim DATE NOT NULL UNIQUE,
+    hash_conteudo VARCHAR(64) NOT NULL,
+    linhas INT DEFAULT 0,
+    criado_em DATETIME,
+    atualizado_em DATETIME
+);
@@ -0,0 +1,18 @@
+-- Tabela de aliases dos nomes de produto (SQL Server).
+-- Cada nome normalizado visto nos boletins aponta para um nome canônico;
+-- origem = exato, aproximado (casado pelo índice de blocos) ou manual.
+-- Os aproximados entram com ativo = 0 (sugestão) até serem confirmados.
+
+CREATE TABLE aliases_produto (
+    id INT IDENTITY(1, 1) PRIMARY KEY,
+    chave VARCHAR(150) NOT NULL UNIQUE,
+    nome_canonico VARCHAR(100) NOT NULL,
+    chave_canonica VARCHAR(150) NOT NULL,
+    origem VARCHAR(20) DEFAULT 'exato',
+    similaridade DECIMAL(4, 3),
+    ativo BIT NOT NULL DEFAULT 1,
+    criado_em DATETIME
+);
+
+CREATE INDEX ix_aliases_produto_chave_canonica
+    ON aliases_produto (chave_canonica);
@@ -0,0 +1,41 @@
+# tests/conftest.py
+"""
+Configuração comum dos testes: a raiz do projeto no sys.path e banco,
+arquivo e estados locais numa pasta temporária, definidos antes de
+qualquer import de database.py/services (eles leem o ambiente no import).
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+PASTA_TESTES = tempfile.mkdtemp(prefix="ceasa_testes_")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(PASTA_TESTES, "testes.db")
+os.environ["CEASA_CACHE_DIR"] = os.path.join(PASTA_TESTES, "cache")
+os.environ["CEASA_ARQUIVO_DIR"] = os.path.join(PASTA_TESTES, "arquivo")
+os.environ["CEASA_HISTORICO_PRECOS"] = os.path.join(PASTA_TESTES, "historico_precos.parquet")
+
+FIXTURES_CEASA = os.path.join(RAIZ, "fixtures", "ceasa")
+
+
+@pytest.fixture
+def servidor():
+    """Sobe servidores de replay (tests/servidor_replay.py) e derruba no fim do teste."""
+    from servidor_replay import iniciar_servidor
+
+    iniciados = []
+
+    def iniciar(pasta=FIXTURES_CEASA, erros=None):
+        srv, url = iniciar_servidor(pasta, erros=erros)
+        iniciados.append(srv)
+        return url
+
+    yield iniciar
+    for srv in iniciados:
+        srv.shutdown()
+        srv.server_close()
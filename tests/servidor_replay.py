@@ -0,0 +1,78 @@
+# tests/servidor_replay.py
+"""
+Servidor local que reproduz páginas gravadas do filtro do CEASA, para
+testar o backend HTTP sem acessar o site (fixture `servidor` do conftest). As páginas são as gravadas por
+coletar_boletim_http(gravar_em=...):
+
+    01_filtro.html   GET inicial
+    02_recarga.html  POST com nmgp_opcao=recarga (datas do mercado)
+    03_grade.html    POST com nmgp_opcao=busca (grade scGridTabela)
+
+Uso: python tests/servidor_replay.py fixtures/ceasa 8765
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+PAGINAS_POR_OPCAO = {
+    "recarga": "02_recarga.html",
+    "busca": "03_grade.html",
+}
+
+
+def _criar_handler(pasta, erros):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def _responder(self, arquivo):
+            if arquivo in erros:
+                self.send_error(erros[arquivo])
+                return
+            caminho = os.path.join(pasta, arquivo)
+            if not os.path.exists(caminho):
+                self.send_error(404, f"Página gravada não encontrada: {arquivo}")
+                return
+            with open(caminho, "rb") as f:
+                corpo = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            self._responder("01_filtro.html")
+
+        def do_POST(self):
+            tamanho = int(self.headers.get("Content-Length") or 0)
+            dados = parse_qs(self.rfile.read(tamanho).decode("latin-1"))
+            opcao = dados.get("nmgp_opcao", [""])[0]
+            self._responder(PAGINAS_POR_OPCAO.get(opcao, "03_grade.html"))
+
+        def log_message(self, *args):
+            pass
+
+    return ReplayHandler
+
+
+def iniciar_servidor(pasta, porta=0, erros=None):
+    """
+    Sobe o servidor numa thread e devolve (servidor, url do filtro).
+    erros: {página: status HTTP} para simular falhas do site (ex.: {"03_grade.html": 500}).
+    """
+    handler = _criar_handler(os.path.abspath(pasta), dict(erros or {}))
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    host, porta = servidor.server_address
+    return servidor, f"http://{host}:{porta}/detec/filtro_boletim_es/filtro_boletim_es.php"
+
+
+if __name__ == "__main__":
+    pasta = sys.argv[1] if len(sys.argv) > 1 else "fixtures/ceasa"
+    porta = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    servidor, url = iniciar_servidor(pasta, porta)
+    print(f"Reproduzindo {pasta} em {url} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,57 @@
+# tests/test_anomalias.py
+"""Preços fora do padrão pelo histórico de cada produto (services/anomalias)."""
+from datetime import date, timedelta
+
+import pandas as pd
+
+from services.anomalias import COLUNAS_PRECO, HistoricoPrecos, processar_boletim
+
+INICIO = date(2025, 11, 3)
+
+
+def boletim(precos: dict) -> tuple[pd.Series, pd.DataFrame]:
+    """{produto: preço M.C.} -> (nomes, preços MIN/M.C./MAX)."""
+    nomes = pd.Series(list(precos))
+    mc = pd.Series(list(precos.values()), dtype="float64")
+    return nomes, pd.DataFrame({"MIN": mc * 0.8, "M.C.": mc, "MAX": mc * 1.2})
+
+
+def historico_com(dias: dict[str, int]) -> HistoricoPrecos:
+    """Histórico em que cada produto tem `dias[produto]` boletins a preço estável."""
+    historico = HistoricoPrecos()
+    for dia in range(max(dias.values())):
+        precos = {p: 4.50 + 0.05 * (dia % 3) for p, n in dias.items() if dia < n}
+        processar_boletim(historico, *boletim(precos), INICIO + timedelta(days=dia))
+    return historico
+
+
+def test_erro_de_escala_e_corrigido():
+    historico = historico_com({"TOMATE": 5})
+    corrigidos, relatorio = processar_boletim(historico, *boletim({"TOMATE": 455.0}), INICIO + timedelta(days=5))
+    assert corrigidos.loc[0, "M.C."] == 4.55
+    assert corrigidos.loc[0].tolist() == [455.0 * 0.8 / 100, 4.55, 455.0 * 1.2 / 100]
+    assert set(relatorio["status"]) == {"CORRIGIDO"}
+    assert relatorio.loc[relatorio["coluna"] == "M.C.", "preco_original"].item() == 455.0
+
+
+def test_fora_do_padrao_sem_escala_fica_para_revisar():
+    historico = historico_com({"TOMATE": 5})
+    corrigidos, relatorio = processar_boletim(historico, *boletim({"TOMATE": 12.0}), INICIO + timedelta(days=5))
+    assert corrigidos.loc[0, "M.C."] == 12.0
+    assert set(relatorio["status"]) == {"REVISAR"}
+
+
+def test_menos_de_tres_pontos_nao_mexe():
+    historico = historico_com({"TOMATE": 5, "CHUCHU": 2})
+    corrigidos, relatorio = processar_boletim(historico, *boletim({"CHUCHU": 455.0}), INICIO + timedelta(days=5))
+    assert corrigidos.loc[0, "M.C."] == 455.0
+    assert relatorio.empty
+
+
+def test_boletim_antigo_nao_entra_no_anel():
+    historico = historico_com({"TOMATE": 3})
+    assert historico.ultima_data == (INICIO + timedelta(days=2)).isoformat()
+    processar_boletim(historico, *boletim({"TOMATE": 9.0}), INICIO - timedelta(days=1))
+    assert historico.ultima_data == (INICIO + timedelta(days=2)).isoformat()
+    _, _, pontos = historico.estatisticas(["tomate"], COLUNAS_PRECO)
+    assert pontos.tolist() == [[3, 3, 3]]
@@ -0,0 +1,200 @@
+# tests/test_api_boletim.py
+"""/boletim servido do cache em memória (api.py, services/boletim_servido)."""
+from email.utils import parsedate_to_datetime
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from services.arquivo_boletins import arquivar_boletim
+from services.boletim_servido import CacheBoletim
+from services.categorias import categorizar, subcategorizar
+from services.delta_boletim import CacheDelta
+
+
+def boletim(precos: dict, data: str) -> pd.DataFrame:
+    """{produto: preço M.C.} no formato que o scraper arquiva."""
+    mc = pd.Series(list(precos.values()), dtype="float64")
+    return pd.DataFrame({"Produto": list(precos), "MIN": mc - 0.5, "M.C.": mc, "MAX": mc + 0.5, "Data": data})
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    arquivar_boletim(boletim({"ALFACE": 2.0, "TOMATE": 4.5, "CEBOLA": 3.0}, "06/11/2025"), "06/11/2025",
+                     str(tmp_path / "arquivo"))
+    monkeypatch.setattr(api, "cache_boletim", CacheBoletim(str(tmp_path)))
+    monkeypatch.setattr(api, "cache_delta", CacheDelta(str(tmp_path / "arquivo")))
+    return tmp_path
+
+
+@pytest.fixture
+def cliente(pasta):
+    return TestClient(api.app)
+
+
+def test_etag_e_last_modified(cliente):
+    r = cliente.get("/boletim")
+    assert r.status_code == 200
+    assert r.json()["data"] == "2025-11-06" and r.json()["total"] == 3
+    servido = api.cache_boletim.atual()
+    assert r.headers["etag"] == servido.etag
+    assert parsedate_to_datetime(r.headers["last-modified"]) == servido.modificado_em
+    assert r.headers["cache-control"] == "no-cache"
+    assert r.headers["x-versao-boletim"] == servido.versao
+
+
+def test_304_pela_etag_ou_pela_data(cliente):
+    r = cliente.get("/boletim")
+    etag, modificado = r.headers["etag"], r.headers["last-modified"]
+
+    for cabecalhos in ({"If-None-Match": etag}, {"If-None-Match": f'"outra", W/{etag}'}, {"If-None-Match": "*"},
+                       {"If-Modified-Since": modificado}):
+        nao_mudou = cliente.get("/boletim", headers=cabecalhos)
+        assert nao_mudou.status_code == 304, cabecalhos
+        assert nao_mudou.content == b""
+        assert nao_mudou.headers["etag"] == etag
+
+    # If-None-Match manda mesmo com If-Modified-Since válido
+    assert cliente.get("/boletim", headers={"If-None-Match": '"outra"', "If-Modified-Since": modificado}).status_code == 200
+    # consulta filtrada tem ETag própria
+    filtrado = cliente.get("/boletim?prefixo=TOM", headers={"If-None-Match": etag})
+    assert filtrado.status_code == 200 and filtrado.headers["etag"] != etag
+    assert cliente.get("/boletim?prefixo=TOM", headers={"If-None-Match": filtrado.headers["etag"]}).status_code == 304
+
+
+def test_recarrega_quando_o_arquivo_muda(cliente, pasta):
+    antes = cliente.get("/boletim")
+    servido = api.cache_boletim.atual()
+    assert api.cache_boletim.atual() is servido   # sem mudança, nada é relido
+
+    arquivar_boletim(boletim({"ALFACE": 2.5, "TOMATE": 4.5}, "07/11/2025"), "07/11/2025", str(pasta / "arquivo"))
+    depois = cliente.get("/boletim", headers={"If-None-Match": antes.headers["etag"]})
+    assert depois.status_code == 200
+    assert depois.headers["etag"] != antes.headers["etag"]
+    assert depois.json()["data"] == "2025-11-07"
+    assert [l["PRODUTO"] for l in depois.json()["dados"]] == ["ALFACE", "TOMATE"]
+    assert api.cache_boletim.atual() is not servido
+
+
+# -------------------------------------------------
+# filtros, colunas, ordem e páginas (services/indice_boletim)
+# -------------------------------------------------
+@pytest.fixture
+def sintetico(tmp_path, monkeypatch):
+    from benchmarks.dados import gravar_fixtures
+
+    gravar_fixtures(str(tmp_path), produtos=300, dias=1, xlsx=0)
+    monkeypatch.setattr(api, "cache_boletim", CacheBoletim(str(tmp_path)))
+    cliente = TestClient(api.app)
+    df = api.cache_boletim.atual().df
+    categoria = categorizar(df["PRODUTO"])
+    referencia = df.assign(
+        CATEGORIA=categoria.to_numpy(),
+        SUBCATEGORIA=subcategorizar(df["PRODUTO"], categoria).to_numpy(),
+        sem_acento=df["PRODUTO"].str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii"),
+        mc=pd.to_numeric(df["M.C."], errors="coerce"),
+    )
+    return cliente, referencia, tmp_path
+
+
+def test_filtros_e_pagina_iguais_ao_pandas(sintetico):
+    cliente, ref, _ = sintetico
+    esperado = ref[ref["sem_acento"].str.startswith("BANANA") & (ref["CATEGORIA"] == "Frutas")
+                   & ref["mc"].between(2.0, 4.0)].sort_values("PRODUTO")
+    assert len(esperado) > 8
+
+    r = cliente.get("/boletim?prefixo=banana&categoria=FRUTAS&preco_min=2&preco_max=4"
+                    "&colunas=PRODUTO,M.C.&ordem=PRODUTO&limite=5&offset=3").json()
+    assert r["total"] == len(esperado)
+    assert (r["offset"], r["limite"]) == (3, 5)
+    assert r["dados"] == esperado[["PRODUTO", "M.C."]].iloc[3:8].to_dict(orient="records")
+
+    # prefixo sem acento casa com acento; subcategoria e faixa só por cima
+    r = cliente.get("/boletim?prefixo=maca&preco_max=9.5&campo_preco=MAX&colunas=PRODUTO").json()
+    maca = ref[ref["sem_acento"].str.startswith("MACA") & (pd.to_numeric(ref["MAX"]) <= 9.5)]
+    assert [l["PRODUTO"] for l in r["dados"]] == maca["PRODUTO"].tolist()
+    subcategoria = ref.loc[ref["SUBCATEGORIA"] != "", "SUBCATEGORIA"].iloc[0]
+    r = cliente.get("/boletim", params={"subcategoria": subcategoria, "colunas": "PRODUTO"}).json()
+    assert [l["PRODUTO"] for l in r["dados"]] == ref.loc[ref["SUBCATEGORIA"] == subcategoria, "PRODUTO"].tolist()
+
+
+def test_ordem_decrescente_e_cursor_percorrem_tudo(sintetico):
+    cliente, ref, _ = sintetico
+    esperado = ref[ref["CATEGORIA"] == "Hortifruti"].sort_values("mc", ascending=False)
+
+    vistos, cursor = [], None
+    while True:
+        params = {"categoria": "hortifruti", "ordem": "-M.C.", "limite": 40}
+        if cursor:
+            params["cursor"] = cursor
+        r = cliente.get("/boletim", params=params).json()
+        assert r["total"] == len(esperado)
+        vistos += r["dados"]
+        cursor = r["proximo_cursor"]
+        if cursor is None:
+            break
+    assert len(vistos) == len(esperado)
+    assert [l["M.C."] for l in vistos] == esperado["M.C."].tolist()
+    assert sorted(l["PRODUTO"] for l in vistos) == sorted(esperado["PRODUTO"])
+    # só as colunas do boletim, sem as de categoria do índice
+    assert list(vistos[0]) == list(api.cache_boletim.atual().df.columns)
+
+
+def test_cursor_de_outra_versao_e_parametros_invalidos(sintetico):
+    cliente, ref, pasta = sintetico
+    cursor = cliente.get("/boletim?ordem=PRODUTO&limite=10").json()["proximo_cursor"]
+    assert cliente.get("/boletim", params={"ordem": "PRODUTO", "limite": 10, "cursor": cursor}).status_code == 200
+
+    novo = ref[["PRODUTO", "MIN", "M.C.", "MAX"]].head(20).rename(columns={"PRODUTO": "Produto"})
+    arquivar_boletim(novo.assign(Data="02/06/2031"), "02/06/2031", str(pasta / "arquivo"))
+    r = cliente.get("/boletim", params={"ordem": "PRODUTO", "limite": 10, "cursor": cursor})
+    assert r.status_code == 410
+
+    for params in ({"cursor": "não é cursor"}, {"colunas": "PRODUTO,PESO"}, {"ordem": "-PESO"},
+                   {"preco_min": 1, "campo_preco": "MEDIO"}):
+        assert cliente.get("/boletim", params=params).status_code == 400, params
+
+
+# -------------------------------------------------
+# /boletim/delta (services/delta_boletim)
+# -------------------------------------------------
+def test_delta_entre_versoes(cliente, pasta):
+    versao_base = cliente.get("/boletim").headers["x-versao-boletim"]
+    arquivar_boletim(boletim({"ALFACE": 2.5, "TOMATE": 4.5, "BATATA": 3.3}, "07/11/2025"), "07/11/2025",
+                     str(pasta / "arquivo"))
+    atual = cliente.get("/boletim")
+    linhas = {l["PRODUTO"]: l for l in atual.json()["dados"]}
+
+    r = cliente.get("/boletim/delta", params={"desde": versao_base})
+    assert r.status_code == 200
+    delta = r.json()
+    assert (delta["desde"], delta["versao"]) == (versao_base, atual.headers["x-versao-boletim"])
+    assert r.headers["x-versao-boletim"] == delta["versao"]
+    assert delta["data"] == "2025-11-07" and delta["total"] == 3
+    assert delta["novos"] == [linhas["BATATA"]]
+    assert delta["alterados"] == [linhas["ALFACE"]]   # TOMATE tem os mesmos preços
+    assert delta["removidos"] == ["CEBOLA"]
+
+    # pela data do boletim do cliente: mesmo par de versões, já no cache
+    for desde in ("2025-11-06", "06/11/2025"):
+        por_data = cliente.get("/boletim/delta", params={"desde": desde})
+        assert por_data.content == r.content
+        assert 'desc="cache"' in por_data.headers["server-timing"]
+    assert cliente.get("/boletim/delta", params={"desde": versao_base},
+                       headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+
+    # cliente já na versão atual: nada a sincronizar
+    em_dia = cliente.get("/boletim/delta", params={"desde": delta["versao"]}).json()
+    assert (em_dia["novos"], em_dia["alterados"], em_dia["removidos"]) == ([], [], [])
+
+
+def test_delta_erros(cliente, pasta, monkeypatch):
+    assert cliente.get("/boletim/delta", params={"desde": "ontem"}).status_code == 400
+    assert cliente.get("/boletim/delta").status_code == 422
+    # versão que não está (mais) no arquivo, ou data anterior ao primeiro boletim
+    assert cliente.get("/boletim/delta", params={"desde": "2025-11-06.000000000000"}).status_code == 410
+    assert cliente.get("/boletim/delta", params={"desde": "2025-11-05"}).status_code == 410
+
+    monkeypatch.setattr(api, "cache_delta", CacheDelta(str(pasta / "vazio")))
+    assert cliente.get("/boletim/delta", params={"desde": "2025-11-06"}).status_code == 404
@@ -0,0 +1,42 @@
+# tests/test_arquivo_boletins.py
+"""Datas do arquivo de boletins (services/arquivo_boletins)."""
+import os
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from services.arquivo_boletins import arquivar_boletim, data_iso, importar_xlsx_legados, listar_arquivados
+
+BOLETIM = pd.DataFrame({"Produto": ["ALFACE", "TOMATE"], "MIN": [1.0, 2.0], "M.C.": [1.5, 2.5], "MAX": [2.0, 3.0]})
+
+
+def test_data_iso():
+    assert data_iso("10/11/2025") == "2025-11-10"
+    assert data_iso("2025-11-10") == "2025-11-10"
+    assert data_iso(datetime(2025, 11, 10, 14, 30)) == "2025-11-10"
+    assert data_iso(date(2025, 11, 10)) == "2025-11-10"
+    for ilegivel in ("ontem", "", None, "10-11-2025"):
+        with pytest.raises(ValueError):
+            data_iso(ilegivel)
+
+
+def test_data_ilegivel_nao_arquiva(tmp_path):
+    with pytest.raises(ValueError):
+        arquivar_boletim(BOLETIM, "sem data", pasta=str(tmp_path))
+    assert listar_arquivados(pasta=str(tmp_path)) == []
+
+
+def test_importar_legados_cai_para_data_do_nome(tmp_path):
+    legados = tmp_path / "downloads"
+    legados.mkdir()
+    BOLETIM.assign(Data="10/11/2025").to_excel(legados / "boletim_2025-11-09_0800.xlsx", sheet_name="Boletim", index=False)
+    BOLETIM.assign(Data="ilegível").to_excel(legados / "boletim_2025-11-07_0800.xlsx", sheet_name="Boletim", index=False)
+    BOLETIM.to_excel(legados / "boletim_2025-11-06.xlsx", sheet_name="Boletim", index=False)
+    BOLETIM.assign(Data="ilegível").to_excel(legados / "boletim_antigo.xlsx", sheet_name="Boletim", index=False)
+
+    arquivo = str(tmp_path / "arquivo")
+    assert importar_xlsx_legados(str(legados), pasta=arquivo) == 3
+    datas = sorted(b["data"] for b in listar_arquivados(pasta=arquivo))
+    assert datas == ["2025-11-06", "2025-11-07", "2025-11-10"]
+    assert not os.path.exists(os.path.join(arquivo, "data_boletim=" + date.today().isoformat()))
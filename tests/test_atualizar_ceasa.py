@@ -0,0 +1,50 @@
+# tests/test_atualizar_ceasa.py
+"""Ingestão idempotente do boletim (services/atualizar_ceasa.ingerir_boletim)."""
+import os
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+import models
+from benchmarks.dados import gerar_boletins
+from database import engine
+from services.anomalias import ESTADO_PADRAO
+from services.atualizar_ceasa import ingerir_boletim
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    if os.path.exists(ESTADO_PADRAO):
+        os.remove(ESTADO_PADRAO)
+    sessao = sessionmaker(bind=engine)()
+    yield sessao
+    sessao.close()
+
+
+def _linhas(db):
+    return db.execute(select(func.count()).select_from(models.BoletimCeasa)).scalar()
+
+
+def test_reingestao_do_mesmo_boletim_nao_grava_de_novo(db):
+    data, df = next(gerar_boletins(produtos=40, dias=1))
+    resumo = ingerir_boletim(db, df)
+    assert resumo["data_boletim"] == data.isoformat()
+    assert resumo["historico"] == _linhas(db) > 0
+
+    assert ingerir_boletim(db, df)["inalterado"] is True
+    assert _linhas(db) == resumo["historico"]
+
+
+def test_boletim_sem_data_levanta_erro(db):
+    data, df = next(gerar_boletins(produtos=40, dias=1))
+    with pytest.raises(ValueError, match="sem data"):
+        ingerir_boletim(db, df.drop(columns="Data"))
+    assert _linhas(db) == 0
+
+    # com a data explícita (backfill) continua funcionando
+    resumo = ingerir_boletim(db, df.drop(columns="Data"), data_boletim=data)
+    assert resumo["data_boletim"] == data.isoformat()
+    assert _linhas(db) == resumo["historico"] > 0
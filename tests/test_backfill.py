@@ -0,0 +1,79 @@
+# tests/test_backfill.py
+"""Backfill do histórico (services/backfill_ceasa) contra o servidor de replay."""
+import json
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import engine
+from services import anomalias, atualizar_ceasa, backfill_ceasa
+from services.anomalias import ESTADO_PADRAO, HistoricoPrecos
+from services.atualizar_ceasa import ingerir_boletim
+from services.backfill_ceasa import NOME_CHECKPOINT, executar_backfill
+from services.scraper_http import coletar_boletim_http
+
+# datas oferecidas em fixtures/ceasa/02_recarga.html
+DATAS = ["2025-11-03", "2025-11-04", "2025-11-05", "2025-11-06", "2025-11-07", "2025-11-10"]
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    if os.path.exists(ESTADO_PADRAO):
+        os.remove(ESTADO_PADRAO)
+    sessao = sessionmaker(bind=engine)()
+    yield sessao
+    sessao.close()
+
+
+def _datas_no_banco(db):
+    consulta = select(models.BoletimCeasa.data_boletim).distinct().order_by(models.BoletimCeasa.data_boletim)
+    return [d.isoformat() for (d,) in db.execute(consulta)]
+
+
+def test_backfill_completo_em_ordem(db, servidor, tmp_path, monkeypatch):
+    cargas = []
+    carregar = anomalias.historico_do_banco
+    monkeypatch.setattr(backfill_ceasa, "historico_do_banco", lambda db: cargas.append(1) or carregar(db))
+    monkeypatch.setattr(atualizar_ceasa, "historico_do_banco", lambda db: pytest.fail("histórico recarregado"))
+
+    resumo = executar_backfill(db, workers=3, url=servidor(), download_dir=str(tmp_path))
+
+    assert resumo == {"status": "sucesso", "disponiveis": 6, "pendentes": 6, "ingeridas": 6, "falhas": 0}
+    assert _datas_no_banco(db) == DATAS
+    assert len(cargas) == 1
+    # o anel viu todas as datas, da mais antiga para a mais nova
+    historico = HistoricoPrecos.carregar()
+    assert historico.ultima_data == DATAS[-1]
+    _, _, pontos = historico.estatisticas(list(historico._linha))
+    assert (pontos == len(DATAS)).all()
+
+    with open(tmp_path / NOME_CHECKPOINT, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    assert checkpoint == {"concluidas": DATAS, "falhas": {}}
+
+
+def test_retoma_pelo_checkpoint_e_pula_o_banco(db, servidor, tmp_path):
+    url = servidor()
+    # 10/11 já está no banco; 03/11 e 04/11 já foram concluídas por um backfill interrompido
+    df = coletar_boletim_http(download_dir=str(tmp_path), data="10/11/2025", url=url, arquivar=False)["df"]
+    ingerir_boletim(db, df)
+    checkpoint = tmp_path / "retomar.json"
+    checkpoint.write_text(json.dumps({"concluidas": DATAS[:2], "falhas": {"2025-11-05": "timeout"}}),
+                          encoding="utf-8")
+
+    resumo = executar_backfill(db, workers=2, url=url, checkpoint_path=str(checkpoint),
+                               download_dir=str(tmp_path), ate=date(2025, 11, 9))
+
+    assert resumo["pendentes"] == 3 and resumo["ingeridas"] == 3
+    assert _datas_no_banco(db) == DATAS[2:]
+    salvo = json.loads(checkpoint.read_text(encoding="utf-8"))
+    assert salvo == {"concluidas": DATAS[:5], "falhas": {}}
+
+    # nada pendente numa segunda passada
+    assert executar_backfill(db, url=url, checkpoint_path=str(checkpoint), download_dir=str(tmp_path))["pendentes"] == 0
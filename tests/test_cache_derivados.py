@@ -0,0 +1,48 @@
+# tests/test_cache_derivados.py
+"""Cache LRU dos derivados (services/cache_derivados) com a pasta compartilhada entre processos."""
+import os
+
+import pandas as pd
+
+from services import cache_derivados
+from services.cache_derivados import CacheDerivados
+
+FRAME = pd.DataFrame({"Produto": ["ALFACE", "TOMATE"], "M.C.": [1.5, 2.5]})
+
+
+def test_acerto_e_falta(tmp_path):
+    cache = CacheDerivados(str(tmp_path))
+    assert cache.obter("a", lambda: FRAME).equals(FRAME)
+    assert cache.obter("a", lambda: None).equals(FRAME)
+    assert (cache.acertos, cache.faltas) == (1, 1)
+
+
+def test_entrada_despejada_por_outro_worker_conta_como_falta(tmp_path, monkeypatch):
+    cache = CacheDerivados(str(tmp_path))
+    cache.obter("a", lambda: FRAME)
+    utime = os.utime
+
+    def despejada_antes(caminho, *args, **kwargs):
+        # outro processo despeja a entrada entre a leitura e o toque no mtime
+        os.remove(caminho)
+        return utime(caminho, *args, **kwargs)
+
+    monkeypatch.setattr(cache_derivados.os, "utime", despejada_antes)
+    assert cache.obter("a", lambda: FRAME).equals(FRAME)
+    assert (cache.acertos, cache.faltas) == (0, 2)
+    assert os.path.exists(cache._caminho("a"))
+
+
+def test_despejar_e_limpar_toleram_arquivo_sumido(tmp_path, monkeypatch):
+    cache = CacheDerivados(str(tmp_path), max_bytes=1)
+    cache.obter("a", lambda: FRAME)   # maior que max_bytes: sai na hora
+    assert cache.estatisticas()["entradas"] == 0
+
+    cache = CacheDerivados(str(tmp_path))
+    cache.obter("a", lambda: FRAME)
+    entradas = cache._entradas()
+    os.remove(entradas[0][2])
+    monkeypatch.setattr(cache, "_entradas", lambda: entradas)
+    cache.limpar()
+    cache.max_bytes = 0
+    cache.despejar()
@@ -0,0 +1,76 @@
+# tests/test_canonico.py
+"""Chaves canônicas e aliases de produto (services/canonico)."""
+import pandas as pd
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import engine
+from services.canonico import (
+    casar_chaves,
+    confirmar_sugestao,
+    normalizar_nome,
+    resolver_nomes,
+    sugestoes_pendentes,
+)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    sessao = sessionmaker(bind=engine)()
+    yield sessao
+    sessao.close()
+
+
+def chave(nome):
+    return normalizar_nome(pd.Series([nome]))[0]
+
+
+def test_unidades_saem_e_classificacao_fica():
+    assert chave("MAMÃO PAPAYA KG") == chave("papaya mamao")
+    assert chave("ALHO 500G") == chave("alho")
+    assert chave("BANANA PRATA G") != chave("BANANA PRATA")
+    assert chave("FEIJÃO PRETO T1") != chave("FEIJÃO PRETO")
+
+
+def test_classificacao_diferente_nao_casa():
+    referencia = [chave("BANANA PRATA"), chave("FEIJÃO PRETO T1")]
+    chaves = pd.Series([chave("BANANA PRATA G"), chave("FEIJÃO PRETO"), chave("BANANA PRTA")])
+    casadas = casar_chaves(chaves, referencia)
+    assert casadas.tolist() == [chave("BANANA PRATA G"), chave("FEIJÃO PRETO"), chave("BANANA PRATA")]
+
+
+def test_aproximado_vira_sugestao_inativa(db):
+    assert resolver_nomes(db, pd.Series(["TOMATE ITALIANO"])).tolist() == ["Tomate Italiano"]
+    db.commit()
+
+    # parecido, mas não é aplicado: resolve para o próprio nome
+    assert resolver_nomes(db, pd.Series(["TOMATE ITALIA"])).tolist() == ["Tomate Italia"]
+    db.commit()
+    pendentes = sugestoes_pendentes(db)
+    assert pendentes[["chave", "nome_canonico"]].values.tolist() == [[chave("TOMATE ITALIA"), "Tomate Italiano"]]
+    # a próxima ingestão não sugere de novo nem aplica
+    assert resolver_nomes(db, pd.Series(["TOMATE ITALIA"])).tolist() == ["Tomate Italia"]
+    db.commit()
+    assert len(sugestoes_pendentes(db)) == 1
+
+
+def test_confirmar_e_recusar_sugestao(db):
+    resolver_nomes(db, pd.Series(["MAMÃO PAPAYA", "CEBOLA NACIONAL"]))
+    resolver_nomes(db, pd.Series(["MAMAO PAPAIA", "CEBOLA NACIONL"]))
+    db.commit()
+    assert len(sugestoes_pendentes(db)) == 2
+
+    confirmar_sugestao(db, chave("MAMAO PAPAIA"))
+    with pytest.raises(ValueError):
+        confirmar_sugestao(db, chave("CEBOLA NACIONL"), aceitar=False)
+    confirmar_sugestao(db, chave("CEBOLA NACIONL"), aceitar=False, nome="Cebola Nacionl")
+    db.commit()
+
+    assert sugestoes_pendentes(db).empty
+    resolvidos = resolver_nomes(db, pd.Series(["MAMAO PAPAIA", "CEBOLA NACIONL"])).tolist()
+    assert resolvidos == ["Mamão Papaya", "Cebola Nacionl"]
+    with pytest.raises(LookupError):
+        confirmar_sugestao(db, chave("MAMAO PAPAIA"))
@@ -0,0 +1,94 @@
+# tests/test_categorias.py
+"""Categorias por regex única (services/categorias) contra as cadeias de any() antigas."""
+import pandas as pd
+
+from services.categorias import carregar_regras, categorizar, subcategorizar
+
+
+# as funções de analise_ceasa antes das regras irem para regras_categorias.json
+def categoria_antiga(nome) -> str:
+    if not isinstance(nome, str):
+        return "Outros"
+    n = nome.lower()
+    frutas_kw = [
+        "banana", "mamão", "mamao", "maçã", "maca", "laranja", "tangerina",
+        "uva", "melancia", "melão", "melao", "abacaxi", "pera", "goiaba",
+        "limão", "limao", "maracujá", "maracuja", "acerola", "kiwi", "pitaya",
+        "abacate", "caju"
+    ]
+    if any(k in n for k in frutas_kw):
+        return "Frutas"
+    peixes_kw = [
+        "peixe", "pescada", "tilápia", "tilapia", "corvina", "cação", "cacao",
+        "sardinha", "atum", "bacalhau", "merluza", "bagre", "camarão", "camarao"
+    ]
+    if any(k in n for k in peixes_kw):
+        return "Peixes"
+    cereais_kw = [
+        "arroz", "feijão", "feijao", "milho", "soja", "trigo", "aveia", "fubá", "fuba"
+    ]
+    if any(k in n for k in cereais_kw):
+        return "Cereais"
+    return "Hortifruti"
+
+
+def subcategoria_antiga(nome) -> str:
+    if not isinstance(nome, str):
+        return "Outros"
+    n = nome.lower()
+    verdura_kw = [
+        "alface", "rúcula", "rucula", "couve", "repolho", "agrião", "agriao",
+        "espinafre", "almeirão", "almeirao", "acelga", "cebolinha", "coentro", "salsa"
+    ]
+    if any(k in n for k in verdura_kw):
+        return "Verdura/Folha"
+    raiz_kw = [
+        "batata", "cenoura", "beterraba", "mandioca", "aipim", "inhame",
+        "batata-doce", "batata doce", "cará", "cara"
+    ]
+    if any(k in n for k in raiz_kw):
+        return "Raiz/Tubérculo"
+    fruto_kw = [
+        "tomate", "pimentão", "pimentao", "abobrinha", "abóbora", "abobora",
+        "pepino", "chuchu", "berinjela", "vagem", "quiabo", "maxixe"
+    ]
+    if any(k in n for k in fruto_kw):
+        return "Hortaliça de Fruto"
+    return "Outros Hortifruti"
+
+
+NOMES = [
+    "BANANA PRATA", "MAMÃO PAPAYA", "Mamao Formosa", "MAÇÃ FUJI", "LARANJA PÊRA", "TANGERINA PONKAN",
+    "UVA NIÁGARA", "MELANCIA", "MELÃO AMARELO", "ABACAXI PÉROLA", "GOIABA VERMELHA", "LIMÃO TAHITI",
+    "MARACUJÁ AZEDO", "ACEROLA", "KIWI", "PITAYA", "ABACATE", "CAJU", "TILÁPIA", "PESCADA AMARELA",
+    "CAÇÃO", "SARDINHA", "CAMARÃO CINZA", "BACALHAU", "ARROZ AGULHINHA", "FEIJÃO CARIOCA", "FUBÁ",
+    "MILHO VERDE", "ALFACE CRESPA", "RÚCULA", "COUVE MANTEIGA", "REPOLHO ROXO", "AGRIÃO", "CEBOLINHA",
+    "COENTRO", "SALSA", "BATATA INGLESA", "BATATA-DOCE", "BATATA DOCE ROXA", "CENOURA", "BETERRABA",
+    "MANDIOCA", "AIPIM", "INHAME", "CARÁ", "TOMATE LONGA VIDA", "PIMENTÃO VERDE", "ABOBRINHA",
+    "ABÓBORA MORANGA", "PEPINO", "CHUCHU", "BERINJELA", "VAGEM", "QUIABO", "MAXIXE", "CEBOLA NACIONAL",
+    "ALHO ROXO", "GENGIBRE", "OVOS", "",
+    # palavras dentro de outras e mais de uma regra no mesmo nome
+    "MACAXEIRA", "PIMENTA DE CHEIRO", "ESPINAFRE", "CARAMBOLA", "CAQUI", "PERA WILLIAMS",
+    "COUVE-FLOR", "SALSÃO", "CARNE SECA", "ABACATE COM BANANA", "BATATA BAROA COM TOMATE",
+    "ALFACE E CENOURA", "SOJA EM GRÃO", "TRIGO PARA QUIBE", "ATUM", "BAGRE", "CORVINA",
+]
+
+
+def test_categorias_iguais_as_regras_antigas():
+    serie = pd.Series(NOMES + [None])
+    categorias = categorizar(serie)
+    assert categorias.tolist() == [categoria_antiga(n) for n in NOMES] + ["Outros"]
+
+    subcategorias = subcategorizar(serie, categorias)
+    esperadas = [subcategoria_antiga(n) if categoria_antiga(n) == "Hortifruti" else "" for n in NOMES] + [""]
+    assert subcategorias.tolist() == esperadas
+
+
+def test_resultado_fixo():
+    regras = carregar_regras()
+    assert [regras["categorias"].classificar(n) for n in ("MACAXEIRA", "PIMENTA DE CHEIRO", "ATUM", "OVOS")] \
+        == ["Frutas", "Hortifruti", "Peixes", "Hortifruti"]
+    assert [regras["subcategorias_hortifruti"].classificar(n) for n in ("CARAMBOLA", "ALFACE E CENOURA", "ALHO")] \
+        == ["Raiz/Tubérculo", "Verdura/Folha", "Outros Hortifruti"]
+    # maiúsculas e minúsculas caem no mesmo resultado do cache
+    assert regras["categorias"].classificar("banana") == regras["categorias"].classificar("BANANA") == "Frutas"
@@ -0,0 +1,35 @@
+# tests/test_comparacao.py
+"""Status e diferenças de preço entre boletins (services/comparacao)."""
+import numpy as np
+import pandas as pd
+
+from services.comparacao import classificar_variacao
+
+
+def test_classificar_variacao():
+    hoje = pd.Series([5.0, 3.0, 4.0, 2.0, np.nan])
+    anterior = pd.Series([4.0, 4.0, 4.0, np.nan, 4.0])
+    status = classificar_variacao(hoje, anterior)
+    assert status.tolist() == ["SUBIU", "CAIU", "IGUAL", "NOVO", "SEM PREÇO"]
+    # ordem de exibição: quem subiu primeiro
+    assert status.sort_values().tolist() == ["SUBIU", "CAIU", "IGUAL", "NOVO", "SEM PREÇO"]
+
+
+def test_horizonte_sem_boletim_nao_vira_novo(tmp_path):
+    from benchmarks.dados import gravar_fixtures
+    from services.comparacao import comparar_arquivo
+
+    fixtures = gravar_fixtures(str(tmp_path), produtos=60, dias=25, xlsx=0)
+    resultado = comparar_arquivo(pasta=fixtures["arquivo"])
+
+    # 25 dias úteis não chegam ao ano anterior: horizonte sem boletim
+    assert resultado.attrs["datas"]["ano_anterior"] is None
+    assert (resultado["status_ano_anterior"] == "SEM BOLETIM").all()
+    assert resultado["preco_ano_anterior"].isna().all()
+
+    # D-1 existe: NOVO só para quem faltou naquele boletim
+    assert resultado.attrs["datas"]["D-1"] is not None
+    novos = resultado["status_D-1"] == "NOVO"
+    assert novos.sum() < len(resultado)
+    assert resultado.loc[novos, "preco_D-1"].isna().all()
+    assert resultado.loc[~novos, "preco_D-1"].notna().all()
@@ -0,0 +1,119 @@
+# tests/test_exportar.py
+"""Exportação em fluxo (/exportar/{tabela}) e a compressão pedaço a pedaço."""
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import brotli
+import pyarrow.parquet as pq
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+import models
+from database import SessionLocal, engine
+from routes import exportar
+from services.exportar_stream import exportar as exportar_fluxo
+from services.respostas import CompressaoMiddleware, RespostaJSON
+
+VENDAS = 1200   # lote mínimo da rota é 100: vários pedaços por resposta
+
+
+@pytest.fixture(scope="module")
+def banco():
+    """Vendas, itens, boletins e estoque de exemplo (uma vez por módulo)."""
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.execute(insert(models.Venda), [
+        {"id_cliente": 1, "id_usuario": 1, "data_venda": datetime(2025, 1, 1) + timedelta(hours=i),
+         "valor_total": Decimal("10.50") + i, "forma_pagamento": "PIX", "status": "Concluída"}
+        for i in range(VENDAS)
+    ])
+    db.execute(insert(models.ItemVenda), [
+        {"id_venda": i // 2 + 1, "id_produto": i % 7, "quantidade": 2, "preco_unitario": Decimal("5.25")}
+        for i in range(VENDAS)
+    ])
+    db.execute(insert(models.BoletimCeasa), [
+        {"data_boletim": date(2025, 1, 1) + timedelta(days=i // 100), "produto": f"PRODUTO {i % 100}",
+         "preco_min": Decimal("1.00"), "preco_medio": Decimal("2.05"), "preco_max": Decimal("3.10"), "origem": "ES"}
+        for i in range(1000)
+    ])
+    db.execute(insert(models.Estoque), [
+        {"id_produto": 1, "quantidade": 3, "tipo": "entrada", "origem": "compra", "data_movimento": datetime(2025, 2, 1)}
+        for _ in range(150)
+    ])
+    db.commit()
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def cliente(banco):
+    app = FastAPI(default_response_class=RespostaJSON)
+    app.add_middleware(CompressaoMiddleware)
+    app.include_router(exportar.router)
+    return TestClient(app)
+
+
+def _bruto(cliente, url, codificacao):
+    with cliente.stream("GET", url, headers={"Accept-Encoding": codificacao}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+def test_ndjson_e_csv(cliente):
+    r = cliente.get("/exportar/vendas?formato=ndjson&de=2025-01-01&ate=2025-01-02&lote=100",
+                    headers={"Accept-Encoding": "identity"})
+    linhas = [json.loads(l) for l in r.text.splitlines()]
+    assert len(linhas) == 96   # 48 vendas (uma por hora) nos dois dias, 2 itens cada
+    assert linhas[0]["valor_total"] == 10.5 and linhas[0]["data_venda"] == "2025-01-01T00:00:00"
+    assert r.headers["content-disposition"] == 'attachment; filename="vendas_2025-01-01_2025-01-02.ndjson"'
+
+    r = cliente.get("/exportar/boletins?formato=csv&ate=2025-01-02", headers={"Accept-Encoding": "identity"})
+    assert r.content.startswith(b"\xef\xbb\xbf")
+    linhas = list(csv.reader(io.StringIO(r.content.decode("utf-8-sig"))))
+    assert linhas[0] == ["data_boletim", "produto", "preco_min", "preco_medio", "preco_max", "origem"]
+    assert len(linhas) == 1 + 200
+    assert linhas[1] == ["2025-01-01", "PRODUTO 0", "1.00", "2.05", "3.10", "ES"]
+
+
+def test_parquet_um_row_group_por_lote(cliente):
+    r = cliente.get("/exportar/estoque?formato=parquet&lote=100")
+    arquivo = pq.ParquetFile(io.BytesIO(r.content))
+    assert arquivo.metadata.num_rows == 150
+    assert arquivo.num_row_groups == 2
+
+
+@pytest.mark.parametrize("tabela", ["vendas", "boletins", "estoque"])
+@pytest.mark.parametrize("formato", ["ndjson", "csv", "parquet"])
+@pytest.mark.parametrize("codificacao, descomprimir", [("gzip", gzip.decompress), ("br", brotli.decompress)])
+def test_fluxo_comprimido_igual_ao_cru(cliente, tabela, formato, codificacao, descomprimir):
+    url = f"/exportar/{tabela}?formato={formato}&lote=100"
+    cru, corpo_cru = _bruto(cliente, url, "identity")
+    comprimido, corpo = _bruto(cliente, url, codificacao)
+    assert "content-encoding" not in cru.headers
+
+    if formato == "parquet":
+        # binário: vai como veio
+        assert "content-encoding" not in comprimido.headers
+        assert corpo == corpo_cru
+        return
+    assert comprimido.headers["content-encoding"] == codificacao
+    assert "content-length" not in comprimido.headers
+    assert len(corpo) < len(corpo_cru)
+    assert descomprimir(corpo) == corpo_cru
+
+
+def test_erros(cliente):
+    assert cliente.get("/exportar/clientes").status_code == 400
+    assert cliente.get("/exportar/vendas?formato=xml").status_code == 400
+    assert cliente.get("/exportar/vendas?de=2025-02-01&ate=2025-01-01").status_code == 400
+
+
+def test_pedacos_do_tamanho_do_lote(banco):
+    # 600 vendas com 2 itens e 600 sem item (outer join): 1800 linhas, lotes de 500
+    pedacos = list(exportar_fluxo(SessionLocal, "vendas", "ndjson", tamanho=500))
+    assert [p.count(b"\n") for p in pedacos] == [500, 500, 500, 300]
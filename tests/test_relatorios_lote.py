@@ -0,0 +1,57 @@
+# tests/test_relatorios_lote.py
+"""Relatórios em lote por par de boletins (services/relatorios_lote)."""
+import os
+from datetime import date
+
+import pytest
+
+from services.relatorios_lote import gerar_lote, pares_pendentes, saidas_do_par, trechos
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    from benchmarks.dados import gravar_fixtures
+
+    gerados = gravar_fixtures(str(tmp_path), produtos=60, dias=3, xlsx=0)
+    return gerados["arquivo"], gerados["datas"]
+
+
+def test_nomes_fixos_por_par(tmp_path):
+    assert saidas_do_par("2025-01-08", "2025-01-07", str(tmp_path)) == {
+        "relatorio": os.path.join(str(tmp_path), "relatorio_ceasa_2025-01-08_vs_2025-01-07.xlsx"),
+        "comparativo": os.path.join(str(tmp_path), "comparativo_ceasa_2025-01-08_vs_2025-01-07.xlsx"),
+    }
+
+
+def test_gera_pares_e_pula_os_existentes(arquivo, tmp_path):
+    pasta, datas = arquivo
+    saida = str(tmp_path / "relatorios")
+
+    resumo = gerar_lote(workers=1, saida=saida, pasta=pasta)
+    assert resumo == {"status": "sucesso", "pares": 2, "gerados": 2, "falhas": 0}
+    esperados = sorted(
+        os.path.basename(c) for anterior, atual in zip(datas, datas[1:])
+        for c in saidas_do_par(atual, anterior, saida).values()
+    )
+    assert sorted(os.listdir(saida)) == esperados
+
+    # tudo gerado: nada a fazer
+    assert gerar_lote(workers=1, saida=saida, pasta=pasta)["pares"] == 0
+    # falta um dos dois arquivos do último par: só ele volta
+    os.remove(saidas_do_par(datas[2], datas[1], saida)["comparativo"])
+    pendentes = pares_pendentes(saida=saida, pasta=pasta)
+    assert [(a["data"], b["data"]) for a, b in pendentes] == [(datas[1], datas[2])]
+    assert gerar_lote(workers=1, saida=saida, pasta=pasta)["gerados"] == 1
+    assert sorted(os.listdir(saida)) == esperados
+
+    # forcar refaz tudo; o intervalo de datas limita pela data do boletim mais novo do par
+    assert len(pares_pendentes(saida=saida, pasta=pasta, forcar=True)) == 2
+    assert len(pares_pendentes(date.fromisoformat(datas[2]), saida=saida, pasta=pasta, forcar=True)) == 1
+
+
+def test_trechos_continuos():
+    b = [{"data": f"2025-01-0{i}"} for i in range(1, 8)]
+    pares = [(b[0], b[1]), (b[1], b[2]), (b[2], b[3]), (b[4], b[5]), (b[5], b[6])]
+    assert trechos(pares, 1) == [pares[:3], pares[3:]]   # o buraco (b[3], b[4]) separa
+    assert trechos(pares, 3) == [pares[:2], pares[2:3], pares[3:]]
+    assert trechos([], 4) == []
@@ -0,0 +1,100 @@
+# tests/test_respostas.py
+"""Camada de resposta compartilhada (services/respostas): JSON, negociação e compressão."""
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import brotli
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.respostas import CompressaoMiddleware, RespostaJSON, _json_padrao, escolher_codificacao, serializar
+
+LINHAS = [{"produto": f"PRODUTO {i} ÇÃO", "preco": i + 0.25} for i in range(300)]
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    app = FastAPI(default_response_class=RespostaJSON)
+    app.add_middleware(CompressaoMiddleware, minimo=1024)
+
+    @app.get("/lista")
+    def lista(n: int = 300):
+        return LINHAS[:n]
+
+    return TestClient(app)
+
+
+def test_serializar_tipos_conhecidos_e_recusar_o_resto():
+    dados = {
+        "data": date(2025, 11, 10), "gravado": datetime(2025, 11, 10, 8, 30), "ts": pd.Timestamp("2025-11-10"),
+        "preco": Decimal("4.55"), "n": np.int64(3), "x": np.float32(0.5), "lista": np.array([1, 2]),
+    }
+    esperado = {"data": "2025-11-10", "gravado": "2025-11-10T08:30:00", "ts": "2025-11-10T00:00:00",
+                "preco": 4.55, "n": 3, "x": 0.5, "lista": [1, 2]}
+    assert json.loads(serializar(dados)) == esperado
+
+    for desconhecido in (object(), {1, 2}, b"bytes"):
+        with pytest.raises(TypeError):
+            serializar({"valor": desconhecido})
+        # mesmo comportamento sem orjson
+        with pytest.raises(TypeError):
+            json.dumps({"valor": desconhecido}, default=_json_padrao)
+
+
+def _bruto(resposta) -> bytes:
+    # o httpx decodifica gzip/br sozinho; lê o corpo como veio do servidor
+    return b"".join(resposta.iter_raw())
+
+
+def test_escolher_codificacao():
+    assert escolher_codificacao("gzip, br") == "br"
+    assert escolher_codificacao("br;q=0.5, gzip") == "gzip"
+    assert escolher_codificacao("gzip;q=0, br") == "br"
+    assert escolher_codificacao("*") == "br"
+    assert escolher_codificacao("identity") is None
+    assert escolher_codificacao("") is None
+
+
+@pytest.mark.parametrize("codificacao, descomprimir", [("gzip", gzip.decompress), ("br", brotli.decompress)])
+def test_resposta_grande_comprimida(cliente, codificacao, descomprimir):
+    with cliente.stream("GET", "/lista", headers={"Accept-Encoding": codificacao}) as r:
+        corpo = _bruto(r)
+    assert r.headers["content-encoding"] == codificacao
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert int(r.headers["content-length"]) == len(corpo)
+    json_bytes = descomprimir(corpo)
+    assert json.loads(json_bytes) == LINHAS
+    assert int(r.headers["x-tamanho-serializado"]) == len(json_bytes)
+    assert r.headers["server-timing"].startswith("serializar;dur=")
+    assert "comprimir;dur=" in r.headers["server-timing"]
+
+
+def test_resposta_pequena_ou_sem_aceite_vai_crua(cliente):
+    r = cliente.get("/lista?n=2", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in r.headers
+    assert r.json() == LINHAS[:2]
+
+    r = cliente.get("/lista", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+    assert int(r.headers["x-tamanho-serializado"]) == len(r.content)
+
+
+def test_boletim_pre_comprimido_em_brotli(tmp_path, monkeypatch, capsys):
+    from benchmarks.dados import gravar_fixtures
+
+    gravar_fixtures(str(tmp_path), produtos=200, dias=2, xlsx=0)
+    import api
+
+    monkeypatch.setattr(api, "cache_boletim", api.CacheBoletim(str(tmp_path)))
+    cliente = TestClient(api.app)
+    identidade = cliente.get("/boletim", headers={"Accept-Encoding": "identity"})
+    with cliente.stream("GET", "/boletim", headers={"Accept-Encoding": "br"}) as r:
+        corpo = _bruto(r)
+    assert r.headers["content-encoding"] == "br"
+    assert 'desc="cache"' in r.headers["server-timing"]
+    assert brotli.decompress(corpo) == identidade.content
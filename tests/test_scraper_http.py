@@ -0,0 +1,64 @@
+# tests/test_scraper_http.py
+"""Backend HTTP do scraper contra o servidor local que reproduz fixtures/ceasa."""
+import os
+import shutil
+
+import pytest
+import requests
+
+from analise_ceasa import listar_boletins
+from conftest import FIXTURES_CEASA
+from services.arquivo_boletins import ARQUIVO_DIR
+from services.scraper_http import coletar_boletim_http, criar_sessao
+
+
+def test_coleta_boletim_da_grade(servidor, tmp_path):
+    resultado = coletar_boletim_http(download_dir=str(tmp_path), url=servidor(), arquivar=False)
+
+    df = resultado["df"]
+    assert len(df) == 20   # duas tabelas scGridTabela de 10 linhas
+    for col in ("MIN", "M.C.", "MAX"):
+        assert df[col].dtype == "float64"
+    assert df.loc[df["Produto"] == "MAMÃO PAPAYA", "M.C."].item() == 4.55
+    assert resultado["data_boletim"] == "10/11/2025"
+    assert (df["Data"] == "10/11/2025").all()
+    assert resultado["arquivo"] is None
+
+
+def test_data_escolhida(servidor, tmp_path):
+    resultado = coletar_boletim_http(download_dir=str(tmp_path), url=servidor(), data="06/11/2025",
+                                     arquivar=False)
+    assert resultado["data_boletim"] == "06/11/2025"
+
+    with pytest.raises(Exception, match="não está disponível"):
+        coletar_boletim_http(download_dir=str(tmp_path), url=servidor(), data="01/01/1999", arquivar=False)
+
+
+def test_pagina_sem_grade(servidor, tmp_path):
+    pasta = tmp_path / "sem_grade"
+    shutil.copytree(FIXTURES_CEASA, pasta)
+    (pasta / "03_grade.html").write_text("<html><body><p>Nenhum registro</p></body></html>", encoding="latin-1")
+
+    resultado = coletar_boletim_http(download_dir=str(tmp_path), url=servidor(str(pasta)), arquivar=False)
+    assert resultado is None
+
+
+def test_erro_http_500(servidor, tmp_path):
+    url = servidor(erros={"03_grade.html": 500})
+    # uma retentativa: sem a espera do backoff, ainda exercita o Retry da sessão
+    with pytest.raises(requests.exceptions.RequestException):
+        coletar_boletim_http(download_dir=str(tmp_path), url=url, sessao=criar_sessao(tentativas=1),
+                             pasta_arquivo=str(tmp_path / "arquivo"))
+    assert not os.path.exists(os.path.join(tmp_path, "arquivo"))
+
+
+def test_arquiva_onde_as_analises_leem(servidor, tmp_path):
+    resultado = coletar_boletim_http(download_dir=str(tmp_path), url=servidor())
+    assert os.path.dirname(os.path.dirname(resultado["arquivo"])) == os.path.abspath(ARQUIVO_DIR)
+    assert listar_boletins(str(tmp_path), n=1) == [resultado["arquivo"]]
+    assert not os.path.exists(os.path.join(tmp_path, "arquivo"))
+
+    # pasta explícita continua valendo
+    resultado = coletar_boletim_http(download_dir=str(tmp_path), url=servidor(),
+                                     pasta_arquivo=str(tmp_path / "outro"))
+    assert resultado["arquivo"].startswith(str(tmp_path / "outro"))
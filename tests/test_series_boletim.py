@@ -0,0 +1,94 @@
+# tests/test_series_boletim.py
+"""Séries de preço (services/series_boletim): janelas e cache por versão do histórico."""
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import engine
+from services import series_boletim
+from services.anomalias import ESTADO_PADRAO
+from services.atualizar_ceasa import ingerir_boletim
+from services.series_boletim import calcular_series, series_de_preco, versao_historico
+
+INICIO = date(2025, 11, 3)
+
+
+@pytest.fixture
+def db():
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    if os.path.exists(ESTADO_PADRAO):
+        os.remove(ESTADO_PADRAO)
+    series_boletim.limpar_cache()
+    sessao = sessionmaker(bind=engine)()
+    yield sessao
+    sessao.close()
+
+
+def ingerir(db, dia: int, precos: dict):
+    """Boletim do dia INICIO + dia com {produto: preço M.C.}."""
+    mc = pd.Series(list(precos.values()), dtype="float64")
+    data = INICIO + timedelta(days=dia)
+    df = pd.DataFrame({"Produto": list(precos), "MIN": mc - 0.5, "M.C.": mc, "MAX": mc + 0.5,
+                       "Data": data.strftime("%d/%m/%Y")})
+    return ingerir_boletim(db, df)
+
+
+def test_janelas():
+    datas = pd.to_datetime([INICIO + timedelta(days=d) for d in (0, 1, 2, 3, 200, 400)])
+    historico = pd.DataFrame({
+        "data": list(datas) * 2,
+        "produto": ["TOMATE"] * 6 + ["CHUCHU"] * 6,
+        "preco": [1.0, 2.0, 4.0, 2.0, 5.0, 3.0] + [2.0] * 6,
+    }).sample(frac=1, random_state=1)   # a ordem de entrada não importa
+
+    series = calcular_series(historico, janela=3)
+    tomate = series[series["produto"] == "TOMATE"].reset_index(drop=True)
+    assert tomate["data"].tolist() == list(datas)
+    np.testing.assert_allclose(tomate["media_movel"], [1.0, 1.5, 7 / 3, 8 / 3, 11 / 3, 10 / 3])
+    # variação contra 3 boletins atrás
+    np.testing.assert_allclose(tomate["variacao_pct"], [np.nan, np.nan, np.nan, 100.0, 150.0, -25.0])
+    # desvio padrão das variações diárias (100%, 100%, -50%, ...) nos últimos 3 boletins
+    retornos = pd.Series([np.nan, 100.0, 100.0, -50.0, 150.0, -40.0])
+    np.testing.assert_allclose(tomate["volatilidade"], retornos.rolling(3, min_periods=2).std())
+    # 52 semanas por data: o ponto do dia 400 só vê os dias 200 e 400
+    assert tomate["min_52s"].tolist() == [1.0, 1.0, 1.0, 1.0, 1.0, 3.0]
+    assert tomate["max_52s"].tolist() == [1.0, 2.0, 4.0, 4.0, 5.0, 5.0]
+
+    chuchu = series[series["produto"] == "CHUCHU"]
+    assert (chuchu["variacao_pct"].dropna() == 0).all() and (chuchu["volatilidade"].dropna() == 0).all()
+
+
+def test_cache_invalida_na_reingestao(db):
+    for dia in range(3):
+        ingerir(db, dia, {"TOMATE": 4.0 + dia, "CHUCHU": 2.0})
+    primeira = series_de_preco(db, ["Tomate"], janela=2, dias=30)
+    assert [p["preco"] for p in primeira[0]["pontos"]] == [4.0, 5.0, 6.0]
+    assert series_de_preco(db, ["Tomate"], janela=2, dias=30) is primeira   # do cache
+
+    # mesmo conteúdo: nada gravado, a versão e o cache continuam
+    versao = versao_historico(db)
+    assert ingerir(db, 2, {"TOMATE": 6.0, "CHUCHU": 2.0})["inalterado"]
+    assert versao_historico(db) == versao
+    assert series_de_preco(db, ["Tomate"], janela=2, dias=30) is primeira
+
+    # boletim do dia 2 corrigido no mesmo instante de relógio (DATETIME grosso do banco):
+    # marca de tempo e total iguais, só o hash do conteúdo muda
+    ultima, total, _ = versao
+    assert not ingerir(db, 2, {"TOMATE": 6.5, "CHUCHU": 2.0})["inalterado"]
+    db.execute(update(models.IngestaoBoletim)
+               .where(models.IngestaoBoletim.data_boletim == INICIO + timedelta(days=2))
+               .values(atualizado_em=ultima))
+    db.commit()
+    assert versao_historico(db)[:2] == (ultima, total)
+    assert versao_historico(db) != versao
+
+    atualizada = series_de_preco(db, ["Tomate"], janela=2, dias=30)
+    assert [p["preco"] for p in atualizada[0]["pontos"]] == [4.0, 5.0, 6.5]
+    assert atualizada[0]["pontos"][-1]["media_movel"] == 5.75